@@ -1,127 +1,633 @@
+import io
+import json
+import os
+import time
+
+import numpy as np
 import streamlit as st
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
+from kpi import config, meting, planner, resultaten, rollup, scenario, schets
+from kpi.bronnen import laad_bron, versie
+from kpi.filters import actief
+from kpi.filters import filter_bronnen
+from kpi.kpis import (kpi_beschikbaarheid_totaal, kpi_bezorgsnelheid, kpi_fouten_per_dag,
+                      kpi_klanttevredenheid_jong, kpi_kosten_per_dag, kpi_orders_per_uur, kpi_per_server)
+from kpi.live import LogVolger
+
 # -----------------------
-# Inlezen van data
+# Inlezen van data (gecached)
 # -----------------------
-kpi = pd.read_csv("kpi_scores.csv")
-fouten_mens = pd.read_csv("fouten_mens.csv", index_col=0, parse_dates=True)
-fouten_robot = pd.read_csv("fouten_robot.csv", index_col=0, parse_dates=True)
-orders_mens = pd.read_csv("orders_mens.csv", index_col=0)
-orders_robot = pd.read_csv("orders_robot.csv", index_col=0)
-kosten_mens = pd.read_csv("kosten_mens.csv", index_col=0)
-kosten_robot = pd.read_csv("kosten_robot.csv", index_col=0)
-beschikbaarheid = pd.read_csv("beschikbaarheid.csv")
+# Streamlit draait dit script bij elke interactie opnieuw. De resultaten van
+# startscript of de planner (één Arrow-bestand met bijlagen, zie
+# kpi/resultaten.py) worden alleen opnieuw gelezen als het bestand is
+# vervangen (mtime), en grafieken worden alleen opnieuw getekend als hun
+# invoer verandert. Het bestand wordt in één keer vervangen, dus een
+# verversing halverwege is nooit zichtbaar. Zonder filters leest het
+# dashboard alleen deze momentopname: de filterkeuzes, de rollup-kubus en de
+# bezorgtijd-schetsen gaan mee als metadata en bijlagen.
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _resultaten(mtime):
+    return resultaten.lees(resultaten.RESULTATEN)
+
+
+def opgeslagen_resultaten():
+    if not os.path.exists(resultaten.RESULTATEN):
+        st.error("Nog geen resultaten: draai eerst `python startscript.py` of `python -m kpi.planner`.")
+        st.stop()
+    try:
+        return _resultaten(os.path.getmtime(resultaten.RESULTATEN))
+    except ValueError:
+        # Andere VERSIE (zie resultaten.py): bijv. zonder domein en bijlagen
+        st.error("De resultaten zijn van een oudere versie: draai `python startscript.py` opnieuw.")
+        st.stop()
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _bijlage(mtime, naam):
+    return resultaten.lees_bijlage(_resultaten(mtime)[1], naam)
+
+
+def bijlage(naam):
+    # Kubus of schetsen uit de momentopname; oudere resultaten hebben ze nog niet
+    uitkomst = _bijlage(os.path.getmtime(resultaten.RESULTATEN), naam)
+    if uitkomst is None:
+        st.error("De resultaten zijn van een oudere versie: draai `python startscript.py` opnieuw.")
+        st.stop()
+    return uitkomst
+
 
 # -----------------------
-# Pagina instellingen
+# Filters (KPI's opnieuw berekenen)
 # -----------------------
-st.set_page_config(layout="wide")
-st.title("📊 KPI Dashboard – Lake Side Mania")
+# Zonder filters toont het dashboard de momentopname uit het Arrow-bestand.
+# Met filters worden de KPI's hier berekend op de brondata; die wordt één keer per
+# versie van de bronbestanden (mtimes; een bron kan een map of glob zijn)
+# geladen en gedeeld, en een periode kiezen is een slice op de datumindex
+# (zie kpi/filters.py).
+
+def _mtimes():
+    return versie(config.bestand_excel, "mens"), versie(config.bestand_robot, "robot")
+
+
+@st.cache_resource(show_spinner="Brondata laden...")
+def _bronnen(mtime_mens, mtime_robot):
+    return laad_bron(config.bestand_excel, "mens"), laad_bron(config.bestand_robot, "robot")
+
+
+def bronnen():
+    return _bronnen(*_mtimes())
+
+
+def versies(filters):
+    # Cache-sleutel: met filters de bronnen, zonder filters alleen de momentopname
+    if actief(filters):
+        return _mtimes()
+    return os.path.getmtime(resultaten.RESULTATEN)
+
+
+@st.cache_resource(show_spinner="Rollup opbouwen...")
+def _kubus(mtime_mens, mtime_robot):
+    # Eén scan over de orders per versie van de bronnen; alle drill-downs daarna uit de kubus
+    return rollup.bouw(*_bronnen(mtime_mens, mtime_robot))
+
+
+def kubus():
+    return _kubus(*_mtimes())
+
+
+@st.cache_resource(show_spinner=False)
+def _dagschetsen(mtime_mens, mtime_robot):
+    # Bezorgtijd-schets per bron, server en dag; weken en maanden zijn sommen hiervan
+    return schets.bouw(*_bronnen(mtime_mens, mtime_robot))
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def percentielen(mtimes, filters, niveau=None):
+    # mtimes: van de bronnen, of van de resultaten zonder filters
+    filters = dict(filters)
+    if not actief(filters):
+        dagschetsen = bijlage("schetsen")
+    elif rollup.past(filters):
+        dagschetsen = _dagschetsen(*mtimes)
+    else:
+        # Tafel en leeftijd zitten niet in de dagschetsen: schets van de gefilterde orders
+        dagschetsen = schets.bouw(*filter_bronnen(*bronnen(), **filters))
+    periode = {naam: filters.get(naam) for naam in ("start", "eind", "servers")}
+    return schets.kwantielen(dagschetsen, niveau, **periode)
+
+
+@st.cache_data(show_spinner="KPI's berekenen...", max_entries=32)
+def gefilterde_kpis(mtimes, filters):
+    df_mens, df_robot = bronnen()
+    filters = dict(filters)
+    score_mens, score_robot = kpi_klanttevredenheid_jong(df_mens, df_robot, **filters)
+    bezorgtijd_mens, bezorgtijd_robot = kpi_bezorgsnelheid(df_mens, df_robot, **filters)
+    if rollup.past(filters):
+        fouten_mens, fouten_robot = rollup.fouten_per_dag(kubus(), **filters)
+        orders_mens, orders_robot = rollup.orders_per_uur(kubus(), **filters)
+        kosten_mens, kosten_robot = rollup.kosten_per_dag(kubus(), **filters)
+        per_server_mens, per_server_robot = rollup.per_server(kubus(), **filters)
+    else:
+        fouten_mens, fouten_robot = kpi_fouten_per_dag(df_mens, df_robot, **filters)
+        orders_mens, orders_robot = kpi_orders_per_uur(df_mens, df_robot, **filters)
+        kosten_mens, kosten_robot = kpi_kosten_per_dag(df_mens, df_robot, **filters)
+        per_server_mens, per_server_robot = kpi_per_server(df_mens, df_robot, **filters)
+    beschikbaarheid_mens, beschikbaarheid_robot = kpi_beschikbaarheid_totaal(
+        config.bestand_beschikbaarheid, df_robot, **filters)
+    # Zelfde sleutels als de opgeslagen resultaten (cli.bereken_kpis)
+    return {
+        "score_mens": score_mens, "score_robot": score_robot,
+        "bezorgtijd_mens": bezorgtijd_mens, "bezorgtijd_robot": bezorgtijd_robot,
+        "fouten_mens": fouten_mens, "fouten_robot": fouten_robot,
+        "orders_mens": orders_mens, "orders_robot": orders_robot,
+        "kosten_mens": kosten_mens, "kosten_robot": kosten_robot,
+        "per_server_mens": per_server_mens, "per_server_robot": per_server_robot,
+        "beschikbaarheid_mens": beschikbaarheid_mens, "beschikbaarheid_robot": beschikbaarheid_robot,
+    }
+
+
+def kies_filters(domein):
+    # De keuzes komen uit de momentopname (filters.domein), niet uit de bronnen
+    st.sidebar.header("Filters")
+    eerste = pd.Timestamp(domein["eerste"]).date()
+    laatste = pd.Timestamp(domein["laatste"]).date()
+    periode = st.sidebar.date_input("Periode", (eerste, laatste), min_value=eerste, max_value=laatste)
+    servers = st.sidebar.multiselect("Server", domein["servers"])
+    tafels = st.sidebar.multiselect("Tafel", list(range(1, 21)))
+    jongste, oudste = domein["leeftijd"]
+    leeftijd = st.sidebar.slider("Leeftijd klant", jongste, oudste, (jongste, oudste))
+
+    # Alleen afwijkingen van de standaard tellen als filter
+    filters = {}
+    if len(periode) == 2 and tuple(periode) != (eerste, laatste):
+        filters["start"], filters["eind"] = str(periode[0]), str(periode[1])
+    if servers:
+        filters["servers"] = tuple(servers)
+    if tafels:
+        filters["tafels"] = tuple(tafels)
+    if leeftijd != (jongste, oudste):
+        filters["leeftijd"] = leeftijd
+    return filters
+
+
+def _png(fig):
+    # Figuur omzetten naar PNG en direct sluiten, zodat het geheugen niet groeit
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+# -----------------------
+# Live modus (robotlog volgen)
+# -----------------------
+# st.fragment ververst alleen het live-blok; oudere Streamlit-versies herladen de pagina
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+
+@st.cache_resource(show_spinner=False)
+def logvolger(pad):
+    # Eén achtergrondthread per log, gedeeld door alle sessies
+    return LogVolger(pad).start()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def live_grafiek_orders(pad, versie, _orders):
+    fig, ax = plt.subplots(figsize=(10, 3))
+    _orders.plot(kind='bar', ax=ax, color="#ff7f0e")
+    ax.axhline(13, color='gray', linestyle='--', label='Norm (13 orders)')
+    ax.set_xlabel("Uur")
+    ax.set_ylabel("Aantal orders")
+    ax.set_title("Robot: orders per uur (live)")
+    return _png(fig)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def live_grafiek_fouten(pad, versie, _fouten):
+    fig, ax = plt.subplots(figsize=(10, 3))
+    ax.plot(_fouten.index, _fouten.values, marker='s', color="#ff7f0e")
+    ax.axhline(2, color='gray', linestyle='--', label='Norm (2 fouten)')
+    ax.set_ylabel("Aantal fouten (<6 beoordeling)")
+    ax.set_title("Robot: fouten per dag (live)")
+    ax.tick_params(axis='x', rotation=45)
+    return _png(fig)
+
+
+def toon_live(live_log):
+    volger = logvolger(live_log)
+    stand = volger.momentopname()
+    if volger.records == 0:
+        st.info(f"Nog geen records gelezen uit {live_log}")
+        return
+
+    _, bezorgtijd = stand["bezorgsnelheid"]
+    _, kosten = stand["kosten"]
+    kolom1, kolom2, kolom3 = st.columns(3)
+    kolom1.metric("Gem. bezorgtijd robot (s)", f"{bezorgtijd:.1f}")
+    kolom2.metric("Kosten robot laatste dag (€)", f"{kosten.iloc[-1]:.2f}" if len(kosten) else "-")
+    kolom3.metric("Records gelezen", volger.records)
+
+    # Versienummers in de cache-sleutel: alleen gewijzigde KPI's worden opnieuw getekend
+    versie, orders = stand["orders_per_uur"]
+    if len(orders):
+        st.image(live_grafiek_orders(live_log, versie, orders))
+    versie, fouten = stand["fouten"]
+    if len(fouten):
+        st.image(live_grafiek_fouten(live_log, versie, fouten))
+    st.caption(f"Laatste update: {time.strftime('%H:%M:%S', time.localtime(volger.laatste_update))}")
+
 
 # -----------------------
 # KPI: Klanttevredenheid jong - grafiek
 # -----------------------
-st.subheader("Klanttevredenheid jonge klanten (grafiek)")
-fig_k1, ax_k1 = plt.subplots(figsize=(5, 3))
-ax_k1.bar(["Mens", "Robot"], 
-          [kpi['Klanttevredenheid_mens'][0], kpi['Klanttevredenheid_robot'][0]], 
-          color=["#1f77b4", "#ff7f0e"])
-ax_k1.axhline(7.00, color='gray', linestyle='--', label='Norm (7.00)')
-ax_k1.set_ylabel("Gemiddelde beoordeling")
-ax_k1.set_title("Klanttevredenheid (≤ 45 jaar)")
-st.pyplot(fig_k1)
+@st.cache_data(show_spinner=False)
+def grafiek_klanttevredenheid(mens, robot):
+    fig_k1, ax_k1 = plt.subplots(figsize=(5, 3))
+    ax_k1.bar(["Mens", "Robot"],
+              [mens, robot],
+              color=["#1f77b4", "#ff7f0e"])
+    ax_k1.axhline(7.00, color='gray', linestyle='--', label='Norm (7.00)')
+    ax_k1.set_ylabel("Gemiddelde beoordeling")
+    ax_k1.set_title("Klanttevredenheid (≤ 45 jaar)")
+    return _png(fig_k1)
+
 
 # -----------------------
 # KPI: Bezorgsnelheid - grafiek
 # -----------------------
-st.subheader("Gemiddelde bezorgtijd (grafiek)")
-fig_k2, ax_k2 = plt.subplots(figsize=(5, 3))
-ax_k2.bar(["Mens", "Robot"], 
-          [kpi['Bezorgtijd_mens'][0], kpi['Bezorgtijd_robot'][0]], 
-          color=["#2ca02c", "#d62728"])
-ax_k2.axhline(165.00, color='gray', linestyle='--', label='Norm (165s)')
-ax_k2.set_ylabel("Tijd (in seconden)")
-ax_k2.set_title("Gemiddelde bezorgtijd")
-st.pyplot(fig_k2)
+@st.cache_data(show_spinner=False)
+def grafiek_bezorgsnelheid(mens, robot):
+    fig_k2, ax_k2 = plt.subplots(figsize=(5, 3))
+    ax_k2.bar(["Mens", "Robot"],
+              [mens, robot],
+              color=["#2ca02c", "#d62728"])
+    ax_k2.axhline(165.00, color='gray', linestyle='--', label='Norm (165s)')
+    ax_k2.set_ylabel("Tijd (in seconden)")
+    ax_k2.set_title("Gemiddelde bezorgtijd")
+    return _png(fig_k2)
+
+
+# -----------------------
+# KPI: Bezorgtijd percentielen - grafiek
+# -----------------------
+@st.cache_data(show_spinner=False)
+def grafiek_percentielen(tabel):
+    fig_p, ax_p = plt.subplots(figsize=(5, 3))
+    tabel.reindex(["mens", "robot"]).rename(index=str.capitalize).T.plot(
+        kind='bar', ax=ax_p, color=["#2ca02c", "#d62728"], rot=0)
+    ax_p.axhline(165.00, color='gray', linestyle='--', label='Norm (165s)')
+    ax_p.set_ylabel("Tijd (in seconden)")
+    ax_p.set_title("Bezorgtijd p50 / p90 / p99")
+    ax_p.legend()
+    return _png(fig_p)
+
+
 # -----------------------
 # KPI: Fouten per dag
 # -----------------------
-start = "2025-04-22"
-end = "2025-05-05"
+@st.cache_data(show_spinner=False)
+def grafiek_fouten(fouten_mens_filtered, fouten_robot_filtered):
+    fig1, ax1 = plt.subplots(figsize=(10, 4))
+    ax1.plot(fouten_mens_filtered.index, fouten_mens_filtered.values, label='Mens', marker='o')
+    ax1.plot(fouten_robot_filtered.index, fouten_robot_filtered.values, label='Robot', marker='s')
+    ax1.axhline(2, color='gray', linestyle='--', label='Norm (2 fouten)')
+    ax1.set_xlabel("Datum")
+    ax1.set_ylabel("Aantal fouten (<6 beoordeling)")
+    ax1.set_title("Aantal fouten per dag")
+    ax1.legend()
+    ax1.tick_params(axis='x', rotation=45)
+    return _png(fig1)
 
-fouten_mens_filtered = fouten_mens.loc[start:end]
-fouten_robot_filtered = fouten_robot.loc[start:end]
-st.subheader("Aantal fouten per dag")
-fig1, ax1 = plt.subplots(figsize=(10, 4))
-plt.plot(fouten_mens_filtered.index, fouten_mens_filtered.values, label='Mens', marker='o')
-plt.plot(fouten_robot_filtered.index, fouten_robot_filtered.values, label='Robot', marker='s')
-ax1.axhline(2, color='gray', linestyle='--', label='Norm (2 fouten)')
-ax1.set_xlabel("Datum")
-ax1.set_ylabel("Aantal fouten (<6 beoordeling)")
-ax1.set_title("Aantal fouten per dag")
-ax1.legend()
-ax1.tick_params(axis='x', rotation=45)
-st.pyplot(fig1)
 
 # -----------------------
 # KPI: Orders per uur
 # -----------------------
-st.subheader("Aantal orders per uur")
-df_orders = pd.DataFrame({
-    "Mens": orders_mens.squeeze(),
-    "Robot": orders_robot.squeeze()
-}).fillna(0)
-fig2, ax2 = plt.subplots(figsize=(10, 4))
-df_orders.plot(kind='bar', ax=ax2)
-ax2.axhline(13, color='gray', linestyle='--', label='Norm (13 orders)')
-ax2.set_ylabel("Aantal orders")
-ax2.set_xlabel("Uur")
-ax2.set_title("Aantal orders per uur")
-ax2.legend()
-st.pyplot(fig2)
+@st.cache_data(show_spinner=False)
+def grafiek_orders(df_orders):
+    fig2, ax2 = plt.subplots(figsize=(10, 4))
+    df_orders.plot(kind='bar', ax=ax2)
+    ax2.axhline(13, color='gray', linestyle='--', label='Norm (13 orders)')
+    ax2.set_ylabel("Aantal orders")
+    ax2.set_xlabel("Uur")
+    ax2.set_title("Aantal orders per uur")
+    ax2.legend()
+    return _png(fig2)
+
+
+# -----------------------
+# KPI: Beschikbaarheid (grafiek)
+# -----------------------
+@st.cache_data(show_spinner=False)
+def grafiek_beschikbaarheid(beschikbaarheid_data):
+    fig_beschikbaarheid, ax_beschikbaarheid = plt.subplots(figsize=(4, 3))
+    ax_beschikbaarheid.bar(
+        beschikbaarheid_data["Type"],
+        beschikbaarheid_data["Beschikbaarheid"],
+        color=["#1f77b4", "#ff7f0e"]
+    )
+    ax_beschikbaarheid.set_ylim(0, 100)
+    ax_beschikbaarheid.set_ylabel("Beschikbaarheid (%)")
+    ax_beschikbaarheid.set_title("Personeelsbeschikbaarheid")
+    for i, v in enumerate(beschikbaarheid_data["Beschikbaarheid"]):
+        ax_beschikbaarheid.text(i, v + 1, f"{v:.1f}%", ha='center')
+    return _png(fig_beschikbaarheid)
+
 
 # -----------------------
-# KPI: Kosten per dag
+# Drill-down (uur -> dag -> week) uit de rollup
 # -----------------------
-st.subheader("Kosten per dag (€)")
-df_kosten = pd.DataFrame({
-    "Mens": kosten_mens.squeeze(),
-    "Robot": kosten_robot.squeeze()
-}).fillna(0)
-st.line_chart(df_kosten)
+@st.cache_data(show_spinner=False, max_entries=64)
+def drilldown(mtimes, niveau, naam, start, eind, servers):
+    bron = kubus() if start or eind or servers else bijlage("kubus")
+    opgerold = rollup.oprollen(bron, niveau, start=start, eind=eind, servers=servers)
+    return rollup.maat(opgerold, naam)
+
+
+def toon_drilldown(filters):
+    kolom1, kolom2 = st.columns(2)
+    niveau = kolom1.radio("Niveau", ["Uur", "Dag", "Week"], index=1, horizontal=True)
+    naam = kolom2.selectbox("Maat", list(rollup.MATEN))
+    periode = {sleutel: filters.get(sleutel) for sleutel in ("start", "eind", "servers")}
+    tabel = drilldown(versies(periode), niveau, naam, *periode.values())
+    st.line_chart(tabel)
+    if not rollup.past(filters):
+        st.caption("Tafel en leeftijd zijn geen dimensies van de rollup; de drill-down gebruikt alleen periode en server.")
+
 
 # -----------------------
-# KPI: Beschikbaarheid (grafiek)
+# Scenario's: kosten mens vs robot
 # -----------------------
-st.subheader("Beschikbaarheid van personeel (%) – Mens vs Robot")
+# De kostenparameters (uurtarief, uren per order, prijs per kWh, vaste kosten
+# en aantal robots) zijn invoer van kpi/scenario.py. De dagbasis (orders en kWh
+# per dag) komt uit de rollup; een rooster van duizenden scenario's is daarop
+# één matrixberekening, dus de schuifjes reageren direct.
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def kostenbasis(mtimes, filters):
+    filters = dict(filters)
+    if not actief(filters):
+        return rollup.kostenbasis(bijlage("kubus"))
+    if rollup.past(filters):
+        return rollup.kostenbasis(kubus(), filters.get("start"), filters.get("eind"), filters.get("servers"))
+    return scenario.dagbasis(*bronnen(), **filters)
+
+
+def toon_scenarios(filters):
+    basis = kostenbasis(versies(filters), tuple(sorted(filters.items())))
+    if basis.empty:
+        st.info("Geen dagen in de gekozen selectie.")
+        return
+
+    kolom1, kolom2, kolom3, kolom4 = st.columns(4)
+    uurtarief = kolom1.slider("Uurtarief (€)", 5.0, 50.0, float(config.UURTARIEF), 0.5)
+    uren = kolom2.slider("Uren per order", 0.5, 12.0, float(config.UREN), 0.5)
+    prijs_kwh = kolom3.slider("Prijs per kWh (€)", 0.0, 1.0, float(config.PRIJS_KWH), 0.01)
+    vaste_kosten = kolom4.slider("Vaste kosten per robot per dag (€)", 0, 2000, int(config.VASTE_KOSTEN_ROBOT), 5)
+    robots = st.multiselect("Aantal robots", [1, 2, 3, 4, 5], default=[1, 2, 3]) or [1]
+
+    begin = time.perf_counter()
+    gekozen = scenario.doorrekenen(basis, scenario.rooster(
+        uurtarief=uurtarief, uren=uren, prijs_kwh=prijs_kwh, vaste_kosten=vaste_kosten, robots=robots))
+
+    # Break-even: bij welk uurtarief is de robot even duur, per vaste kosten en aantal robots
+    vast = np.arange(0, 2001, 5)
+    bij_vast = scenario.rooster(uren=uren, prijs_kwh=prijs_kwh, vaste_kosten=vast, robots=robots)
+    bij_vast["Break-even"] = scenario.break_even(basis, bij_vast, "uurtarief")
+    curve_vast = bij_vast.pivot(index="vaste_kosten", columns="robots", values="Break-even")
+
+    # Besparing door de robot over de periode, per uurtarief en aantal robots
+    tarieven = np.arange(5, 50.01, 0.5)
+    bij_tarief = scenario.doorrekenen(basis, scenario.rooster(
+        uurtarief=tarieven, uren=uren, prijs_kwh=prijs_kwh, vaste_kosten=vaste_kosten, robots=robots))
+    curve_tarief = bij_tarief.pivot(index="uurtarief", columns="robots", values="Besparing")
+    seconden = time.perf_counter() - begin
+
+    for tabel, naam in ((curve_vast, "Vaste kosten per robot per dag (€)"), (curve_tarief, "Uurtarief (€)")):
+        tabel.columns = [f"{int(r)} robot(s)" for r in tabel.columns]
+        tabel.index.name = naam
 
-# Zet de beschikbaarheidsgegevens in de juiste vorm
-beschikbaarheid_data = pd.DataFrame({
-    "Type": ["Mens", "Robot"],
-    "Beschikbaarheid": [
-        beschikbaarheid["Beschikbaarheid_mens"].iloc[0],
-        beschikbaarheid["Beschikbaarheid_robot"].iloc[0]
-    ]
-})
+    metrics = st.columns(len(gekozen))
+    for kolom, (_, rij) in zip(metrics, gekozen.iterrows()):
+        kolom.metric(f"Besparing {int(rij['robots'])} robot(s) over {len(basis)} dagen", f"€{rij['Besparing']:,.0f}",
+                     delta=f"robot goedkoper op {int(rij['Dagen_goedkoper'])} dagen", delta_color="off")
 
-# Plot de grafiek
-fig_beschikbaarheid, ax_beschikbaarheid = plt.subplots(figsize=(4, 3))
-ax_beschikbaarheid.bar(
-    beschikbaarheid_data["Type"],
-    beschikbaarheid_data["Beschikbaarheid"],
-    color=["#1f77b4", "#ff7f0e"]
-)
-ax_beschikbaarheid.set_ylim(0, 100)
-ax_beschikbaarheid.set_ylabel("Beschikbaarheid (%)")
-ax_beschikbaarheid.set_title("Personeelsbeschikbaarheid")
-for i, v in enumerate(beschikbaarheid_data["Beschikbaarheid"]):
-    ax_beschikbaarheid.text(i, v + 1, f"{v:.1f}%", ha='center')
+    kolom_vast, kolom_tarief = st.columns(2)
+    kolom_vast.caption("Break-even uurtarief (€): boven de lijn is de robot goedkoper")
+    kolom_vast.line_chart(curve_vast)
+    kolom_tarief.caption("Besparing door de robot over de periode (€); break-even waar de lijn 0 kruist")
+    kolom_tarief.line_chart(curve_tarief)
+    st.caption(f"{len(gekozen) + len(bij_vast) + len(bij_tarief):,} scenario's doorgerekend in {seconden * 1000:.0f} ms")
 
-st.pyplot(fig_beschikbaarheid)
 
 # -----------------------
-# Footer
+# KPI's per server
 # -----------------------
-st.caption("Opdracht DP22 – KPI-dashboard | Gemaakt met ❤️ in Streamlit")
+# Elke medewerker (mens) en elke robot (Server in het robotlog) apart; elke
+# run (pandas, incrementeel of SQL) slaat ze op.
+
+
+def toon_per_server(per_server_mens, per_server_robot):
+    if per_server_mens.empty and per_server_robot.empty:
+        st.info("Geen servers in de gekozen selectie.")
+        return
+    opmaak = {"Beoordeling": "{:.2f}", "Bezorgtijd": "{:.0f}", "Kosten": "€{:,.2f}"}
+    kolom_mens, kolom_robot = st.columns(2)
+    kolom_mens.caption("Mens")
+    kolom_mens.dataframe(per_server_mens.style.format(opmaak, na_rep="-"), use_container_width=True)
+    kolom_robot.caption("Robot")
+    kolom_robot.dataframe(per_server_robot.style.format(opmaak, na_rep="-"), use_container_width=True)
+    if len(per_server_robot) > 1:
+        st.bar_chart(per_server_robot[["Orders", "Fouten"]])
+
+
+# -----------------------
+# Pijplijn-gezondheid en rendertijden
+# -----------------------
+# startscript schrijft na elke run een rapport naar .kpi_runs/ (kpi/meting.py).
+# De zijbalk toont de stappen van de laatste run en vergelijkt de duur met
+# de mediaan van de eerdere runs; onderaan de pagina staat hoe lang elke
+# sectie van het dashboard zelf deze keer duurde.
+
+TRAAG_FACTOR = 1.5
+
+
+@st.cache_data(show_spinner=False)
+def _runs(mtime):
+    return meting.lees_runs()
+
+
+def toon_planner():
+    # Stand van `python -m kpi.planner`, als die draait of gedraaid heeft
+    if not os.path.exists(planner.STATUS):
+        return
+    with open(planner.STATUS, encoding="utf-8") as f:
+        status = json.load(f)
+    laatste = status.get("laatste") or {}
+    if status["stand"] != "gestopt" and not planner.leeft(status["pid"]):
+        st.sidebar.caption(f"⚠️ Planner (pid {status['pid']}) draait niet meer")
+    elif status["stand"] == "bezig":
+        st.sidebar.caption(f"🔄 Verversing bezig sinds {status['sinds'][11:]} "
+                           f"({', '.join(status.get('aanleiding', []))})")
+    elif status["stand"] == "wacht" and status.get("volgende"):
+        st.sidebar.caption(f"⏲️ Volgende verversing om {status['volgende'].replace('T', ' ')}")
+    if laatste.get("fout"):
+        st.sidebar.error(f"Laatste verversing ({laatste['tijdstip'].replace('T', ' ')}) mislukt: {laatste['fout']}")
+
+
+def toon_pijplijn():
+    st.sidebar.header("Pijplijn-gezondheid")
+    toon_planner()
+    laatste = os.path.join(meting.RUN_MAP, meting.LAATSTE)
+    runs = _runs(os.path.getmtime(laatste)) if os.path.exists(laatste) else []
+    if not runs:
+        st.sidebar.caption("Nog geen runrapport; draai `python startscript.py`.")
+        return
+
+    run, eerder = runs[-1], [r["totaal_s"] for r in runs[:-1]]
+    mediaan = float(pd.Series(eerder).median()) if eerder else None
+    delta = f"{run['totaal_s'] - mediaan:+.2f}s t.o.v. mediaan" if mediaan is not None else None
+    st.sidebar.metric(f"Laatste run ({run['tijdstip'].replace('T', ' ')})", f"{run['totaal_s']:.2f}s",
+                      delta=delta, delta_color="inverse")
+    if run.get("rijen"):
+        st.sidebar.caption(" | ".join(f"{bron}: {aantal:,} rijen" for bron, aantal in run["rijen"].items()))
+
+    # Alleen de hoofdstappen; de deelstappen (bijv. kpis/rollup) staan in het JSON-rapport
+    stappen = pd.DataFrame([s for s in run["stappen"] if "/" not in s["naam"]])
+    if stappen.empty:
+        return
+    st.sidebar.bar_chart(stappen.set_index("naam")["seconden"])
+    if mediaan and run["totaal_s"] > TRAAG_FACTOR * mediaan:
+        traagste = stappen.loc[stappen["seconden"].idxmax()]
+        st.sidebar.warning(f"Run {run['totaal_s'] / mediaan:.1f}x trager dan de mediaan; "
+                           f"traagste stap: {traagste['naam']} ({traagste['seconden']:.2f}s)")
+
+
+def toon_rendertijden(meter):
+    rapport = meter.rapport()
+    with st.expander(f"⏱️ Rendertijden deze pagina ({rapport['totaal_s']:.2f}s)"):
+        tabel = pd.DataFrame(rapport["stappen"]).set_index("naam")["seconden"]
+        st.bar_chart(tabel)
+
+
+# -----------------------
+# Pagina
+# -----------------------
+# Importeren van dit bestand tekent niets; `streamlit run dashboard.py`
+# draait het als __main__ en roept main() aan.
+
+def pagina():
+    st.sidebar.header("Live modus")
+    live_modus = st.sidebar.toggle("Robotlog live volgen", value=False)
+    live_log = st.sidebar.text_input("Robotlog (NDJSON of JSON-array)", "robot_restaurant_log.ndjson")
+    live_interval = st.sidebar.slider("Verversen elke (seconden)", 1, 30, 2)
+
+    if live_modus:
+        st.subheader("🔴 Live: robot")
+        with meting.stap("live"):
+            if _fragment is not None:
+                _fragment(run_every=live_interval)(toon_live)(live_log)
+            else:
+                toon_live(live_log)
+
+    with meting.stap("resultaten"):
+        res, run = opgeslagen_resultaten()
+        filters = kies_filters(run["domein"])
+    with meting.stap("kpis"):
+        if actief(filters):
+            res = gefilterde_kpis(_mtimes(), tuple(sorted(filters.items())))
+            st.info("Gefilterd: " + ", ".join(f"{naam} = {waarde}" for naam, waarde in filters.items()))
+            start, end = filters.get("start"), filters.get("eind")
+        else:
+            st.caption(f"Resultaten van {run['tijdstip'].replace('T', ' ')}")
+            start, end = config.fouten_start, config.fouten_eind
+
+    with meting.stap("klanttevredenheid"):
+        st.subheader("Klanttevredenheid jonge klanten (grafiek)")
+        st.image(grafiek_klanttevredenheid(res["score_mens"], res["score_robot"]))
+
+    with meting.stap("bezorgtijd"):
+        st.subheader("Gemiddelde bezorgtijd en percentielen (grafiek)")
+        sleutel = tuple(sorted(filters.items()))
+        kolom_gem, kolom_pct = st.columns(2)
+        kolom_gem.image(grafiek_bezorgsnelheid(res["bezorgtijd_mens"], res["bezorgtijd_robot"]))
+        kolom_pct.image(grafiek_percentielen(percentielen(versies(filters), sleutel)))
+        with st.expander("Percentielen per dag, week of maand"):
+            niveau = st.radio("Per", list(schets.NIVEAUS), horizontal=True)
+            tabel = percentielen(versies(filters), sleutel, niveau).unstack("Bron")
+            tabel.columns = [f"{bron} {p}" for p, bron in tabel.columns]
+            st.line_chart(tabel)
+            st.caption(f"Schatting uit de dagschetsen, hooguit {schets.RELATIEVE_FOUT:.0%} afwijking.")
+
+    with meting.stap("fouten"):
+        fouten_mens_filtered = res["fouten_mens"].loc[start:end]
+        fouten_robot_filtered = res["fouten_robot"].loc[start:end]
+        st.subheader("Aantal fouten per dag")
+        if fouten_mens_filtered.empty and fouten_robot_filtered.empty:
+            st.info("Geen fouten in de gekozen selectie.")
+        else:
+            st.image(grafiek_fouten(fouten_mens_filtered, fouten_robot_filtered))
+
+    with meting.stap("orders"):
+        st.subheader("Aantal orders per uur")
+        df_orders = pd.DataFrame({"Mens": res["orders_mens"], "Robot": res["orders_robot"]}).fillna(0)
+        if df_orders.empty:
+            st.info("Geen orders in de gekozen selectie.")
+        else:
+            st.image(grafiek_orders(df_orders))
+
+    # KPI: Kosten per dag
+    with meting.stap("kosten"):
+        st.subheader("Kosten per dag (€)")
+        df_kosten = pd.DataFrame({"Mens": res["kosten_mens"], "Robot": res["kosten_robot"]}).fillna(0)
+        st.line_chart(df_kosten)
+
+    with meting.stap("scenarios"):
+        st.subheader("Wat als? Kosten mens vs robot")
+        toon_scenarios(filters)
+
+    with meting.stap("per_server"):
+        st.subheader("KPI's per server")
+        toon_per_server(res["per_server_mens"], res["per_server_robot"])
+
+    with meting.stap("drilldown"):
+        st.subheader("Drill-down: uur → dag → week")
+        toon_drilldown(filters)
+
+    with meting.stap("beschikbaarheid"):
+        st.subheader("Beschikbaarheid van personeel (%) – Mens vs Robot")
+
+        # Zet de beschikbaarheidsgegevens in de juiste vorm
+        beschikbaarheid_data = pd.DataFrame({
+            "Type": ["Mens", "Robot"],
+            "Beschikbaarheid": [res["beschikbaarheid_mens"], res["beschikbaarheid_robot"]]
+        })
+
+        st.image(grafiek_beschikbaarheid(beschikbaarheid_data))
+
+    return live_modus, live_interval
+
+
+def main():
+    st.set_page_config(layout="wide")
+    st.title("📊 KPI Dashboard – Lake Side Mania")
+
+    with meting.Meter() as meter:
+        live_modus, live_interval = pagina()
+    toon_pijplijn()
+    toon_rendertijden(meter)
+
+    # Footer
+    st.caption("Opdracht DP22 – KPI-dashboard | Gemaakt met ❤️ in Streamlit")
+
+    # Zonder st.fragment de hele pagina herladen; de gecachte delen kosten dan bijna niets
+    if live_modus and _fragment is None:
+        time.sleep(live_interval)
+        st.rerun()
+
+if __name__ == "__main__":
+    main()
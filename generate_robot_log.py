@@ -1,6 +1,8 @@
 
+import argparse
 import random
 import json
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, time
 
@@ -181,5 +183,239 @@ def generate_week_log_with_errors():
     df = pd.DataFrame(all_orders_sorted)
     df.to_excel("robot_restaurant_log_week_cleaned.xlsx", index=False)
 
+# --------------------
+# GEVECTORISEERDE GENERATOR
+# --------------------
+# Voor loadtests: alle trips van een blok dagen worden in één keer met NumPy
+# uitgelegd in plaats van order voor order. Per (robot, dag, uur) worden de
+# trips achter elkaar in het uur gelegd met willekeurige tussenruimtes, dus ze
+# overlappen nooit en er is geen zoeken of opnieuw proberen nodig. Zelfde seed
+# en dezelfde opties geven hetzelfde log. Het resultaat wordt per blok
+# weggeschreven als NDJSON, JSON-array of Parquet. Lege velden (storingen)
+# zijn null in plaats van "", zodat Parquet-kolommen één type houden.
+
+KOLOMMEN = ['Order_ID', 'Date', 'Time_Picked', 'Time_Delivery', 'Server', 'Table', 'Rating',
+            'Total_Amount', 'Birth_Date', 'Comment', 'Power consumption', 'Error_code']
+UREN = range(9, 21)
+ORDERS_PER_UUR = (16, 22)  # zelfde volume als het bestaande log (~220 per dag)
+DAGEN_PER_BLOK = 31
+
+# "HH:MM:SS" voor elke seconde van de dag; opzoeken is veel sneller dan strftime
+_TIJDEN = np.array([f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(86400)], dtype=object)
+
+
+def _datums_als_tekst(dagen):
+    # dagen: numpy datetime64[D]; formatteren per unieke datum
+    uniek, positie = np.unique(dagen, return_inverse=True)
+    return pd.DatetimeIndex(uniek).strftime('%d-%m-%Y').to_numpy(dtype=object)[positie]
+
+
+def _server_namen(robots):
+    return ['server_1337'] if robots == 1 else [f"server_{r}" for r in range(1, robots + 1)]
+
+
+def _storingen(dagen, robots, storingskans, rng):
+    # (robot, dagindex, begin (s), einde (s), code) van vaste en willekeurige storingen
+    blokken = []
+    for err_date, start, end, code, msg in ERROR_BLOCKS:
+        dag = np.flatnonzero(dagen == np.datetime64(err_date.date()))
+        if len(dag):
+            blokken.append((0, dag[0], start.hour * 3600 + start.minute * 60, end.hour * 3600 + end.minute * 60,
+                            f"{code}: {msg}"))
+    if storingskans:
+        robot, dag = np.nonzero(rng.random((robots, len(dagen))) < storingskans)
+        begin = rng.integers(9 * 3600, 20 * 3600, size=len(robot)) // 60 * 60
+        einde = np.minimum(begin + rng.integers(20, 151, size=len(robot)) * 60, 21 * 3600)
+        codes = rng.integers(0, len(ERROR_BLOCKS), size=len(robot))
+        for r, d, b, e, c in zip(robot, dag, begin, einde, codes):
+            blokken.append((r, d, b, e, f"{ERROR_BLOCKS[c][3]}: {ERROR_BLOCKS[c][4]}"))
+    return blokken
+
+
+def _klantvelden(n, datums, rng):
+    # Tafel, beoordeling, bedrag, geboortedatum en opmerking per order
+    met_opmerking = rng.random(n) < 0.10
+    opmerking = np.where(met_opmerking, np.array(all_comments, dtype=object)[rng.integers(0, len(all_comments), size=n)], "")
+    negatief = np.isin(opmerking, negative_comments)
+    rating = np.where(negatief, rng.integers(1, 6, size=n), rng.integers(6, 11, size=n))
+
+    leeftijd = np.where(rng.random(n) < 0.43, rng.integers(18, 45, size=n), rng.integers(45, 91, size=n))
+    geboorte = datums - (leeftijd * 365 + rng.integers(0, 365, size=n)).astype('timedelta64[D]')
+    return {
+        'Table': rng.choice(tables, size=n),
+        'Rating': rating,
+        'Total_Amount': rng.uniform(10, 100, size=n).round(2),
+        'Birth_Date': _datums_als_tekst(geboorte),
+        'Comment': opmerking,
+    }
+
+
+def _trips(aantal_slots, orders_per_uur, rng):
+    # Per slot (robot, dag, uur) groepen van 1 (80%) of 2-3 orders tot het
+    # aantal orders van dat uur bereikt is; de laatste groep wordt afgekapt
+    laag, hoog = orders_per_uur
+    aantal = rng.integers(laag, hoog + 1, size=aantal_slots)
+    groep = np.where(rng.random((aantal_slots, hoog)) < 0.2, rng.integers(2, 4, size=(aantal_slots, hoog)), 1)
+    voor = np.cumsum(groep, axis=1) - groep
+    houden = voor < aantal[:, None]
+    groep = np.minimum(groep, aantal[:, None] - voor)[houden]
+    slot = np.nonzero(houden)[0]
+    return slot, groep
+
+
+def _orders_blok(dagen, robots, orders_per_uur, storingskans, rng):
+    uren = np.array(UREN)
+    aantal_slots = robots * len(dagen) * len(uren)
+    slot, groep = _trips(aantal_slots, orders_per_uur, rng)
+
+    # Elke order in een trip heeft een eigen bezorgtijd; de trip duurt tot de laatste
+    trip = np.repeat(np.arange(len(slot)), groep)
+    vertraging = rng.integers(30, 181, size=len(trip))
+    eerste_order = np.concatenate(([0], np.cumsum(groep)[:-1]))
+    duur = np.maximum.reduceat(vertraging, eerste_order) + 1
+
+    # Trips in een uur achter elkaar leggen: begin = eigen tussenruimte +
+    # duur van de trips ervoor. Past het niet in het uur, dan loopt het door
+    # (nooit na 21:30, want het laatste uur begint om 20:00).
+    per_slot = np.bincount(slot, minlength=aantal_slots)
+    eerste_trip = np.concatenate(([0], np.cumsum(per_slot)[:-1]))
+    bezet = np.add.reduceat(duur, eerste_trip[per_slot > 0])
+    vrij = np.zeros(aantal_slots)
+    vrij[per_slot > 0] = np.maximum(3600 - bezet, 0)
+    ruimte = rng.random(len(slot)) * vrij[slot]
+    ruimte = np.floor(ruimte[np.lexsort((ruimte, slot))]).astype(np.int64)
+    ervoor = np.cumsum(duur) - duur
+    ervoor -= np.repeat(ervoor[eerste_trip[per_slot > 0]], per_slot[per_slot > 0])
+
+    robot, rest = np.divmod(slot, len(dagen) * len(uren))
+    dag, uur = np.divmod(rest, len(uren))
+    begin = uren[uur] * 3600 + ruimte + ervoor
+
+    # Naar orders: slot-volgorde is (robot, dag, tijd), dus al gesorteerd
+    robot, dag, picked = robot[trip], dag[trip], begin[trip]
+    delivery = picked + vertraging
+
+    # Orders tijdens een storing vervallen
+    blokken = _storingen(dagen, robots, storingskans, rng)
+    if blokken:
+        sleutel = robot * len(dagen) + dag
+        houden = np.ones(len(picked), dtype=bool)
+        for r, d, b, e, _ in blokken:
+            links, rechts = np.searchsorted(sleutel, [r * len(dagen) + d, r * len(dagen) + d + 1])
+            houden[links:rechts] &= ~((picked[links:rechts] >= b) & (picked[links:rechts] <= e))
+        robot, dag, picked, delivery = robot[houden], dag[houden], picked[houden], delivery[houden]
+
+    n = len(picked)
+    sleutel = robot * len(dagen) + dag
+    volgnr = np.arange(n) - np.searchsorted(sleutel, sleutel) + 1
+    datums = dagen[dag]
+    df = pd.DataFrame({
+        'Robot': robot,
+        'Dag': dag,
+        'Seconde': picked,
+        'Volgnr': volgnr,
+        'Time_Picked': _TIJDEN[picked],
+        'Time_Delivery': _TIJDEN[delivery],
+        'Power consumption': ((delivery - picked) / 3600 * (POWER_USAGE_WATT / 1000)).round(3),
+        'Error_code': None,
+        **_klantvelden(n, datums, rng),
+    })
+
+    # Storingsrecords: één per ~4 minuten, op willekeurige minuten in het blok
+    fouten = []
+    for r, d, b, e, code in blokken:
+        minuten = (e - b) // 60
+        aantal = minuten // 4
+        tijden = np.sort(b + rng.integers(0, minuten + 1, size=aantal) * 60)
+        fouten.append(pd.DataFrame({
+            'Robot': r, 'Dag': d, 'Seconde': tijden,
+            'Volgnr': [f"ERR{i:03d}" for i in range(1, aantal + 1)],
+            'Time_Picked': _TIJDEN[tijden], 'Time_Delivery': None,
+            'Power consumption': np.nan, 'Error_code': code,
+            **_klantvelden(aantal, np.full(aantal, dagen[d]), rng),
+            'Rating': np.nan, 'Comment': "",
+        }))
+    if fouten:
+        df = pd.concat([df] + fouten, ignore_index=True)
+
+    df = df.sort_values(['Dag', 'Seconde', 'Robot'], kind='stable', ignore_index=True)
+    dag_tekst = pd.DatetimeIndex(dagen).strftime('%Y%m%d').to_numpy(dtype=object)[df['Dag'].to_numpy()]
+    volgnr = df['Volgnr'].map(lambda v: v if isinstance(v, str) else f"{v:03d}")
+    robot_deel = "" if robots == 1 else "R" + (df['Robot'] + 1).astype(str) + "-"
+    df['Order_ID'] = dag_tekst + "-" + robot_deel + volgnr
+    df['Date'] = _datums_als_tekst(dagen[df['Dag'].to_numpy()])
+    df['Server'] = np.array(_server_namen(robots), dtype=object)[df['Robot'].to_numpy()]
+    df['Rating'] = df['Rating'].astype('Int64')
+    return df[KOLOMMEN]
+
+
+def generate_log_vectorized(start, end, robots=1, seed=None, storingskans=0.0,
+                            orders_per_uur=ORDERS_PER_UUR, dagen_per_blok=DAGEN_PER_BLOK):
+    # Geeft het log als DataFrames per blok van dagen_per_blok dagen
+    rng = np.random.default_rng(seed)
+    alle_dagen = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    for i in range(0, len(alle_dagen), dagen_per_blok):
+        yield _orders_blok(alle_dagen[i:i + dagen_per_blok], robots, orders_per_uur, storingskans, rng)
+
+
+def write_log(blokken, pad, formaat):
+    # Blok voor blok wegschrijven, dus het hele log staat nooit in het geheugen
+    aantal = 0
+    if formaat == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schrijver = None
+        try:
+            for blok in blokken:
+                tabel = pa.Table.from_pandas(blok, preserve_index=False)
+                if schrijver is None:
+                    schrijver = pq.ParquetWriter(pad, tabel.schema)
+                schrijver.write_table(tabel)
+                aantal += len(blok)
+        finally:
+            if schrijver is not None:
+                schrijver.close()
+        return aantal
+
+    with open(pad, "w", encoding="utf-8") as f:
+        if formaat == "json":
+            f.write("[\n")
+        for blok in blokken:
+            regels = blok.to_json(orient="records", lines=True, force_ascii=False)
+            if formaat == "json":
+                regels = ("" if aantal == 0 else ",\n") + regels.rstrip("\n").replace("\n", ",\n")
+            f.write(regels)
+            aantal += len(blok)
+        if formaat == "json":
+            f.write("\n]\n")
+    return aantal
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Robotlog genereren (zonder opties: de vaste testweek)")
+    parser.add_argument("--vector", action="store_true", help="gevectoriseerde generator voor grote logs")
+    parser.add_argument("--start", default=START_DATE.date().isoformat())
+    parser.add_argument("--eind", default=END_DATE.date().isoformat())
+    parser.add_argument("--robots", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--storingskans", type=float, default=0.0,
+                        help="kans op een extra storing per robot per dag")
+    parser.add_argument("--formaat", choices=["ndjson", "json", "parquet"], default="ndjson")
+    parser.add_argument("--uitvoer", default=None)
+    args = parser.parse_args(argv)
+
+    if not args.vector:
+        if args.seed is not None:
+            random.seed(args.seed)
+        generate_week_log_with_errors()
+        return
+
+    uitvoer = args.uitvoer or f"robot_restaurant_log.{args.formaat}"
+    blokken = generate_log_vectorized(args.start, args.eind, args.robots, args.seed, args.storingskans)
+    aantal = write_log(blokken, uitvoer, args.formaat)
+    print(f"✅ {aantal} records geschreven naar {uitvoer}")
+
+
 if __name__ == "__main__":
-    generate_week_log_with_errors()
+    main()
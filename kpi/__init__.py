@@ -0,0 +1,22 @@
+# --------------------
+# KPI'S LAKE SIDE MANIA
+# --------------------
+# Importeren leest nog niets in: df_mens en df_robot worden pas geladen
+# (via de Parquet-cache) als ze voor het eerst worden opgevraagd, en
+# SQLAlchemy, Streamlit en de database-modules worden alleen geïmporteerd door
+# de onderdelen die ze gebruiken. Vanaf de command line: python -m kpi.
+
+from . import bronnen
+from .bronnen import laad_mens, laad_robot
+from .kpis import (kpi_beschikbaarheid_mens, kpi_beschikbaarheid_totaal, kpi_bezorgsnelheid,
+                   kpi_bezorgtijd_percentielen, kpi_fouten_per_dag, kpi_klanttevredenheid_jong, kpi_kosten_per_dag,
+                   kpi_orders_per_uur, kpi_per_server)
+
+
+def __getattr__(naam):
+    # kpi.df_mens / kpi.df_robot: lui laden bij de eerste toegang
+    if naam == "df_mens":
+        return bronnen.df_mens()
+    if naam == "df_robot":
+        return bronnen.df_robot()
+    raise AttributeError(f"module 'kpi' has no attribute '{naam}'")
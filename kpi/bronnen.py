@@ -0,0 +1,162 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from . import config, meting
+from .cache import cache_pad, gecached
+from .logstream import lees_robot_log
+from .schema import SCHEMA_MENS, SCHEMA_ROBOT, herstel, met_foutvlag, toepassen
+from .tijden import absoluut, datum
+
+# --------------------
+# INLEZEN MENSELIJKE DATA (EXCEL)
+# --------------------
+# De kolomtypes (ook in de cache) staan in schema.py
+
+
+def _datumindex(df):
+    # Datum als (gesorteerde) index: een periode kiezen is dan een slice, zie filters.py
+    df.index = pd.DatetimeIndex(df["Date"].to_numpy(), name="Dag")
+    return df
+
+
+def _op_datum(df, tijdkolom):
+    df = df.sort_values(["Date", tijdkolom], kind="stable", ignore_index=True)
+    return _datumindex(df)
+
+
+def normaliseer_mens(df_mens):
+    # Tijdstippen uit de Excel (datetime.time, soms leeg of "onbekend") in één
+    # stap omzetten naar absolute tijden op de orderdatum
+    datum_mens = datum(df_mens['Date'])
+    for kolom in ['Time_Order', 'Time_Ready', 'Time_Delivery']:
+        df_mens[kolom] = absoluut(datum_mens, df_mens[kolom])
+
+    # Datum en geboortedatum
+    df_mens['Date'] = datum_mens
+    df_mens['Birth_Date'] = datum(df_mens['Birth_Date'])
+
+    # Leeftijd berekenen
+    df_mens['Leeftijd'] = ((pd.to_datetime("2025-05-01") - df_mens['Birth_Date']).dt.days / 365).astype(int)
+
+    # Uren en uurtarief zijn voor elke order gelijk: constanten in config.py
+
+    return _op_datum(toepassen(df_mens, SCHEMA_MENS), "Time_Order")
+
+
+def laad_mens(pad):
+    with meting.stap("inlezen"):
+        ruw = pd.read_excel(pad)
+    with meting.stap("normaliseren"):
+        return normaliseer_mens(ruw)
+
+
+# --------------------
+# INLEZEN ROBOTDATA (JSON)
+# --------------------
+def normaliseer_robot(df_robot):
+    return _op_datum(met_foutvlag(toepassen(df_robot, SCHEMA_ROBOT)), "Time_Picked")
+
+
+def laad_robot(pad):
+    # Het log wordt record voor record gelezen en in getypeerde batches omgezet
+    # (zie logstream.py); robot_kpis() vouwt diezelfde batches direct tot KPI's
+    # (--check-stroom)
+    with meting.stap("inlezen"):
+        ruw = lees_robot_log(pad)
+    with meting.stap("normaliseren"):
+        return normaliseer_robot(ruw)
+
+
+# --------------------
+# MEERDERE BESTANDEN
+# --------------------
+# Een bron in config.py mag één bestand zijn, maar ook een map of een glob
+# (bijv. "logs/robot-*.json"). Elk bestand wordt apart ingelezen en gecached;
+# bestanden die nog niet in de cache staan worden parallel in een procespool
+# geparsed. Daarna worden de delen samengevoegd en telt een order die in
+# meer bestanden staat één keer (het laatste bestand op naam wint). Foutregels
+# van de robot hergebruiken hun Order_ID (ERR001 begint per storing opnieuw),
+# dus bij de robot horen Server en picktijd bij de sleutel.
+
+PATRONEN = {"mens": ("*.xlsx",), "robot": ("*.json", "*.ndjson")}
+SLEUTELS = {"mens": ["Order_ID"], "robot": ["Server", "Order_ID", "Time_Picked"]}
+SCHEMAS = {"mens": SCHEMA_MENS, "robot": SCHEMA_ROBOT}
+TIJDKOLOMMEN = {"mens": "Time_Order", "robot": "Time_Picked"}
+LADERS = {"mens": laad_mens, "robot": laad_robot}
+
+
+def bestanden(bron, naam):
+    # Eén bestand, een map of een glob -> gesorteerde lijst met bestanden
+    if os.path.isdir(bron):
+        paden = [pad for patroon in PATRONEN[naam] for pad in glob.glob(os.path.join(bron, patroon))]
+    elif glob.has_magic(bron):
+        paden = glob.glob(bron)
+    else:
+        return [bron]
+    if not paden:
+        raise FileNotFoundError(f"Geen bestanden voor {naam} gevonden in '{bron}'")
+    return sorted(paden)
+
+
+def versie(bron, naam):
+    # Verandert zodra een bestand wijzigt, verdwijnt of erbij komt (cache-sleutel dashboard)
+    return tuple((pad, os.path.getmtime(pad)) for pad in bestanden(bron, naam))
+
+
+def _inlezen(pad, naam):
+    return herstel(gecached(pad, LADERS[naam], naam), SCHEMAS[naam])
+
+
+def inlezen(paden, naam, max_workers=None):
+    # Gecachte bestanden zijn snel gelezen; alleen de rest gaat naar de pool
+    nieuw = [pad for pad in paden if not os.path.exists(cache_pad(pad, naam))]
+    workers = min(len(nieuw), max_workers or os.cpu_count() or 1)
+    delen = {}
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            delen = dict(zip(nieuw, pool.map(partial(_inlezen, naam=naam), nieuw)))
+    return [delen[pad] if pad in delen else _inlezen(pad, naam) for pad in paden]
+
+
+def samenvoegen(delen, naam):
+    if len(delen) == 1:
+        return delen[0]
+    # Elk bestand heeft zijn eigen categorieën: eerst gelijktrekken, anders wordt het object
+    for kolom in [kolom for kolom, dtype in SCHEMAS[naam].items() if dtype == "category"]:
+        alle = union_categoricals([deel[kolom] for deel in delen]).categories
+        delen = [deel.assign(**{kolom: deel[kolom].cat.set_categories(alle)}) for deel in delen]
+    df = pd.concat(delen, ignore_index=True)
+    df = df.drop_duplicates(SLEUTELS[naam], keep="last")
+    return _op_datum(df, TIJDKOLOMMEN[naam])
+
+
+def laad_bron(bron, naam, max_workers=None):
+    delen = inlezen(bestanden(bron, naam), naam, max_workers)
+    with meting.stap("samenvoegen"):
+        return _datumindex(samenvoegen(delen, naam))
+
+
+# --------------------
+# LUI LADEN
+# --------------------
+# Er wordt pas iets gelezen als een bron voor het eerst nodig is; daarna
+# blijft het frame in het geheugen. De Parquet-cache maakt de eerste keer
+# goedkoop zolang het bronbestand niet wijzigt (de index wordt daar niet in
+# bewaard en na het lezen opnieuw gezet). De frames worden gedeeld, dus
+# KPI-functies mogen ze alleen lezen. Zonder pad geldt de bron uit config.py.
+
+@lru_cache(maxsize=None)
+@meting.gemeten("laden_mens")
+def df_mens(pad=None):
+    return laad_bron(pad or config.bestand_excel, "mens")
+
+
+@lru_cache(maxsize=None)
+@meting.gemeten("laden_robot")
+def df_robot(pad=None):
+    return laad_bron(pad or config.bestand_robot, "robot")
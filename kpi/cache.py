@@ -0,0 +1,58 @@
+import hashlib
+import os
+
+import pandas as pd
+
+
+# --------------------
+# CACHE VOOR INGELEZEN DATA
+# --------------------
+# Ingelezen en genormaliseerde DataFrames worden als Parquet-bestand bewaard.
+# De sleutel bestaat uit het pad, de grootte en de mtime van het bronbestand,
+# dus zodra de bron wijzigt wordt de cache vanzelf opnieuw opgebouwd. Verhoog
+# CACHE_VERSIE als de normalisatie in bronnen.py verandert.
+
+CACHE_MAP = ".kpi_cache"
+CACHE_VERSIE = 4
+
+
+def _hash(tekst):
+    return hashlib.sha1(tekst.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_pad(pad, naam, cache_map=CACHE_MAP):
+    bron = os.path.abspath(pad)
+    stat = os.stat(bron)
+    sleutel = f"{bron}|{stat.st_size}|{stat.st_mtime_ns}|{CACHE_VERSIE}"
+    return os.path.join(cache_map, f"{naam}-{_hash(bron)}-{_hash(sleutel)}.parquet")
+
+
+def gecached(pad, lader, naam, cache_map=CACHE_MAP):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        # Zonder pyarrow geen Parquet: gewoon elke keer inlezen
+        return lader(pad)
+
+    doel = cache_pad(pad, naam, cache_map)
+    if os.path.exists(doel):
+        return pd.read_parquet(doel)
+
+    df = lader(pad)
+
+    # Atomair schrijven, zodat een afgebroken run geen halve cache achterlaat
+    os.makedirs(cache_map, exist_ok=True)
+    tijdelijk = f"{doel}.{os.getpid()}.tmp"
+    df.to_parquet(tijdelijk, index=False)
+    os.replace(tijdelijk, doel)
+    _opruimen(doel)
+    return df
+
+
+def _opruimen(doel):
+    # Oude versies van dezelfde bron verwijderen
+    map_, bestand = os.path.split(doel)
+    prefix = bestand.rsplit("-", 1)[0] + "-"
+    for oud in os.listdir(map_):
+        if oud.startswith(prefix) and oud != bestand and oud.endswith(".parquet"):
+            os.remove(os.path.join(map_, oud))
@@ -0,0 +1,395 @@
+import argparse
+import sys
+import time
+from functools import partial
+
+import pandas as pd
+
+from . import bronnen, config, meting, rollup, runner, schema, schets
+from .downtime import beschikbaarheid_robot
+from .filters import actief, domein, tijdlijn
+from .kpis import (kpi_beschikbaarheid_mens, kpi_bezorgsnelheid, kpi_bezorgtijd_percentielen,
+                   kpi_fouten_per_dag, kpi_klanttevredenheid_jong, kpi_kosten_per_dag, kpi_orders_per_uur,
+                   kpi_per_server)
+
+
+# --------------------
+# RAPPORT
+# --------------------
+def rapport(res, details):
+    per_server, per_dag, storingen = details
+
+    print("\n📊 KPI: Klanttevredenheid jonge klanten (≤ 45 jaar)")
+    print("Mens:", res["score_mens"])
+    print("Robot:", res["score_robot"])
+
+    print("\n📊 KPI: Aantal fouten per dag (< 6 beoordeling)")
+    print("Mens:\n", res["fouten_mens"].to_string())
+    print("Robot:\n", res["fouten_robot"].to_string())
+
+    print("\n📊 KPI: Gemiddelde bezorgtijd in seconden")
+    print("Mens:", res["bezorgtijd_mens"])
+    print("Robot:", res["bezorgtijd_robot"])
+
+    print("\n📊 KPI: Bezorgtijd percentielen in seconden (schatting, ±1%)")
+    for bron in ("mens", "robot"):
+        waarden = "  ".join(f"{p}: {res[f'bezorgtijd_{p}_{bron}']:.1f}" for p in ("p50", "p90", "p99"))
+        print(f"{bron.capitalize()}: {waarden}")
+
+    print("\n📊 KPI: Aantal orders per uur (gemiddeld per dag)")
+    print("Mens (gem. per dag):\n", res["orders_mens"].round(2).to_string())
+    print("Robot (gem. per dag):\n", res["orders_robot"].round(2).to_string())
+
+    print("\n📊 KPI: Kosten per dag")
+    print("Mens:")
+    print(res["kosten_mens"].apply(lambda x: f"€{x:.2f}").to_string())
+    print("Robot:")
+    print(res["kosten_robot"].apply(lambda x: f"€{x:.2f}").to_string())
+
+    print("\n📊 KPI's per server")
+    print("Mens:\n", res["per_server_mens"].round(2).to_string())
+    print("Robot:\n", res["per_server_robot"].round(2).to_string())
+
+    print(f"\n📊 KPI: Beschikbaarheid personeel")
+    print(f"Mens: {res['beschikbaarheid_mens']:.2f}%")
+    print(f"Robot: {res['beschikbaarheid_robot']:.2f}%")
+    print("Robot per server:\n", per_server.apply(lambda x: f"{x:.2f}%").to_string())
+    print("Robot per dag:\n", per_dag["Beschikbaarheid"].apply(lambda x: f"{x:.2f}%").to_string())
+    print("Storingen:\n", storingen[["Server", "Start", "Einde", "Duur", "Aantal_fouten"]].to_string(index=False))
+
+
+# --------------------
+# BEREKENEN
+# --------------------
+def bereken_kpis(df_mens, df_robot, modus="uit", max_workers=None, toon=True, **filters):
+    # De KPI's zijn onafhankelijk van elkaar en lezen alleen de frames; toon=False
+    # voor gebruik op de achtergrond (planner.py), zonder rapport op het scherm
+    taken = {
+        "klanttevredenheid": (partial(kpi_klanttevredenheid_jong, **filters), (df_mens, df_robot)),
+        "fouten_per_dag": (partial(kpi_fouten_per_dag, **filters), (df_mens, df_robot)),
+        "bezorgsnelheid": (partial(kpi_bezorgsnelheid, **filters), (df_mens, df_robot)),
+        "percentielen": (partial(kpi_bezorgtijd_percentielen, **filters), (df_mens, df_robot)),
+        "orders_per_uur": (partial(kpi_orders_per_uur, **filters), (df_mens, df_robot)),
+        "kosten_per_dag": (partial(kpi_kosten_per_dag, **filters), (df_mens, df_robot)),
+        "per_server": (partial(kpi_per_server, **filters), (df_mens, df_robot)),
+        "beschikbaarheid_mens": (kpi_beschikbaarheid_mens, (config.bestand_beschikbaarheid,)),
+        "beschikbaarheid_robot": (beschikbaarheid_robot, (tijdlijn(df_robot, **filters),)),
+    }
+
+    # De KPI's per dag en per uur komen uit de rollup-kubus en de percentielen
+    # uit de dagschetsen (één scan over de orders), behalve bij filters op
+    # tafel of leeftijd. Kubus en schetsen gaan mee in res["bijlagen"], zodat
+    # schrijf_resultaten ze niet opnieuw hoeft te bouwen.
+    tijden, bijlagen = {}, None
+    if rollup.past(filters):
+        begin = time.perf_counter()
+        kubus = rollup.bouw(df_mens, df_robot)
+        tijden["rollup"] = time.perf_counter() - begin
+        begin = time.perf_counter()
+        dagschetsen = schets.bouw(df_mens, df_robot)
+        tijden["schetsen"] = time.perf_counter() - begin
+        bijlagen = {"kubus": kubus, "schetsen": dagschetsen}
+        taken["fouten_per_dag"] = (partial(rollup.fouten_per_dag, **filters), (kubus,))
+        taken["orders_per_uur"] = (partial(rollup.orders_per_uur, **filters), (kubus,))
+        taken["kosten_per_dag"] = (partial(rollup.kosten_per_dag, **filters), (kubus,))
+        taken["per_server"] = (partial(rollup.per_server, **filters), (kubus,))
+        taken["percentielen"] = (partial(kpi_bezorgtijd_percentielen, dagschetsen=dagschetsen, **filters),
+                                 (df_mens, df_robot))
+
+    uitkomst, kpi_tijden = runner.voer_uit(taken, modus, max_workers)
+    tijden.update(kpi_tijden)
+    tijden["totaal"] += tijden.get("rollup", 0) + tijden.get("schetsen", 0)
+    meting.voeg_toe({naam: seconden for naam, seconden in tijden.items() if naam != "totaal"})
+
+    # Klanttevredenheid
+    score_mens, score_robot = uitkomst["klanttevredenheid"]
+
+    # Fouten per dag
+    fouten_mens, fouten_robot = uitkomst["fouten_per_dag"]
+
+    # Bezorgtijd
+    mens_bz, robot_bz = uitkomst["bezorgsnelheid"]
+    percentielen_mens, percentielen_robot = uitkomst["percentielen"]
+
+    # Orders per uur
+    orders_mens, orders_robot = uitkomst["orders_per_uur"]
+
+    # Kosten per dag
+    kosten_mens, kosten_robot = uitkomst["kosten_per_dag"]
+
+    # Uitsplitsing per server
+    per_server_mens, per_server_robot = uitkomst["per_server"]
+
+    #Beschikbaarheid van bedienend personeel
+    beschikbaarheid_mens = uitkomst["beschikbaarheid_mens"]
+    beschikbaarheid_robot_totaal, *details = uitkomst["beschikbaarheid_robot"]
+
+    res = {
+        "score_mens": score_mens,
+        "score_robot": score_robot,
+        "bezorgtijd_mens": mens_bz,
+        "bezorgtijd_robot": robot_bz,
+        **{f"bezorgtijd_{p}_mens": waarde for p, waarde in percentielen_mens.items()},
+        **{f"bezorgtijd_{p}_robot": waarde for p, waarde in percentielen_robot.items()},
+        "fouten_mens": fouten_mens,
+        "fouten_robot": fouten_robot,
+        "orders_mens": orders_mens,
+        "orders_robot": orders_robot,
+        "kosten_mens": kosten_mens,
+        "kosten_robot": kosten_robot,
+        "per_server_mens": per_server_mens,
+        "per_server_robot": per_server_robot,
+        "beschikbaarheid_mens": beschikbaarheid_mens,
+        "beschikbaarheid_robot": beschikbaarheid_robot_totaal,
+    }
+    if toon:
+        rapport(res, details)
+        runner.print_tijden(tijden, modus)
+    if bijlagen is not None:
+        res["bijlagen"] = bijlagen
+    return res
+
+
+def bereken_incrementeel(df_mens, df_robot):
+    from . import incremental
+
+    state, bijgewerkt = incremental.bijwerken(df_mens, df_robot)
+    for bron, (gewijzigd, totaal) in bijgewerkt.items():
+        print(f"🔁 {bron}: {gewijzigd} van {totaal} dagen herberekend")
+    return incremental.resultaten(state, config.bestand_beschikbaarheid, config.fouten_start, config.fouten_eind)
+
+
+def _engine():
+    from . import database
+
+    # KPI_DATABASE_URL overschrijft deze instellingen (bijv. sqlite:///kpi.db)
+    url = database.database_url(config.host, config.port, config.database_naam, config.user, config.password)
+    return database.maak_engine(url)
+
+
+def _terug_naar_pandas(fout):
+    print(f"⚠️ SQL-backend niet beschikbaar ({type(fout).__name__}), terug naar pandas")
+    return bereken_kpis(bronnen.df_mens(), bronnen.df_robot())
+
+
+def bereken_sql():
+    # KPI's als GROUP BY-query in de database; lukt dat niet, dan pandas. Beide
+    # geven dezelfde sleutels en hetzelfde rapport. SQLAlchemy wordt pas hier
+    # geïmporteerd, alleen --backend sql heeft het nodig.
+    try:
+        from sqlalchemy.exc import SQLAlchemyError
+
+        from . import kpi_sql
+    except ImportError as fout:
+        return _terug_naar_pandas(fout)
+    try:
+        res, details = kpi_sql.bereken(_engine(), config.bestand_beschikbaarheid,
+                                       start=config.fouten_start, eind=config.fouten_eind)
+    except (SQLAlchemyError, ImportError) as fout:
+        return _terug_naar_pandas(fout)
+
+    # De percentielen uit de dagschetsen; die heeft de momentopname toch nodig
+    df_mens, df_robot = bronnen.df_mens(), bronnen.df_robot()
+    dagschetsen = schets.bouw(df_mens, df_robot)
+    percentielen = kpi_bezorgtijd_percentielen(df_mens, df_robot, dagschetsen=dagschetsen)
+    for bron, waarden in zip(("mens", "robot"), percentielen):
+        res.update({f"bezorgtijd_{p}_{bron}": waarde for p, waarde in waarden.items()})
+    res["bijlagen"] = {"schetsen": dagschetsen}
+    rapport(res, details)
+    return res
+
+
+def _rijen():
+    # Aantal rijen per bron, alleen voor bronnen die in deze run geladen zijn
+    laders = {"mens": bronnen.df_mens, "robot": bronnen.df_robot}
+    return {naam: len(lader()) for naam, lader in laders.items() if lader.cache_info().currsize}
+
+
+def geheugen_rapport():
+    # Zoals de bronnen binnenkomen (Excel, records uit het log) tegenover de getypeerde frames
+    from .logstream import iter_records
+
+    ruw_mens = pd.concat([pd.read_excel(pad) for pad in bronnen.bestanden(config.bestand_excel, "mens")])
+    ruw_robot = pd.DataFrame([record for pad in bronnen.bestanden(config.bestand_robot, "robot")
+                              for record in iter_records(pad)])
+    schema.geheugenrapport("mens", ruw_mens, bronnen.df_mens())
+    schema.geheugenrapport("robot", ruw_robot, bronnen.df_robot())
+
+
+def verschillen(a, b):
+    # Alle KPI's uit beide uitkomsten (de bijlagen zijn geen KPI); een KPI die maar aan één kant bestaat wijkt af.
+    # Het type van de index telt niet (Uur is int8 in de kubus, int32 in de state).
+    afwijkend = []
+    for naam in sorted((a.keys() | b.keys()) - {"bijlagen"}):
+        if naam not in a or naam not in b:
+            afwijkend.append(naam)
+            continue
+        try:
+            if isinstance(a[naam], pd.DataFrame):
+                pd.testing.assert_frame_equal(a[naam], b[naam], check_index_type=False)
+            elif isinstance(a[naam], pd.Series):
+                pd.testing.assert_series_equal(a[naam], b[naam], check_index_type=False)
+            elif not (a[naam] == b[naam] or (pd.isna(a[naam]) and pd.isna(b[naam]))):
+                afwijkend.append(naam)
+        except AssertionError:
+            afwijkend.append(naam)
+    return afwijkend
+
+
+@meting.gemeten("schrijven")
+def schrijf_resultaten(res, **metadata):
+    # ✅ Resultaten voor het dashboard in één Arrow-bestand (atomair, zie resultaten.py),
+    # met alles wat het dashboard zonder filters nodig heeft: de keuzes voor de
+    # filters, de rollup-kubus en de bezorgtijd-schetsen. Zo rekent het
+    # dashboard niets en leest het nooit een half geschreven bronbestand.
+    # Kubus en schetsen komen uit res["bijlagen"] als de berekening ze al had
+    # (de SQL-backend heeft alleen de schetsen).
+    from . import resultaten
+
+    res = dict(res)
+    bijlagen = dict(res.pop("bijlagen", {}))
+    df_mens, df_robot = bronnen.df_mens(), bronnen.df_robot()
+    if "kubus" not in bijlagen:
+        bijlagen["kubus"] = rollup.bouw(df_mens, df_robot)
+    if "schetsen" not in bijlagen:
+        bijlagen["schetsen"] = schets.bouw(df_mens, df_robot)
+    return resultaten.schrijf(res, bijlagen=bijlagen, domein=domein(df_mens, df_robot),
+                              bronnen={"mens": config.bestand_excel, "robot": config.bestand_robot}, **metadata)
+
+
+# --------------------
+# MAIN
+# --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m kpi", description="KPI's berekenen voor het dashboard")
+    parser.add_argument("--incrementeel", action="store_true",
+                        help="alleen nieuwe of gewijzigde dagen herberekenen (state in .kpi_state/)")
+    parser.add_argument("--check", action="store_true",
+                        help="incrementeel resultaat vergelijken met een volledige herberekening")
+    parser.add_argument("--backend", choices=["pandas", "sql"], default="pandas",
+                        help="KPI's in pandas berekenen of als query in de database")
+    parser.add_argument("--check-sql", action="store_true",
+                        help="SQL-backend (SQLite in het geheugen) vergelijken met pandas")
+    parser.add_argument("--check-stroom", action="store_true",
+                        help="robot-KPI's uit één doorloop over het robotlog (logstream.py) vergelijken met pandas")
+    parser.add_argument("--parallel", choices=["uit", "thread", "proces"], default="uit",
+                        help="KPI's na elkaar (standaard), in threads of in processen uitvoeren")
+    parser.add_argument("--workers", type=int, default=None, help="aantal threads/processen")
+    parser.add_argument("--database", action="store_true",
+                        help="orders en KPI-resultaten ook in de database opslaan (upsert)")
+    parser.add_argument("--mens", help="Excel-bestand, map of glob met menselijke orders (standaard uit config.py)")
+    parser.add_argument("--robot", help="robotlog, map of glob, bijv. 'logs/*.json' (standaard uit config.py)")
+    parser.add_argument("--geheugen", action="store_true",
+                        help="geheugengebruik per kolom voor en na het typeren tonen")
+    parser.add_argument("--profiel", action="store_true",
+                        help="de run onder cProfile draaien (traagste functies in het rapport); "
+                             "de KPI's draaien dan na elkaar (--parallel uit)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="piekgeheugen per stap meten (trager)")
+    filtergroep = parser.add_argument_group("filters (alleen met de pandas-backend)")
+    filtergroep.add_argument("--start", help="eerste dag, bijv. 2025-04-28 (fouten: standaard 2025-04-22)")
+    filtergroep.add_argument("--eind", help="laatste dag (fouten: standaard 2025-05-05)")
+    filtergroep.add_argument("--server", action="append", dest="servers", help="alleen deze server (herhaalbaar)")
+    filtergroep.add_argument("--tafel", action="append", type=int, dest="tafels", help="alleen deze tafel (herhaalbaar)")
+    filtergroep.add_argument("--leeftijd", nargs=2, type=int, metavar=("VAN", "TOT"), help="leeftijdsgroep")
+    args = parser.parse_args(argv)
+    if args.mens:
+        config.bestand_excel = args.mens
+    if args.robot:
+        config.bestand_robot = args.robot
+    if args.profiel:
+        # cProfile ziet alleen de eigen thread; in threads of processen blijven de KPI's onzichtbaar
+        args.parallel = "uit"
+
+    filters = {naam: getattr(args, naam) for naam in ("start", "eind", "servers", "tafels", "leeftijd")}
+    filters = {naam: waarde for naam, waarde in filters.items() if waarde is not None}
+    if actief(filters) and (args.incrementeel or args.check or args.backend == "sql" or args.check_sql
+                            or args.check_stroom or args.database):
+        parser.error("filters werken alleen met de pandas-backend, "
+                     "niet met --incrementeel/--check/--backend sql/--check-stroom/--database")
+    if args.check_stroom and len(bronnen.bestanden(config.bestand_robot, "robot")) != 1:
+        # Dubbele orders over bestanden heen vallen pas weg bij het samenvoegen (bronnen.py)
+        parser.error("--check-stroom werkt met één robotlog")
+
+    with meting.Meter(geheugen=args.tracemalloc, profiel=args.profiel) as meter:
+        res = uitvoeren(args, filters)
+    rapport = meter.rapport(argv=sys.argv[1:] if argv is None else list(argv), rijen=_rijen())
+    meting.print_rapport(rapport)
+
+    if actief(filters):
+        # Een gefilterde run is een losse analyse: de resultaten voor het dashboard blijven staan
+        print("\nℹ️ Gefilterde run: resultaten niet weggeschreven")
+        return res
+    print(f"📝 Runrapport: {meting.schrijf_rapport(rapport)}")
+    return res
+
+
+def uitvoeren(args, filters):
+    if args.geheugen:
+        geheugen_rapport()
+
+    if args.database:
+        from . import database
+
+        # Eerst de orders laden, zodat --backend sql de nieuwste data ziet
+        engine = _engine()
+        database.maak_tabellen(engine)
+        df_mens, df_robot = bronnen.df_mens(), bronnen.df_robot()
+        with meting.stap("database_orders"):
+            aantal_mens, aantal_robot = database.laad_orders(engine, df_mens, df_robot)
+        print(f"🗄️ Database bijgewerkt: {aantal_mens} orders mens, {aantal_robot} orders robot")
+
+    if args.incrementeel or args.check:
+        df_mens, df_robot = bronnen.df_mens(), bronnen.df_robot()
+        with meting.stap("incrementeel"):
+            res = bereken_incrementeel(df_mens, df_robot)
+    elif args.backend == "sql":
+        with meting.stap("sql"):
+            res = bereken_sql()
+    else:
+        df_mens, df_robot = bronnen.df_mens(), bronnen.df_robot()
+        with meting.stap("kpis"):
+            res = bereken_kpis(df_mens, df_robot, args.parallel, args.workers, **filters)
+
+    if args.check:
+        with meting.stap("check"):
+            volledig = bereken_kpis(bronnen.df_mens(), bronnen.df_robot(), args.parallel, args.workers)
+        afwijkend = verschillen(res, volledig)
+        if afwijkend:
+            print("❌ Incrementeel wijkt af van volledige herberekening:", ", ".join(afwijkend))
+            sys.exit(1)
+        print("\n✅ Incrementeel resultaat is gelijk aan een volledige herberekening")
+
+    if args.check_sql:
+        from . import kpi_sql
+
+        with meting.stap("check_sql"):
+            volledig = bereken_kpis(bronnen.df_mens(), bronnen.df_robot(), args.parallel, args.workers)
+            afwijkend = kpi_sql.controleer(bronnen.df_mens(), bronnen.df_robot(), volledig,
+                                           config.bestand_beschikbaarheid)
+        if afwijkend:
+            print("❌ SQL-backend wijkt af van pandas:", ", ".join(afwijkend))
+            sys.exit(1)
+        print("\n✅ SQL-backend geeft dezelfde KPI's als pandas")
+
+    if args.check_stroom:
+        from .logstream import robot_kpis
+
+        with meting.stap("check_stroom"):
+            volledig = bereken_kpis(bronnen.df_mens(), bronnen.df_robot(), args.parallel, args.workers)
+            stroom = robot_kpis(config.bestand_robot)
+        afwijkend = verschillen(stroom, {naam: volledig[naam] for naam in stroom})
+        if afwijkend:
+            print("❌ Gestreamd robotlog wijkt af van pandas:", ", ".join(afwijkend))
+            sys.exit(1)
+        print("\n✅ Gestreamd robotlog geeft dezelfde robot-KPI's als pandas")
+
+    if actief(filters):
+        return res
+
+    schrijf_resultaten(res, backend="incrementeel" if args.incrementeel or args.check else args.backend)
+
+    if args.database:
+        with meting.stap("database_resultaten"):
+            database.laad_resultaten(engine, res)
+    return res
@@ -0,0 +1,28 @@
+# --------------------
+# CONFIGURATIE
+# --------------------
+# Een bron mag ook een map of glob zijn, bijv. "logs/robot-*.json" (zie bronnen.py)
+bestand_excel = "besteldata.xlsx"
+bestand_robot = "robot_restaurant_log.json"
+bestand_beschikbaarheid = "KPI 6 - Beschikbaarheid(in).csv"
+
+# Filter fouten op alleen april t/m begin mei 2025
+fouten_start = "2025-04-22"
+fouten_eind = "2025-05-05"
+
+FOUT_GRENS = 6
+MAX_LEEFTIJD = 45
+PRIJS_KWH = 0.32
+
+# Dummydata voor kostenberekening personeel
+# (€500.000 / (20 medewerkers × 250 dagen) ≈ €100 per dag per medewerker)
+# 6 uur × €15/u = €90 per order
+UREN = 6
+UURTARIEF = 15
+VASTE_KOSTEN_ROBOT = 695
+
+host = "localhost"
+port = 3306
+database_naam = "hr"
+user = "kpidashboard"
+password = "mand"
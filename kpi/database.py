@@ -0,0 +1,200 @@
+import os
+
+import pandas as pd
+from sqlalchemy import Column, Date, DateTime, Float, Integer, MetaData, String, Table, create_engine
+
+from .config import UREN, UURTARIEF
+
+
+# --------------------
+# DATABASE
+# --------------------
+# Genormaliseerde orders van mens en robot komen samen in één tabel `orders`
+# (sleutel: bron + Order_ID + volgnummer), de KPI-resultaten in drie kleine tabellen. Alle
+# schrijfacties zijn upserts in batches; van de KPI-resultaten gaan eerst de
+# oude rijen per kpi/bron weg. Een run opnieuw draaien is dus idempotent.
+# Met KPI_DATABASE_URL=sqlite:///kpi.db werkt alles offline.
+
+BATCH_GROOTTE = 5_000
+
+metadata = MetaData()
+
+orders = Table(
+    "orders", metadata,
+    Column("bron", String(8), primary_key=True),
+    Column("order_id", String(32), primary_key=True),
+    # Order_ID is niet uniek in het robotlog: de ERR-nummers beginnen bij
+    # elke storing opnieuw. volgnr telt herhalingen in volgorde van het log.
+    Column("volgnr", Integer, primary_key=True),
+    Column("datum", Date, index=True),
+    Column("tijd_order", DateTime),
+    Column("tijd_start", DateTime),
+    Column("tijd_bezorging", DateTime),
+    Column("server", String(32)),
+    Column("tafel", String(16)),
+    Column("rating", Float),
+    Column("bedrag", Float),
+    Column("leeftijd", Integer),
+    Column("uren", Float),
+    Column("uurtarief", Float),
+    Column("kwh", Float),
+    Column("error_code", String(128)),
+)
+
+kpi_totaal = Table(
+    "kpi_totaal", metadata,
+    Column("kpi", String(32), primary_key=True),
+    Column("bron", String(8), primary_key=True),
+    Column("waarde", Float),
+)
+
+kpi_per_dag = Table(
+    "kpi_per_dag", metadata,
+    Column("kpi", String(32), primary_key=True),
+    Column("bron", String(8), primary_key=True),
+    Column("datum", Date, primary_key=True),
+    Column("waarde", Float),
+)
+
+kpi_per_uur = Table(
+    "kpi_per_uur", metadata,
+    Column("kpi", String(32), primary_key=True),
+    Column("bron", String(8), primary_key=True),
+    Column("uur", Integer, primary_key=True),
+    Column("waarde", Float),
+)
+
+
+def database_url(host, port, database, user, password):
+    # Omgevingsvariabele gaat voor, zodat tests/offline runs SQLite kunnen gebruiken
+    return os.environ.get(
+        "KPI_DATABASE_URL",
+        f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}",
+    )
+
+
+def maak_engine(url):
+    if url.startswith("sqlite"):
+        return create_engine(url)
+    # Verbindingen hergebruiken; pre_ping vangt door MySQL gesloten verbindingen af
+    return create_engine(url, pool_size=5, max_overflow=10, pool_pre_ping=True, pool_recycle=3600)
+
+
+def maak_tabellen(engine):
+    metadata.create_all(engine)
+
+
+# --------------------
+# UPSERTS
+# --------------------
+def _upsert(engine, tabel, rijen, vervang=()):
+    # vervang: (kpi, bron)-paren waarvan eerst alle rijen weg moeten
+    sleutels = [kolom.name for kolom in tabel.primary_key.columns]
+    overige = [kolom.name for kolom in tabel.columns if kolom.name not in sleutels]
+
+    if engine.dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(tabel)
+        stmt = stmt.on_duplicate_key_update({k: stmt.inserted[k] for k in overige})
+    elif engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(tabel)
+        stmt = stmt.on_conflict_do_update(index_elements=sleutels, set_={k: stmt.excluded[k] for k in overige})
+    else:
+        raise ValueError(f"Geen upsert voor database '{engine.dialect.name}'")
+
+    # executemany in batches binnen één transactie
+    with engine.begin() as conn:
+        for kpi, bron in vervang:
+            conn.execute(tabel.delete().where((tabel.c.kpi == kpi) & (tabel.c.bron == bron)))
+        for i in range(0, len(rijen), BATCH_GROOTTE):
+            conn.execute(stmt, rijen[i:i + BATCH_GROOTTE])
+    return len(rijen)
+
+
+def _rijen(df):
+    # NaN/NaT -> None en numpy/pandas-types -> Python-types voor de DBAPI
+    df = df.astype(object).where(df.notna(), None)
+    rijen = df.to_dict("records")
+    for rij in rijen:
+        for kolom, waarde in rij.items():
+            if isinstance(waarde, pd.Timestamp):
+                rij[kolom] = waarde.to_pydatetime()
+    return rijen
+
+
+def orders_mens_tabel(df_mens):
+    return pd.DataFrame({
+        "bron": "mens",
+        "order_id": df_mens["Order_ID"].astype(str),
+        "volgnr": df_mens.groupby("Order_ID").cumcount(),
+        "datum": df_mens["Date"].dt.date,
+        "tijd_order": df_mens["Time_Order"],
+        "tijd_start": df_mens["Time_Ready"],
+        "tijd_bezorging": df_mens["Time_Delivery"],
+        "server": df_mens["Server"].astype(object),
+        "tafel": df_mens["Table"].astype(object),
+        "rating": df_mens["Rating"].astype(float),
+        "bedrag": df_mens["Total_Amount"],
+        "leeftijd": df_mens["Leeftijd"],
+        "uren": float(UREN),
+        "uurtarief": float(UURTARIEF),
+        "kwh": None,
+        "error_code": None,
+    })
+
+
+def orders_robot_tabel(df_robot):
+    picked = df_robot["Time_Picked"]
+    return pd.DataFrame({
+        "bron": "robot",
+        "order_id": df_robot["Order_ID"].astype(str),
+        "volgnr": df_robot.groupby("Order_ID").cumcount(),
+        "datum": df_robot["Date"].dt.date,
+        "tijd_order": picked,
+        "tijd_start": picked,
+        "tijd_bezorging": df_robot["Time_Delivery"],
+        "server": df_robot["Server"].astype(object),
+        "tafel": df_robot["Table"].astype("Int64").astype(str).where(df_robot["Table"].notna()),
+        "rating": df_robot["Rating"],
+        "bedrag": df_robot["Total_Amount"],
+        "leeftijd": df_robot["Age"],
+        "uren": None,
+        "uurtarief": None,
+        "kwh": df_robot["Power consumption"],
+        "error_code": df_robot["Error_code"].astype(object),
+    })
+
+
+def laad_orders(engine, df_mens, df_robot):
+    mens = _upsert(engine, orders, _rijen(orders_mens_tabel(df_mens)))
+    robot = _upsert(engine, orders, _rijen(orders_robot_tabel(df_robot)))
+    return mens, robot
+
+
+def laad_resultaten(engine, res):
+    # Per kpi/bron worden de bestaande rijen vervangen: een dag of uur die uit
+    # het resultaat verdwijnt (bijv. geen fouten meer) mag niet blijven staan
+    totaal, per_dag, per_uur = [], [], []
+    vervang = {kpi_totaal: set(), kpi_per_dag: set(), kpi_per_uur: set()}
+    for naam, waarde in res.items():
+        if naam == "bijlagen":
+            # Kubus en schetsen voor het dashboard, geen KPI
+            continue
+        kpi, bron = naam.rsplit("_", 1)
+        if isinstance(waarde, pd.DataFrame):
+            # De uitsplitsing per server staat alleen in kpi_resultaten.arrow
+            continue
+        if not isinstance(waarde, pd.Series):
+            totaal.append({"kpi": kpi, "bron": bron, "waarde": float(waarde)})
+            vervang[kpi_totaal].add((kpi, bron))
+        elif kpi == "orders":
+            per_uur += [{"kpi": kpi, "bron": bron, "uur": int(uur), "waarde": float(w)} for uur, w in waarde.items()]
+            vervang[kpi_per_uur].add((kpi, bron))
+        else:
+            per_dag += [{"kpi": kpi, "bron": bron, "datum": d.date(), "waarde": float(w)} for d, w in waarde.items()]
+            vervang[kpi_per_dag].add((kpi, bron))
+
+    _upsert(engine, kpi_totaal, totaal, vervang[kpi_totaal])
+    _upsert(engine, kpi_per_dag, per_dag, vervang[kpi_per_dag])
+    _upsert(engine, kpi_per_uur, per_uur, vervang[kpi_per_uur])
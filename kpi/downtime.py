@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from .schema import foutvlag
+
+
+# --------------------
+# STORINGEN ROBOT
+# --------------------
+# Een storing is een reeks opeenvolgende orders met een Error_code. De storing
+# loopt van de laatste werkende order ervoor tot de eerste werkende order erna,
+# binnen dezelfde robot (Server) en dezelfde dag. De werktijd van een robot op
+# een dag is de tijd tussen de eerste en de laatste werkende order.
+
+def _picktijden(df_robot):
+    # Time_Picked is al een absolute tijd (datum + tijdstip, zie tijden.py)
+    df = pd.DataFrame({
+        "Server": df_robot["Server"].astype(str).to_numpy(),
+        "Date": df_robot["Date"].to_numpy(),
+        "DateTime_Picked": df_robot["Time_Picked"].to_numpy(),
+        "Fout": foutvlag(df_robot).to_numpy(),
+    })
+    df = df.dropna(subset=["Date", "DateTime_Picked"])
+
+    # Eén keer sorteren; alles hierna is lineair
+    return df.sort_values(["Server", "Date", "DateTime_Picked"], kind="stable").reset_index(drop=True)
+
+
+def _groepsgrenzen(df):
+    # Elke (Server, Date) is een aparte groep: storingen lopen nooit over een dag heen
+    nieuw = (df["Server"] != df["Server"].shift()) | (df["Date"] != df["Date"].shift())
+    return nieuw.cumsum().to_numpy()
+
+
+def storingsintervallen(df_robot):
+    return _intervallen(_picktijden(df_robot))
+
+
+def werktijd_per_dag(df_robot):
+    return _werktijd(_picktijden(df_robot))
+
+
+def _intervallen(df):
+    kolommen = ["Server", "Date", "Start", "Einde", "Duur", "Aantal_fouten"]
+    if df.empty:
+        return pd.DataFrame(columns=kolommen)
+
+    groep = _groepsgrenzen(df)
+    fout = df["Fout"].to_numpy()
+    tijd = df["DateTime_Picked"].to_numpy()
+
+    # Opeenvolgende foutregels binnen een groep vormen één run
+    nieuwe_groep = np.r_[True, groep[1:] != groep[:-1]]
+    vorige_fout = np.r_[False, fout[:-1]]
+    run_id = np.cumsum(fout & (~vorige_fout | nieuwe_groep))
+
+    fout_pos = np.flatnonzero(fout)
+    werk_pos = np.flatnonzero(~fout)
+    if fout_pos.size == 0 or werk_pos.size == 0:
+        return pd.DataFrame(columns=kolommen)
+
+    runs = pd.DataFrame({"run": run_id[fout_pos], "pos": fout_pos})
+    grenzen = runs.groupby("run")["pos"].agg(["min", "max", "size"])
+    eerste = grenzen["min"].to_numpy()
+    laatste = grenzen["max"].to_numpy()
+
+    # Dichtstbijzijnde werkende order voor en na elke run via searchsorted
+    i_voor = np.searchsorted(werk_pos, eerste) - 1
+    i_na = np.searchsorted(werk_pos, laatste)
+    geldig = (i_voor >= 0) & (i_na < werk_pos.size)
+    pos_voor = werk_pos[np.clip(i_voor, 0, werk_pos.size - 1)]
+    pos_na = werk_pos[np.clip(i_na, 0, werk_pos.size - 1)]
+    geldig &= (groep[pos_voor] == groep[eerste]) & (groep[pos_na] == groep[eerste])
+
+    start = tijd[pos_voor[geldig]]
+    einde = tijd[pos_na[geldig]]
+    return pd.DataFrame({
+        "Server": df["Server"].to_numpy()[eerste[geldig]],
+        "Date": df["Date"].to_numpy()[eerste[geldig]],
+        "Start": start,
+        "Einde": einde,
+        "Duur": einde - start,
+        "Aantal_fouten": grenzen["size"].to_numpy()[geldig],
+    }, columns=kolommen)
+
+
+def _werktijd(df):
+    werk = df[~df["Fout"]]
+    tijden = werk.groupby(["Server", "Date"])["DateTime_Picked"].agg(["min", "max"])
+    return (tijden["max"] - tijden["min"]).rename("Werktijd")
+
+
+def beschikbaarheid_robot(df_robot):
+    # Geeft (totaal %, % per Server, tabel per Server en dag, storingsintervallen)
+    df = _picktijden(df_robot)
+    intervallen = _intervallen(df)
+    werktijd = _werktijd(df)
+
+    storing = intervallen.groupby(["Server", "Date"])["Duur"].sum()
+    per_dag = pd.DataFrame({"Werktijd": werktijd})
+    per_dag["Storingsduur"] = storing.astype("timedelta64[ns]").reindex(per_dag.index, fill_value=pd.Timedelta(0))
+    per_dag["Beschikbaarheid"] = _percentage(per_dag["Storingsduur"], per_dag["Werktijd"])
+
+    totaal, per_server = samenvatten(per_dag)
+    return totaal, per_server, per_dag, intervallen
+
+
+def samenvatten(per_dag):
+    # Totaal en per Server uit de tabel per (Server, Date); dagen zijn onafhankelijk
+    per_server = per_dag.groupby(level="Server")[["Werktijd", "Storingsduur"]].sum()
+    per_server = _percentage(per_server["Storingsduur"], per_server["Werktijd"])
+
+    totaal = _percentage(per_dag["Storingsduur"].sum(), per_dag["Werktijd"].sum())
+    return totaal, per_server
+
+
+def _percentage(storing, werktijd):
+    # Dagen zonder werktijd (één order) tellen niet mee
+    if isinstance(werktijd, pd.Series):
+        werktijd = werktijd.where(werktijd > pd.Timedelta(0))
+        return ((1 - storing / werktijd) * 100).round(2)
+    if werktijd <= pd.Timedelta(0):
+        return float("nan")
+    return round((1 - storing / werktijd) * 100, 2)
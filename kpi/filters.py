@@ -0,0 +1,80 @@
+import pandas as pd
+
+
+# --------------------
+# PERIODE EN FILTERS
+# --------------------
+# De frames uit bronnen.py zijn op datum gesorteerd en hebben de datum als
+# DatetimeIndex, dus een periode kiezen is een slice (binair zoeken) in plaats
+# van een masker over alle rijen. Server, tafel en leeftijd worden daarna
+# alleen op die slice toegepast. Alle KPI-functies in kpis.py nemen dezelfde
+# filters aan: start, eind, servers, tafels en leeftijd (laag, hoog).
+
+LEEFTIJD_KOLOM = {"mens": "Leeftijd", "robot": "Age"}
+
+
+def periode(df, start=None, eind=None):
+    if start is None and eind is None:
+        return df
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.is_monotonic_increasing:
+        # Zoals bij .loc op een datumindex telt de einddatum als hele dag
+        return df.loc[start:eind]
+    # Niet op datum geïndexeerd (bijv. een losse batch): dan toch een masker
+    datum = df["Date"]
+    masker = pd.Series(True, index=df.index)
+    if start is not None:
+        masker &= datum >= pd.Timestamp(start)
+    if eind is not None:
+        masker &= datum < pd.Timestamp(eind).normalize() + pd.Timedelta(days=1)
+    return df[masker]
+
+
+def _tafels(kolom, tafels):
+    # Mens: "Table_9" (categorie), robot: 9 (getal)
+    if pd.api.types.is_numeric_dtype(kolom):
+        return [int(t) for t in tafels]
+    return [f"Table_{t}" for t in tafels] + [str(t) for t in tafels]
+
+
+def filteren(df, start=None, eind=None, servers=None, tafels=None, leeftijd=None, bron="robot"):
+    df = periode(df, start, eind)
+    masker = None
+    if servers:
+        masker = df["Server"].isin(list(servers))
+    if tafels:
+        deel = df["Table"].isin(_tafels(df["Table"], tafels))
+        masker = deel if masker is None else masker & deel
+    if leeftijd is not None:
+        laag, hoog = leeftijd
+        deel = df[LEEFTIJD_KOLOM[bron]].between(laag, hoog)
+        masker = deel if masker is None else masker & deel
+    return df if masker is None else df[masker]
+
+
+def tijdlijn(df, start=None, eind=None, servers=None, tafels=None, leeftijd=None):
+    # Voor de storingen (beschikbaarheid): alleen periode en server. Tafel en
+    # leeftijd horen bij een order; wie die wegfiltert haalt werk- en
+    # foutregels uit de tijdlijn, waardoor storingen verdwijnen of samenvallen.
+    df = periode(df, start, eind)
+    return df[df["Server"].isin(list(servers))] if servers else df
+
+
+def filter_bronnen(df_mens, df_robot, start=None, eind=None, servers=None, tafels=None, leeftijd=None):
+    return (filteren(df_mens, start, eind, servers, tafels, leeftijd, bron="mens"),
+            filteren(df_robot, start, eind, servers, tafels, leeftijd, bron="robot"))
+
+
+def domein(df_mens, df_robot):
+    # Keuzes voor de filters in het dashboard (gaat mee met de resultaten, zie cli.py)
+    return {
+        "eerste": min(df_mens.index.min(), df_robot.index.min()).date().isoformat(),
+        "laatste": max(df_mens.index.max(), df_robot.index.max()).date().isoformat(),
+        "servers": sorted(set(df_mens["Server"].dropna().astype(str)) | set(df_robot["Server"].dropna().astype(str))),
+        "leeftijd": [int(min(df_mens["Leeftijd"].min(), df_robot["Age"].min())),
+                     int(max(df_mens["Leeftijd"].max(), df_robot["Age"].max()))],
+    }
+
+
+def actief(filters):
+    # True als er echt iets gefilterd wordt
+    return any(waarde not in (None, [], (), set()) for waarde in filters.values())
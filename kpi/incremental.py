@@ -0,0 +1,166 @@
+import os
+
+import pandas as pd
+
+from .config import FOUT_GRENS, MAX_LEEFTIJD, UREN, UURTARIEF
+from . import rollup, scenario, schets
+from .downtime import beschikbaarheid_robot, samenvatten
+
+
+# --------------------
+# INCREMENTELE HERBEREKENING
+# --------------------
+# Per bron (mens/robot) en per Date bewaren we deelaggregaten in een
+# state-map. Een vingerafdruk per dag (som van de rij-hashes) bepaalt welke
+# dagen nieuw of gewijzigd zijn; alleen die dagen worden opnieuw berekend en
+# samengevoegd met de bewaarde dagen. De bezorgtijd-percentielen komen uit de
+# bewaarde dagschetsen (schets.py) en de KPI's per server uit de bewaarde
+# rollup-kubus (rollup.py), zonder de orders opnieuw te lezen. Het
+# eindresultaat is gelijk aan een volledige herberekening (zie --check in cli.py).
+
+STATE_MAP = ".kpi_state"
+STATE_VERSIE = 4
+
+# Kolommen per bron: (tijd voor orders per uur, begin bezorging, leeftijd)
+BRONNEN = {
+    "mens": ("Time_Order", "Time_Ready", "Leeftijd"),
+    "robot": ("Time_Picked", "Time_Picked", "Age"),
+}
+TABELLEN = ["vingerafdruk", "dag", "uur", "beschikbaarheid", "schets", "kubus"]
+
+
+def vingerafdrukken(df):
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return hashes.groupby(df["Date"]).sum().rename("Hash")
+
+
+def _dag_aggregaten(df, bron):
+    _, tijd_start, leeftijd = BRONNEN[bron]
+    datum = df["Date"]
+
+    jong = df["Rating"].where(df[leeftijd] <= MAX_LEEFTIJD)
+    bezorgtijd = (df["Time_Delivery"] - df[tijd_start]).dt.total_seconds()
+    if bron == "mens":
+        kosten = pd.Series(UREN * UURTARIEF, index=df.index)
+    else:
+        kosten = df["Power consumption"]
+
+    dag = pd.DataFrame({
+        "Fouten": (df["Rating"] < FOUT_GRENS).groupby(datum).sum(),
+        "Kosten": kosten.groupby(datum).sum(),
+        "Rating_jong_som": jong.groupby(datum).sum(),
+        "Rating_jong_aantal": jong.groupby(datum).count(),
+        "Bezorg_som": bezorgtijd.groupby(datum).sum(),
+        "Bezorg_aantal": bezorgtijd.groupby(datum).count(),
+    })
+    dag[["Rating_jong_som", "Rating_jong_aantal", "Bezorg_som", "Bezorg_aantal"]] = (
+        dag[["Rating_jong_som", "Rating_jong_aantal", "Bezorg_som", "Bezorg_aantal"]].fillna(0)
+    )
+    return dag.rename_axis("Date").reset_index()
+
+
+def _uur_aggregaten(df, bron):
+    tijd_uur = BRONNEN[bron][0]
+    df = df.dropna(subset=[tijd_uur])
+    uur = df.groupby([df["Date"], df[tijd_uur].dt.hour.rename("Uur")])["Order_ID"].nunique()
+    return uur.rename("Orders").reset_index()
+
+
+def _beschikbaarheid_aggregaten(df):
+    per_dag = beschikbaarheid_robot(df)[2]
+    return per_dag[["Werktijd", "Storingsduur"]].reset_index()
+
+
+def _state_pad(state_map, naam):
+    return os.path.join(state_map, f"v{STATE_VERSIE}", f"{naam}.parquet")
+
+
+def laad_state(state_map=STATE_MAP):
+    state = {}
+    for naam in TABELLEN:
+        pad = _state_pad(state_map, naam)
+        state[naam] = pd.read_parquet(pad) if os.path.exists(pad) else None
+    return state
+
+
+def bewaar_state(state, state_map=STATE_MAP):
+    os.makedirs(os.path.dirname(_state_pad(state_map, "x")), exist_ok=True)
+    for naam, tabel in state.items():
+        pad = _state_pad(state_map, naam)
+        tijdelijk = f"{pad}.{os.getpid()}.tmp"
+        tabel.to_parquet(tijdelijk, index=False)
+        os.replace(tijdelijk, pad)
+
+
+def _vervang(oud, nieuw, bron, dagen):
+    # Rijen van de gewijzigde/verdwenen dagen weggooien en de nieuwe toevoegen
+    nieuw = nieuw.assign(Bron=bron)
+    if oud is None:
+        return nieuw
+    weg = (oud["Bron"] == bron) & oud["Date"].isin(dagen)
+    return pd.concat([oud[~weg], nieuw], ignore_index=True)
+
+
+def bijwerken(df_mens, df_robot, state_map=STATE_MAP):
+    state = laad_state(state_map)
+    bijgewerkt = {}
+
+    for bron, df in (("mens", df_mens), ("robot", df_robot)):
+        nieuw = vingerafdrukken(df)
+        oud = state["vingerafdruk"]
+        if oud is not None:
+            oud = oud[oud["Bron"] == bron].set_index("Date")["Hash"]
+        else:
+            oud = pd.Series(dtype="uint64")
+
+        gewijzigd = nieuw.index[nieuw.ne(oud.reindex(nieuw.index))]
+        verdwenen = oud.index.difference(nieuw.index)
+        dagen = gewijzigd.union(verdwenen)
+        bijgewerkt[bron] = (len(gewijzigd), len(nieuw))
+
+        deel = df[df["Date"].isin(gewijzigd)]
+        state["vingerafdruk"] = _vervang(state["vingerafdruk"], nieuw[gewijzigd].reset_index(), bron, dagen)
+        state["dag"] = _vervang(state["dag"], _dag_aggregaten(deel, bron), bron, dagen)
+        state["uur"] = _vervang(state["uur"], _uur_aggregaten(deel, bron), bron, dagen)
+        state["schets"] = schets.voeg_samen(_vervang(state["schets"], schets.bouw_bron(deel, bron), bron, dagen))
+        state["kubus"] = rollup.voeg_samen(_vervang(state["kubus"], rollup.bouw_bron(deel, bron), bron, dagen))
+        if bron == "robot":
+            state["beschikbaarheid"] = _vervang(state["beschikbaarheid"], _beschikbaarheid_aggregaten(deel), bron, dagen)
+
+    bewaar_state(state, state_map)
+    return state, bijgewerkt
+
+
+def resultaten(state, beschikbaarheid_pad, start, end):
+    # Dezelfde uitkomsten als de KPI-functies, maar uit de deelaggregaten
+    res = {}
+    for bron in ("mens", "robot"):
+        dag = state["dag"][state["dag"]["Bron"] == bron].sort_values("Date").set_index("Date")
+        uur = state["uur"][state["uur"]["Bron"] == bron].sort_values(["Date", "Uur"])
+
+        res[f"score_{bron}"] = dag["Rating_jong_som"].sum() / dag["Rating_jong_aantal"].sum()
+        res[f"bezorgtijd_{bron}"] = dag["Bezorg_som"].sum() / dag["Bezorg_aantal"].sum()
+
+        fouten = dag.loc[dag["Fouten"] > 0, "Fouten"].astype("int64")
+        res[f"fouten_{bron}"] = fouten.loc[start:end].rename(None)
+
+        orders = uur.groupby("Uur")["Orders"].mean().rename("Order_ID")
+        res[f"orders_{bron}"] = orders
+
+    percentielen = schets.kwantielen(state["schets"]).reindex(["mens", "robot"])
+    for bron in ("mens", "robot"):
+        for p, waarde in percentielen.loc[bron].items():
+            res[f"bezorgtijd_{p}_{bron}"] = waarde
+
+    res["per_server_mens"], res["per_server_robot"] = rollup.per_server(state["kubus"])
+    res["bijlagen"] = {"kubus": state["kubus"], "schetsen": state["schets"]}
+
+    kosten_mens = state["dag"][state["dag"]["Bron"] == "mens"].sort_values("Date").set_index("Date")["Kosten"]
+    kosten_robot = state["dag"][state["dag"]["Bron"] == "robot"].sort_values("Date").set_index("Date")["Kosten"]
+    res["kosten_mens"] = kosten_mens.astype("int64").rename("Kosten")
+    res["kosten_robot"] = scenario.kosten_robot(kosten_robot).rename("Power consumption")
+
+    per_dag = state["beschikbaarheid"].set_index(["Server", "Date"])[["Werktijd", "Storingsduur"]]
+    res["beschikbaarheid_mens"] = pd.read_csv(beschikbaarheid_pad)["beschikbaarheid_percentage"].mean()
+    res["beschikbaarheid_robot"] = samenvatten(per_dag)[0]
+    return res
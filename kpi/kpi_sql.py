@@ -0,0 +1,206 @@
+import math
+
+import pandas as pd
+from sqlalchemy import text
+
+from . import database
+from .config import FOUT_GRENS, MAX_LEEFTIJD, fouten_eind, fouten_start
+from .downtime import beschikbaarheid_robot
+from .scenario import STANDAARD
+
+
+# --------------------
+# KPI'S ALS SQL-QUERY
+# --------------------
+# Eén query per KPI op de `orders`-tabel uit database.py. Alleen de kleine
+# resultaatsets komen terug naar Python. De enige verschillen tussen MySQL en
+# SQLite (uur uit een tijdstip, verschil in seconden) zitten in _FRAGMENTEN.
+
+_FRAGMENTEN = {
+    "mysql": {
+        "uur": "HOUR(tijd_order)",
+        "bezorgtijd": "TIMESTAMPDIFF(SECOND, tijd_start, tijd_bezorging)",
+    },
+    "sqlite": {
+        "uur": "CAST(strftime('%H', tijd_order) AS INTEGER)",
+        "bezorgtijd": "(strftime('%s', tijd_bezorging) - strftime('%s', tijd_start))",
+    },
+}
+
+KPI_SQL = {
+    "klanttevredenheid": """
+        SELECT bron, AVG(rating) AS waarde
+        FROM orders
+        WHERE leeftijd <= :max_leeftijd
+        GROUP BY bron
+    """,
+    "bezorgsnelheid": """
+        SELECT bron, AVG({bezorgtijd}) AS waarde
+        FROM orders
+        WHERE tijd_start IS NOT NULL AND tijd_bezorging IS NOT NULL
+        GROUP BY bron
+    """,
+    "fouten_per_dag": """
+        SELECT bron, datum, COUNT(*) AS waarde
+        FROM orders
+        WHERE rating < :fout_grens AND datum BETWEEN :start AND :eind
+        GROUP BY bron, datum
+        ORDER BY bron, datum
+    """,
+    "orders_per_uur": """
+        SELECT bron, uur, AVG(aantal) AS waarde
+        FROM (
+            SELECT bron, datum, {uur} AS uur, COUNT(DISTINCT order_id) AS aantal
+            FROM orders
+            WHERE tijd_order IS NOT NULL
+            GROUP BY bron, datum, {uur}
+        ) per_dag_uur
+        GROUP BY bron, uur
+        ORDER BY bron, uur
+    """,
+    "kosten_per_dag": """
+        SELECT bron, datum,
+               CASE WHEN bron = 'robot' THEN SUM(kwh) * :prijs_kwh + :vaste_kosten
+                    ELSE SUM(uren * uurtarief) END AS waarde
+        FROM orders
+        GROUP BY bron, datum
+        ORDER BY bron, datum
+    """,
+    # Een robot kost de vaste kosten per dag dat hij orders heeft (zoals kpis.kpi_per_server)
+    "per_server": """
+        SELECT bron, COALESCE(server, 'onbekend') AS server,
+               COUNT(*) AS orders,
+               SUM(CASE WHEN rating < :fout_grens THEN 1 ELSE 0 END) AS fouten,
+               AVG(rating) AS beoordeling,
+               AVG({bezorgtijd}) AS bezorgtijd,
+               CASE WHEN bron = 'robot'
+                    THEN COALESCE(SUM(kwh), 0) * :prijs_kwh + COUNT(DISTINCT datum) * :vaste_kosten
+                    ELSE SUM(uren * uurtarief) END AS kosten
+        FROM orders
+        WHERE datum IS NOT NULL
+        GROUP BY bron, COALESCE(server, 'onbekend')
+        ORDER BY bron, server
+    """,
+    # Storingen vragen de volgorde van alle picks: de database levert alleen
+    # de vier benodigde kolommen, de intervallen rekent downtime.py uit
+    "beschikbaarheid": """
+        SELECT server AS Server, datum AS Date, tijd_start AS Time_Picked, error_code AS Error_code
+        FROM orders
+        WHERE bron = 'robot'
+    """,
+}
+
+# Zelfde waarden als de pandas-KPI's (config.py en het kostenmodel in scenario.py)
+PARAMETERS = {
+    "max_leeftijd": MAX_LEEFTIJD,
+    "fout_grens": FOUT_GRENS,
+    "start": fouten_start,
+    "eind": fouten_eind,
+    "prijs_kwh": STANDAARD["prijs_kwh"],
+    "vaste_kosten": STANDAARD["vaste_kosten"] * STANDAARD["robots"],
+}
+
+
+def query(engine, kpi, **parameters):
+    sql = KPI_SQL[kpi].format(**_FRAGMENTEN[engine.dialect.name])
+    gebruikt = {k: v for k, v in {**PARAMETERS, **parameters}.items() if f":{k}" in sql}
+    with engine.connect() as conn:
+        return pd.read_sql(text(sql), conn, params=gebruikt)
+
+
+def _per_bron(df, sleutel, naam, index_naam):
+    reeksen = {}
+    for bron in ("mens", "robot"):
+        deel = df[df["bron"] == bron]
+        reeks = pd.Series(deel["waarde"].to_numpy(), index=deel[sleutel].to_numpy(), name=naam)
+        reeks.index.name = index_naam
+        reeksen[bron] = reeks
+    return reeksen
+
+
+def _datums(reeks):
+    reeks.index = pd.DatetimeIndex(pd.to_datetime(reeks.index), name="Date")
+    return reeks
+
+
+def _per_server(df):
+    tabellen = []
+    for bron in ("mens", "robot"):
+        deel = df[df["bron"] == bron].set_index("server")
+        tabel = pd.DataFrame({
+            "Orders": deel["orders"].astype("int64"),
+            "Fouten": deel["fouten"].astype("int64"),
+            "Beoordeling": deel["beoordeling"].astype(float),
+            "Bezorgtijd": deel["bezorgtijd"].astype(float),
+            "Kosten": deel["kosten"].astype(float),
+        })
+        tabel.index = tabel.index.astype(object).rename("Server")
+        tabellen.append(tabel)
+    return tabellen
+
+
+def bereken(engine, beschikbaarheid_pad, **parameters):
+    # Zelfde sleutels en vormen als cli.bereken_kpis, behalve de
+    # bezorgtijd-percentielen: SQL heeft geen draagbare percentielfunctie, die
+    # komen uit de dagschetsen (cli.bereken_sql). Geeft ook de details van de
+    # beschikbaarheid (per server, per dag, storingen) voor het rapport.
+    res = {}
+
+    score = query(engine, "klanttevredenheid", **parameters).set_index("bron")["waarde"]
+    bezorgtijd = query(engine, "bezorgsnelheid", **parameters).set_index("bron")["waarde"]
+    fouten = _per_bron(query(engine, "fouten_per_dag", **parameters), "datum", None, "Date")
+    orders = _per_bron(query(engine, "orders_per_uur", **parameters), "uur", "Order_ID", "Uur")
+    kosten = _per_bron(query(engine, "kosten_per_dag", **parameters), "datum", None, "Date")
+
+    for bron in ("mens", "robot"):
+        res[f"score_{bron}"] = score.get(bron)
+        res[f"bezorgtijd_{bron}"] = bezorgtijd.get(bron)
+        res[f"fouten_{bron}"] = _datums(fouten[bron]).astype("int64")
+        res[f"orders_{bron}"] = orders[bron].astype("float64")
+    kosten_mens = _datums(kosten["mens"]).rename("Kosten")
+    if (kosten_mens % 1 == 0).all():
+        # Hele euro's, net als uren × uurtarief in pandas
+        kosten_mens = kosten_mens.astype("int64")
+    res["kosten_mens"] = kosten_mens
+    res["kosten_robot"] = _datums(kosten["robot"]).rename("Power consumption")
+    res["per_server_mens"], res["per_server_robot"] = _per_server(query(engine, "per_server", **parameters))
+
+    picks = query(engine, "beschikbaarheid", **parameters)
+    picks["Date"] = pd.to_datetime(picks["Date"])
+    picks["Time_Picked"] = pd.to_datetime(picks["Time_Picked"])
+    res["beschikbaarheid_mens"] = pd.read_csv(beschikbaarheid_pad)["beschikbaarheid_percentage"].mean()
+    res["beschikbaarheid_robot"], *details = beschikbaarheid_robot(picks)
+    return res, details
+
+
+def vergelijk(sql_res, pandas_res):
+    # SUM in de database telt floats in een andere volgorde op dan pandas,
+    # dus getallen worden tot op 1e-9 relatief vergeleken. Alleen wat de
+    # SQL-backend berekent (de percentielen komen uit de schets in pandas).
+    afwijkend = []
+    for naam in sql_res:
+        verwacht = pandas_res[naam]
+        try:
+            if isinstance(verwacht, pd.DataFrame):
+                pd.testing.assert_frame_equal(
+                    sql_res[naam], verwacht, check_dtype=False, check_index_type=False,
+                    check_names=False, rtol=1e-9,
+                )
+            elif isinstance(verwacht, pd.Series):
+                pd.testing.assert_series_equal(
+                    sql_res[naam], verwacht, check_dtype=False, check_index_type=False,
+                    check_names=False, rtol=1e-9,
+                )
+            elif not math.isclose(sql_res[naam], verwacht, rel_tol=1e-9):
+                afwijkend.append(naam)
+        except AssertionError:
+            afwijkend.append(naam)
+    return afwijkend
+
+
+def controleer(df_mens, df_robot, pandas_res, beschikbaarheid_pad):
+    # De data in een SQLite-database in het geheugen laden en beide backends vergelijken
+    engine = database.maak_engine("sqlite://")
+    database.maak_tabellen(engine)
+    database.laad_orders(engine, df_mens, df_robot)
+    return vergelijk(bereken(engine, beschikbaarheid_pad)[0], pandas_res)
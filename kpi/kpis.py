@@ -0,0 +1,139 @@
+import pandas as pd
+
+from .config import FOUT_GRENS, MAX_LEEFTIJD, fouten_eind, fouten_start
+from . import schets
+from .scenario import kosten_mens, kosten_robot
+from .downtime import beschikbaarheid_robot
+from .filters import filter_bronnen, tijdlijn
+
+
+# --------------------
+# KPI FUNCTIES
+# --------------------
+# Elke functie krijgt de (alleen-lezen) frames mee en geeft het resultaat
+# voor mens en robot terug; printen gebeurt in cli.py. Met **filters (start,
+# eind, servers, tafels, leeftijd; zie filters.py) rekent een KPI alleen over
+# de gekozen periode en dimensies.
+
+def kpi_klanttevredenheid_jong(df_mens, df_robot, **filters):
+    df_mens, df_robot = filter_bronnen(df_mens, df_robot, **filters)
+
+    # Rating is Int8 met lege waarden; als float geeft een lege selectie NaN in plaats van NA
+    mens_score = df_mens[df_mens['Leeftijd'] <= MAX_LEEFTIJD]['Rating'].astype(float).mean()
+    robot_score = df_robot[df_robot['Age'] <= MAX_LEEFTIJD]['Rating'].astype(float).mean()
+    return mens_score, robot_score
+
+
+def kpi_fouten_per_dag(df_mens, df_robot, start=fouten_start, eind=fouten_eind, **filters):
+    # Standaard alleen april t/m begin mei 2025 (zie config.py)
+    df_mens, df_robot = filter_bronnen(df_mens, df_robot, start=start, eind=eind, **filters)
+
+    fouten_mens = df_mens[df_mens['Rating'] < FOUT_GRENS].groupby('Date').size()
+    fouten_robot = df_robot[df_robot['Rating'] < FOUT_GRENS].groupby('Date').size()
+
+    return fouten_mens, fouten_robot
+
+
+def kpi_bezorgsnelheid(df_mens, df_robot, **filters):
+    df_mens, df_robot = filter_bronnen(df_mens, df_robot, **filters)
+
+    # Voor menselijke bestellingen
+    df_mens_clean = df_mens.dropna(subset=['Time_Ready', 'Time_Delivery']).copy()
+    df_mens_clean['Bezorgtijd'] = (
+        df_mens_clean['Time_Delivery'] - df_mens_clean['Time_Ready']
+    ).dt.total_seconds()
+    mens_bz = df_mens_clean['Bezorgtijd'].mean()
+
+    # Voor robotbestellingen
+    df_robot_clean = df_robot.dropna(subset=['Time_Picked', 'Time_Delivery']).copy()
+    df_robot_clean['Bezorgtijd'] = (
+        df_robot_clean['Time_Delivery'] - df_robot_clean['Time_Picked']
+    ).dt.total_seconds()
+    robot_bz = df_robot_clean['Bezorgtijd'].mean()
+
+    return mens_bz, robot_bz
+
+
+def kpi_bezorgtijd_percentielen(df_mens, df_robot, percentielen=schets.PERCENTIELEN, dagschetsen=None, **filters):
+    # Percentielen uit de bezorgtijd-schets (±1%, zie schets.py) in plaats van alleen het gemiddelde.
+    # Met dagschetsen (schets.bouw van alle orders, bijv. uit cli.bereken_kpis) geen nieuwe scan;
+    # die kennen alleen periode en server.
+    if dagschetsen is None:
+        df_mens, df_robot = filter_bronnen(df_mens, df_robot, **filters)
+        dagschetsen, filters = schets.bouw(df_mens, df_robot), {}
+    elif filters.get("tafels") or filters.get("leeftijd") is not None:
+        raise ValueError("Dagschetsen kennen geen tafel of leeftijd; laat dagschetsen weg")
+
+    tabel = schets.kwantielen(dagschetsen, percentielen=percentielen, **filters)
+    tabel = tabel.reindex(["mens", "robot"])
+    return tabel.loc["mens"], tabel.loc["robot"]
+
+
+def kpi_orders_per_uur(df_mens, df_robot, **filters):
+    df_mens, df_robot = filter_bronnen(df_mens, df_robot, **filters)
+
+    df_mens_clean = df_mens.dropna(subset=['Time_Order']).copy()
+    df_mens_clean['Uur'] = df_mens_clean['Time_Order'].dt.hour
+    orders_mens = df_mens_clean.groupby(['Date', 'Uur'])['Order_ID'].nunique().groupby('Uur').mean()
+
+    df_robot_clean = df_robot.dropna(subset=['Time_Picked']).copy()
+    df_robot_clean['Uur'] = df_robot_clean['Time_Picked'].dt.hour
+    orders_robot = df_robot_clean.groupby(['Date', 'Uur'])['Order_ID'].nunique().groupby('Uur').mean()
+
+    return orders_mens, orders_robot
+
+
+def kpi_kosten_per_dag(df_mens, df_robot, **filters):
+    df_mens, df_robot = filter_bronnen(df_mens, df_robot, **filters)
+
+    # Standaardparameters uit config.py; andere tarieven doorrekenen met scenario.py
+    mens = kosten_mens(df_mens.groupby('Date').size()).rename('Kosten')
+    robot = kosten_robot(df_robot.groupby(df_robot['Date'])['Power consumption'].sum())
+
+    return mens, robot
+
+
+def _per_server(df, tijd_klaar):
+    # Orders zonder datum vallen buiten elke periode en tellen hier niet mee (zoals in de rollup)
+    df = df[df['Date'].notna()]
+    rating = df['Rating'].astype(float)
+    regels = pd.DataFrame({
+        'Server': df['Server'].astype(object).fillna('onbekend').to_numpy(),
+        'Date': df['Date'].to_numpy(),
+        'Fout': (rating < FOUT_GRENS).to_numpy(),
+        'Rating': rating.to_numpy(),
+        'Bezorgtijd': (df['Time_Delivery'] - df[tijd_klaar]).dt.total_seconds().to_numpy(),
+        'Kwh': df['Power consumption'].to_numpy() if 'Power consumption' in df else 0.0,
+    })
+    return regels.groupby('Server').agg(
+        Orders=('Fout', 'size'), Fouten=('Fout', 'sum'), Beoordeling=('Rating', 'mean'),
+        Bezorgtijd=('Bezorgtijd', 'mean'), Kwh=('Kwh', 'sum'), Dagen=('Date', 'nunique'),
+    )
+
+
+def kpi_per_server(df_mens, df_robot, **filters):
+    # Orders, fouten, gem. beoordeling, gem. bezorgtijd en kosten per medewerker of robot;
+    # een robot kost de vaste kosten per dag dat hij orders heeft
+    df_mens, df_robot = filter_bronnen(df_mens, df_robot, **filters)
+
+    mens = _per_server(df_mens, 'Time_Ready')
+    mens['Kosten'] = kosten_mens(mens['Orders'])
+    robot = _per_server(df_robot, 'Time_Picked')
+    robot['Kosten'] = kosten_robot(robot['Kwh'], robot['Dagen'])
+
+    kolommen = ['Orders', 'Fouten', 'Beoordeling', 'Bezorgtijd', 'Kosten']
+    return mens[kolommen].astype({'Fouten': 'int64'}), robot[kolommen].astype({'Fouten': 'int64'})
+
+
+def kpi_beschikbaarheid_mens(beschikbaarheid_path: str):
+    df_beschikbaarheid = pd.read_csv(beschikbaarheid_path)
+    return df_beschikbaarheid["beschikbaarheid_percentage"].mean()
+
+
+def kpi_beschikbaarheid_totaal(beschikbaarheid_path: str, df_robot, **filters):
+    # Storingen worden per robot en per dag samengevoegd tot intervallen;
+    # beschikbaarheid_robot() geeft ook de uitsplitsing per server en per dag.
+    # Het personeelsbestand heeft alleen jaartotalen per medewerker, dus de
+    # filters gelden alleen voor de robot, en dan alleen periode en server.
+    df_robot = tijdlijn(df_robot, **filters)
+    return kpi_beschikbaarheid_mens(beschikbaarheid_path), beschikbaarheid_robot(df_robot)[0]
@@ -0,0 +1,127 @@
+import codecs
+import json
+import os
+import threading
+import time
+
+from .logstream import Bezorgsnelheid, FoutenPerDag, KostenPerDag, OrdersPerUur, typeer_batch
+
+
+# --------------------
+# LIVE MEEKIJKEN MET HET ROBOTLOG
+# --------------------
+# Een achtergrondthread onthoudt tot welke byte het log gelezen is en
+# verwerkt alleen wat erna is toegevoegd. Dat werkt voor NDJSON (één record
+# per regel) én voor de JSON-array, zolang de schrijver alleen records vóór de
+# afsluitende "]" toevoegt. De lopende aggregaten komen uit logstream.py; elke
+# KPI heeft een versienummer dat alleen ophoogt als het resultaat verandert,
+# zodat het dashboard alleen die grafieken opnieuw tekent.
+
+_decoder = json.JSONDecoder()
+_OVERSLAAN = " \t\r\n,["
+
+
+def lees_vanaf(pad, offset):
+    # Geeft (nieuwe records, nieuwe offset); een half geschreven record blijft staan
+    with open(pad, "rb") as f:
+        f.seek(offset)
+        ruw = f.read()
+    tekst = codecs.getincrementaldecoder("utf-8")().decode(ruw, final=False)
+
+    records = []
+    pos = 0
+    gelezen = 0
+    while True:
+        while pos < len(tekst) and tekst[pos] in _OVERSLAAN:
+            pos += 1
+        if pos >= len(tekst) or tekst[pos] == "]":
+            break
+        try:
+            record, pos = _decoder.raw_decode(tekst, pos)
+        except json.JSONDecodeError:
+            break
+        records.append(record)
+        gelezen = pos
+    return records, offset + len(tekst[:gelezen].encode("utf-8"))
+
+
+def _live_aggregaten():
+    return {
+        "bezorgsnelheid": Bezorgsnelheid(),
+        "orders_per_uur": OrdersPerUur(),
+        "fouten": FoutenPerDag(start=None, end=None),
+        "kosten": KostenPerDag(),
+    }
+
+
+def _gelijk(a, b):
+    if hasattr(a, "equals"):
+        return hasattr(b, "equals") and a.equals(b)
+    return a == b
+
+
+class LogVolger:
+    def __init__(self, pad, interval=1.0):
+        self.pad = pad
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.records = 0
+        self.laatste_update = None
+        self._aggregaten = _live_aggregaten()
+        self._resultaten = {naam: None for naam in self._aggregaten}
+        self._versies = {naam: 0 for naam in self._aggregaten}
+
+    def bijwerken(self):
+        if not os.path.exists(self.pad):
+            return 0
+        if os.path.getsize(self.pad) < self.offset:
+            # Log is vervangen of ingekort: opnieuw beginnen
+            with self._lock:
+                self._reset()
+
+        records, offset = lees_vanaf(self.pad, self.offset)
+        if not records:
+            self.offset = offset
+            return 0
+
+        batch = typeer_batch(records)
+        with self._lock:
+            for naam, aggregaat in self._aggregaten.items():
+                aggregaat.verwerk(batch)
+                resultaat = aggregaat.resultaat()
+                if not _gelijk(resultaat, self._resultaten[naam]):
+                    self._resultaten[naam] = resultaat
+                    self._versies[naam] += 1
+            self.offset = offset
+            self.records += len(records)
+            self.laatste_update = time.time()
+        return len(records)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.bijwerken()
+            except (OSError, ValueError) as fout:
+                print(f"⚠️ Live log niet gelezen: {fout}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="kpi-logvolger", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def momentopname(self):
+        # {kpi: (versie, resultaat)}; resultaten worden niet meer gewijzigd na publicatie
+        with self._lock:
+            return {naam: (self._versies[naam], self._resultaten[naam]) for naam in self._aggregaten}
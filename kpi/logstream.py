@@ -0,0 +1,272 @@
+import json
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .config import FOUT_GRENS, MAX_LEEFTIJD, PRIJS_KWH, VASTE_KOSTEN_ROBOT, fouten_eind, fouten_start
+from .downtime import beschikbaarheid_robot
+from .scenario import kosten_robot
+from .schema import SCHEMA_ROBOT, toepassen
+from .tijden import absoluut, datum
+
+
+# --------------------
+# INCREMENTEEL INLEZEN ROBOTLOG
+# --------------------
+# Het log is een (pretty-printed) JSON-array. We lezen het bestand in blokken
+# en decoderen één record tegelijk, zodat nooit de hele tekst, alle Python-
+# objecten én het DataFrame tegelijk in het geheugen staan. Een bestand met
+# één record per regel (NDJSON) wordt op dezelfde manier gelezen.
+
+BLOK_GROOTTE = 1 << 16
+BATCH_GROOTTE = 10_000
+
+_decoder = json.JSONDecoder()
+_OVERSLAAN = " \t\r\n,["
+
+
+def iter_records(pad, blok_grootte=BLOK_GROOTTE):
+    with open(pad, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        while True:
+            # Witruimte, komma's en het begin van de array overslaan
+            while pos < len(buffer) and buffer[pos] in _OVERSLAAN:
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+
+            if pos < len(buffer):
+                try:
+                    record, pos = _decoder.raw_decode(buffer, pos)
+                    yield record
+                    continue
+                except json.JSONDecodeError:
+                    pass
+
+            # Record loopt door in het volgende blok
+            blok = f.read(blok_grootte)
+            if not blok:
+                if buffer[pos:].strip():
+                    raise ValueError(f"Onvolledig record aan het eind van {pad}")
+                return
+            buffer = buffer[pos:] + blok
+            pos = 0
+
+
+def _optellen(totaal, deel):
+    if totaal is None:
+        return deel
+    return totaal.add(deel, fill_value=0)
+
+
+def _kolom(records, naam):
+    return [r.get(naam) for r in records]
+
+
+def typeer_batch(records):
+    # Zelfde typering als bronnen.py: absolute tijden als datetime64, getallen numeriek
+    date = datum(pd.Series(_kolom(records, "Date"), dtype=object))
+    birth = datum(pd.Series(_kolom(records, "Birth_Date"), dtype=object))
+
+    df = pd.DataFrame({
+        "Order_ID": _kolom(records, "Order_ID"),
+        "Date": date,
+        "Time_Picked": absoluut(date, pd.Series(_kolom(records, "Time_Picked"), dtype=object)),
+        "Time_Delivery": absoluut(date, pd.Series(_kolom(records, "Time_Delivery"), dtype=object)),
+        "Server": _kolom(records, "Server"),
+        "Table": pd.to_numeric(pd.Series(_kolom(records, "Table"), dtype=object), errors="coerce"),
+        "Rating": pd.to_numeric(pd.Series(_kolom(records, "Rating"), dtype=object), errors="coerce"),
+        "Total_Amount": pd.to_numeric(pd.Series(_kolom(records, "Total_Amount"), dtype=object), errors="coerce"),
+        "Birth_Date": birth,
+        "Comment": _kolom(records, "Comment"),
+        "Power consumption": pd.to_numeric(pd.Series(_kolom(records, "Power consumption"), dtype=object), errors="coerce"),
+        "Error_code": _kolom(records, "Error_code"),
+    })
+    df["Age"] = ((df["Date"] - df["Birth_Date"]).dt.days / 365).astype(int)
+    return df
+
+
+def iter_batches(pad, batch_grootte=BATCH_GROOTTE):
+    records = []
+    for record in iter_records(pad):
+        records.append(record)
+        if len(records) == batch_grootte:
+            yield typeer_batch(records)
+            records = []
+    if records:
+        yield typeer_batch(records)
+
+
+def _aanvullen(df, batch):
+    # Elke batch heeft zijn eigen categorieën: eerst gelijktrekken, anders wordt het object
+    # (lege categorieën hebben een ander type, dus die tellen niet mee)
+    for kolom in df.select_dtypes("category"):
+        oud, nieuw = df[kolom].cat.categories, batch[kolom].cat.categories
+        if not len(oud):
+            df[kolom] = df[kolom].cat.set_categories(nieuw)
+        elif not nieuw.isin(oud).all():
+            df[kolom] = df[kolom].cat.set_categories(union_categoricals([df[kolom], batch[kolom]]).categories)
+        batch[kolom] = batch[kolom].cat.set_categories(df[kolom].cat.categories)
+    return pd.concat([df, batch], ignore_index=True)
+
+
+def lees_robot_log(pad, batch_grootte=BATCH_GROOTTE):
+    # Elke batch meteen compact typeren (schema.py) en aan het frame toevoegen:
+    # er staat nooit meer dan één ruwe batch in het geheugen
+    df = None
+    for batch in iter_batches(pad, batch_grootte):
+        batch = toepassen(batch, SCHEMA_ROBOT)
+        df = batch if df is None else _aanvullen(df, batch)
+    return typeer_batch([]) if df is None else df
+
+
+# --------------------
+# LOPENDE AGGREGATEN PER KPI
+# --------------------
+# Elke KPI-functie uit kpis.py heeft hier een tegenhanger die batches
+# één voor één verwerkt (verwerk) en aan het eind hetzelfde resultaat geeft
+# als de functie op het volledige DataFrame (resultaat).
+
+class Klanttevredenheid:
+    def __init__(self, max_leeftijd=MAX_LEEFTIJD):
+        self.max_leeftijd = max_leeftijd
+        self.som = 0.0
+        self.aantal = 0
+
+    def verwerk(self, batch):
+        rating = batch.loc[batch["Age"] <= self.max_leeftijd, "Rating"].dropna()
+        self.som += rating.sum()
+        self.aantal += len(rating)
+
+    def resultaat(self):
+        return self.som / self.aantal if self.aantal else np.nan
+
+
+class FoutenPerDag:
+    def __init__(self, start=fouten_start, end=fouten_eind):
+        self.start = start
+        self.end = end
+        self.per_dag = None
+
+    def verwerk(self, batch):
+        fouten = batch[batch["Rating"] < FOUT_GRENS].groupby("Date").size()
+        self.per_dag = _optellen(self.per_dag, fouten).astype("int64")
+
+    def resultaat(self):
+        if self.per_dag is None:
+            return pd.Series(dtype="int64")
+        per_dag = self.per_dag.sort_index()
+        per_dag.index.name = "Date"
+        return per_dag.loc[self.start:self.end]
+
+
+class Bezorgsnelheid:
+    def __init__(self):
+        self.som = 0.0
+        self.aantal = 0
+
+    def verwerk(self, batch):
+        bezorgtijd = (batch["Time_Delivery"] - batch["Time_Picked"]).dt.total_seconds().dropna()
+        self.som += bezorgtijd.sum()
+        self.aantal += len(bezorgtijd)
+
+    def resultaat(self):
+        return self.som / self.aantal if self.aantal else np.nan
+
+
+class OrdersPerUur:
+    # Per batch nunique optellen. Foutregels hergebruiken hun Order_ID (ERR001
+    # begint per storing opnieuw; bronnen.py voegt de robot daarom samen op
+    # Server, Order_ID en Time_Picked). Valt hetzelfde id twee keer in één uur
+    # en over een batchgrens, dan telt het hier dubbel; in het meegeleverde log
+    # komt dat niet voor.
+    def __init__(self):
+        self.per_dag_uur = None
+
+    def verwerk(self, batch):
+        batch = batch.dropna(subset=["Time_Picked"])
+        sleutels = [batch["Date"].rename("Datum"), batch["Time_Picked"].dt.hour.rename("Uur")]
+        orders = batch.groupby(sleutels)["Order_ID"].nunique()
+        self.per_dag_uur = _optellen(self.per_dag_uur, orders).astype("int64")
+
+    def resultaat(self):
+        if self.per_dag_uur is None:
+            return pd.Series(dtype="float64", name="Order_ID")
+        return self.per_dag_uur.groupby(level="Uur").mean().rename("Order_ID")
+
+
+class KostenPerDag:
+    def __init__(self, prijs_kwh=PRIJS_KWH, vaste_kosten=VASTE_KOSTEN_ROBOT):
+        self.prijs_kwh = prijs_kwh
+        self.vaste_kosten = vaste_kosten
+        self.kwh_per_dag = None
+
+    def verwerk(self, batch):
+        kwh = batch.groupby("Date")["Power consumption"].sum()
+        self.kwh_per_dag = _optellen(self.kwh_per_dag, kwh)
+
+    def resultaat(self):
+        if self.kwh_per_dag is None:
+            return pd.Series(dtype="float64", name="Power consumption")
+        kwh = self.kwh_per_dag.sort_index()
+        kwh.index.name = "Date"
+        return kosten_robot(kwh, prijs_kwh=self.prijs_kwh, vaste_kosten=self.vaste_kosten).rename("Power consumption")
+
+
+class Beschikbaarheid:
+    # Storingen hebben de volgorde van alle picks nodig; we bewaren alleen de
+    # vier compacte kolommen die de downtime-module gebruikt
+    KOLOMMEN = ["Server", "Date", "Time_Picked", "Error_code"]
+
+    def __init__(self):
+        self.delen = []
+
+    def verwerk(self, batch):
+        deel = batch[self.KOLOMMEN].copy()
+        deel["Server"] = deel["Server"].astype("category")
+        deel["Error_code"] = deel["Error_code"].astype("category")
+        self.delen.append(deel)
+
+    def resultaat(self):
+        if not self.delen:
+            return np.nan
+        df = pd.concat(self.delen, ignore_index=True)
+        return beschikbaarheid_robot(df)[0]
+
+
+# Naam van elk aggregaat in de resultaten van cli.bereken_kpis
+SLEUTELS = {
+    "klanttevredenheid": "score_robot",
+    "fouten": "fouten_robot",
+    "bezorgsnelheid": "bezorgtijd_robot",
+    "orders_per_uur": "orders_robot",
+    "kosten": "kosten_robot",
+    "beschikbaarheid": "beschikbaarheid_robot",
+}
+
+
+def robot_aggregaten():
+    return {
+        "klanttevredenheid": Klanttevredenheid(),
+        "fouten": FoutenPerDag(),
+        "bezorgsnelheid": Bezorgsnelheid(),
+        "orders_per_uur": OrdersPerUur(),
+        "kosten": KostenPerDag(),
+        "beschikbaarheid": Beschikbaarheid(),
+    }
+
+
+def vouw(batches, aggregaten):
+    for batch in batches:
+        for aggregaat in aggregaten.values():
+            aggregaat.verwerk(batch)
+    return {naam: aggregaat.resultaat() for naam, aggregaat in aggregaten.items()}
+
+
+def robot_kpis(pad, batch_grootte=BATCH_GROOTTE):
+    # Alle robot-KPI's in één doorloop over het log, met vlak geheugengebruik,
+    # onder dezelfde sleutels als cli.bereken_kpis (zie --check-stroom)
+    uitkomst = vouw(iter_batches(pad, batch_grootte), robot_aggregaten())
+    return {SLEUTELS[naam]: waarde for naam, waarde in uitkomst.items()}
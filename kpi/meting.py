@@ -0,0 +1,188 @@
+import contextlib
+import contextvars
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from datetime import datetime
+from functools import wraps
+
+
+# --------------------
+# METEN VAN DE PIJPLIJN
+# --------------------
+# Meter.stap() meet de wandtijd van een stap (laden, normaliseren, KPI's,
+# schrijven) en, als tracemalloc aan staat, het piekgeheugen tijdens die stap.
+# Komt een stap vaker voor, dan worden de tijden opgeteld; een stap binnen een
+# andere stap heet "ouder/kind". Optioneel draait de hele run onder cProfile.
+#
+# Binnen `with Meter() as meter:` is de meter actief, zodat code dieper in de
+# pijplijn met meting.stap() of @meting.gemeten() kan meten zonder de meter
+# door te geven. Zonder actieve meter (of in een andere thread) doen die
+# niets. Een run levert een JSON-rapport op in RUN_MAP; het dashboard toont
+# het laatste rapport als "pijplijn-gezondheid".
+
+RUN_MAP = ".kpi_runs"
+LAATSTE = "laatste.json"
+BEWAREN = 50
+PROFIEL_REGELS = 25
+
+_actief = contextvars.ContextVar("meter", default=None)
+
+
+class Meter:
+    def __init__(self, geheugen=False, profiel=False):
+        self.geheugen = geheugen
+        self.profiel = cProfile.Profile() if profiel else None
+        self.stappen = {}
+        self.start = time.perf_counter()
+        self.tijdstip = datetime.now()
+        self._stapel = []
+        self._tracemalloc_gestart = False
+        self._token = None
+
+    def __enter__(self):
+        self._token = _actief.set(self)
+        if self.geheugen and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc_gestart = True
+        if self.profiel is not None:
+            self.profiel.enable()
+        return self
+
+    def __exit__(self, *exc):
+        _actief.reset(self._token)
+        if self.profiel is not None:
+            self.profiel.disable()
+        if self._tracemalloc_gestart:
+            tracemalloc.stop()
+            self._tracemalloc_gestart = False
+        return False
+
+    def _naam(self, naam):
+        return "/".join([*(ouder for ouder, _ in self._stapel), naam])
+
+    @contextlib.contextmanager
+    def stap(self, naam):
+        # Tijd en piekgeheugen per stap; de piek van een kind telt ook voor de ouder
+        naam = self._naam(naam)
+        if self.geheugen:
+            # De piek tot nu toe bewaren voor de ouder, daarna opnieuw meten
+            if self._stapel:
+                self._stapel[-1][1] = max(self._stapel[-1][1], tracemalloc.get_traced_memory()[1] / 2**20)
+            tracemalloc.reset_peak()
+        self._stapel.append([naam.rsplit("/", 1)[-1], 0.0])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconden = time.perf_counter() - start
+            _, kind_piek = self._stapel.pop()
+            meting = self.stappen.setdefault(naam, {"seconden": 0.0, "piek_mb": 0.0})
+            meting["seconden"] += seconden
+            if self.geheugen:
+                piek = max(tracemalloc.get_traced_memory()[1] / 2**20, kind_piek)
+                meting["piek_mb"] = max(meting["piek_mb"], piek)
+                if self._stapel:
+                    self._stapel[-1][1] = max(self._stapel[-1][1], piek)
+
+    def voeg_toe(self, tijden):
+        # Tijden die elders gemeten zijn (bijv. per KPI-taak in runner.py), zonder geheugen
+        for naam, seconden in tijden.items():
+            meting = self.stappen.setdefault(self._naam(naam), {"seconden": 0.0, "piek_mb": None})
+            meting["seconden"] += seconden
+
+    def profiel_top(self, aantal=PROFIEL_REGELS):
+        if self.profiel is None:
+            return []
+        statistiek = pstats.Stats(self.profiel)
+        regels = sorted(statistiek.stats.items(), key=lambda item: item[1][3], reverse=True)[:aantal]
+        return [{
+            "functie": f"{os.path.basename(bestand)}:{regel}({naam})",
+            "aanroepen": aanroepen,
+            "eigen_s": round(eigen, 4),
+            "totaal_s": round(totaal, 4),
+        } for (bestand, regel, naam), (_, aanroepen, eigen, totaal, _) in regels]
+
+    def _piek(self, meting):
+        if not self.geheugen or meting["piek_mb"] is None:
+            return None
+        return round(meting["piek_mb"], 1)
+
+    def rapport(self, **extra):
+        return {
+            "tijdstip": self.tijdstip.isoformat(timespec="seconds"),
+            "totaal_s": round(time.perf_counter() - self.start, 4),
+            "stappen": [{"naam": naam, "seconden": round(meting["seconden"], 4), "piek_mb": self._piek(meting)}
+                        for naam, meting in self.stappen.items()],
+            "profiel": self.profiel_top(),
+            **extra,
+        }
+
+
+def stap(naam):
+    meter = _actief.get()
+    return meter.stap(naam) if meter is not None else contextlib.nullcontext()
+
+
+def gemeten(naam=None):
+    # Als decorator: @meting.gemeten("schrijven")
+    def decorator(functie):
+        @wraps(functie)
+        def gemeten_functie(*args, **kwargs):
+            with stap(naam or functie.__name__):
+                return functie(*args, **kwargs)
+        return gemeten_functie
+    return decorator
+
+
+def voeg_toe(tijden):
+    meter = _actief.get()
+    if meter is not None:
+        meter.voeg_toe(tijden)
+
+
+def print_rapport(rapport):
+    print(f"\n⏱️ Run {rapport['tijdstip']}: {rapport['totaal_s']:.3f}s")
+    for meting in rapport["stappen"]:
+        piek = f"  {meting['piek_mb']:8.1f} MB" if meting["piek_mb"] is not None else ""
+        print(f"  {meting['naam']:<34} {meting['seconden']:8.3f}s{piek}")
+    if rapport["profiel"]:
+        print("🔬 Profiel (cumulatief):")
+        for regel in rapport["profiel"][:10]:
+            print(f"  {regel['totaal_s']:8.3f}s  {regel['aanroepen']:>8}x  {regel['functie']}")
+
+
+def schrijf_json(doel, inhoud):
+    # Atomair: wie meeleest (het dashboard) ziet het oude of het nieuwe bestand
+    os.makedirs(os.path.dirname(doel) or ".", exist_ok=True)
+    tijdelijk = f"{doel}.{os.getpid()}.tmp"
+    with open(tijdelijk, "w", encoding="utf-8") as f:
+        json.dump(inhoud, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tijdelijk, doel)
+
+
+def schrijf_rapport(rapport, run_map=RUN_MAP):
+    # Eén bestand per run plus laatste.json
+    naam = "run-" + rapport["tijdstip"].replace(":", "") + ".json"
+    for bestand in (naam, LAATSTE):
+        schrijf_json(os.path.join(run_map, bestand), rapport)
+
+    # Alleen de laatste BEWAREN runs houden
+    runs = sorted(b for b in os.listdir(run_map) if b.startswith("run-") and b.endswith(".json"))
+    for oud in runs[:-BEWAREN]:
+        os.remove(os.path.join(run_map, oud))
+    return os.path.join(run_map, naam)
+
+
+def lees_runs(run_map=RUN_MAP):
+    # Alle bewaarde rapporten, oudste eerst
+    if not os.path.isdir(run_map):
+        return []
+    runs = []
+    for bestand in sorted(b for b in os.listdir(run_map) if b.startswith("run-") and b.endswith(".json")):
+        with open(os.path.join(run_map, bestand), encoding="utf-8") as f:
+            runs.append(json.load(f))
+    return runs
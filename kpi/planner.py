@@ -0,0 +1,283 @@
+import argparse
+import asyncio
+import os
+import signal
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from . import bronnen, config, meting
+from .cli import bereken_incrementeel, bereken_kpis, schrijf_resultaten
+
+
+# --------------------
+# VERVERSEN OP DE ACHTERGROND
+# --------------------
+# python -m kpi.planner draait doorlopend en berekent de KPI's opnieuw volgens
+# een schema (elke N minuten en/of op vaste tijden) en zodra een bronbestand
+# verandert. Bronnen worden gevolgd door hun mtimes te pollen (zoals het
+# dashboard bronnen.versie() gebruikt); er is geen bestandswatcher nodig.
+#
+# Er draait altijd hooguit één verversing. Aanleidingen die kort na elkaar
+# binnenkomen (een kopieerslag met tien logbestanden) worden samengevoegd: de
+# planner wacht tot het RUST seconden stil is. Wat binnenkomt tijdens een
+# verversing levert daarna precies één nieuwe verversing op. Elke verversing
+# vervangt kpi_resultaten.arrow in één keer (resultaten.py), dus het dashboard
+# toont altijd de laatste complete run en wacht nooit op een berekening. De
+# stand van de planner staat in .kpi_runs/planner.json.
+
+RUST = 5.0
+POLL = 2.0
+STATUS = os.path.join(meting.RUN_MAP, "planner.json")
+SLOT = os.path.join(meting.RUN_MAP, "planner.lock")
+
+_EENHEDEN = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def duur(tekst):
+    # "90", "30s", "15m", "2h" -> seconden
+    tekst = tekst.strip().lower()
+    if tekst[-1:] in _EENHEDEN:
+        return float(tekst[:-1]) * _EENHEDEN[tekst[-1]]
+    return float(tekst)
+
+
+def tijdstip(tekst):
+    return datetime.strptime(tekst, "%H:%M").time()
+
+
+def volgende(nu, interval=None, tijden=(), vorige=None):
+    # Eerstvolgende moment uit het schema: vorige + interval en/of de volgende vaste tijd
+    if vorige is not None:
+        nu = max(nu, vorige)
+    kandidaten = []
+    if interval:
+        kandidaten.append((vorige or nu) + timedelta(seconds=interval))
+    for tijd in tijden:
+        moment = datetime.combine(nu.date(), tijd)
+        if moment <= nu:
+            moment += timedelta(days=1)
+        kandidaten.append(moment)
+    return min(kandidaten, default=None)
+
+
+# --------------------
+# ÉÉN VERVERSING
+# --------------------
+def ververs(aanleiding, incrementeel=False, modus="uit", max_workers=None):
+    # Altijd de bronnen opnieuw bekijken: de frames in het geheugen kunnen verouderd zijn
+    bronnen.df_mens.cache_clear()
+    bronnen.df_robot.cache_clear()
+
+    with meting.Meter() as meter:
+        df_mens, df_robot = bronnen.df_mens(), bronnen.df_robot()
+        with meting.stap("kpis"):
+            if incrementeel:
+                res = bereken_incrementeel(df_mens, df_robot)
+            else:
+                res = bereken_kpis(df_mens, df_robot, modus, max_workers, toon=False)
+        schrijf_resultaten(res, backend="incrementeel" if incrementeel else "pandas",
+                           aanleiding=sorted(aanleiding))
+    rapport = meter.rapport(argv=["planner", *sorted(aanleiding)],
+                            rijen={"mens": len(df_mens), "robot": len(df_robot)})
+    meting.schrijf_rapport(rapport)
+    return rapport
+
+
+# --------------------
+# PLANNER
+# --------------------
+class Planner:
+    def __init__(self, ververs, interval=None, tijden=(), rust=RUST, poll=POLL, bestanden=None, status=STATUS):
+        self.ververs = ververs
+        self.interval = interval
+        self.tijden = tuple(tijden)
+        self.rust = rust
+        self.poll = poll
+        self.bestanden = bestanden
+        self.status = status
+        self.volgende = None
+        self.laatste = None
+        self._aanleiding = set()
+        self._aanvraag = None
+
+    def vraag(self, reden):
+        self._aanleiding.add(reden)
+        self._aanvraag.set()
+
+    def _schrijf_status(self, stand, **extra):
+        meting.schrijf_json(self.status, {
+            "pid": os.getpid(),
+            "stand": stand,
+            "sinds": datetime.now().isoformat(timespec="seconds"),
+            "volgende": self.volgende.isoformat(timespec="seconds") if self.volgende else None,
+            "laatste": self.laatste,
+            **extra,
+        })
+
+    async def _klok(self):
+        vorige = None
+        while True:
+            self.volgende = volgende(datetime.now(), self.interval, self.tijden, vorige)
+            await asyncio.sleep(max(0.0, (self.volgende - datetime.now()).total_seconds()))
+            vorige = self.volgende
+            self.vraag("schema")
+
+    async def _volg_bestanden(self):
+        try:
+            versie = self.bestanden()
+        except FileNotFoundError as e:
+            # Bron ontbreekt bij de start: blijven kijken en verversen zodra hij er is
+            print(f"⚠️ Bronbestand niet gevonden: {e}; planner blijft kijken", flush=True)
+            versie = None
+        while True:
+            await asyncio.sleep(self.poll)
+            try:
+                nieuw = self.bestanden()
+            except FileNotFoundError:
+                # Bestand wordt net vervangen; volgende ronde opnieuw kijken
+                continue
+            if nieuw != versie:
+                versie = nieuw
+                self.vraag("bestanden")
+
+    async def _werker(self):
+        while True:
+            await self._aanvraag.wait()
+            # Samenvoegen: pas beginnen als het RUST seconden stil is
+            while True:
+                self._aanvraag.clear()
+                try:
+                    await asyncio.wait_for(self._aanvraag.wait(), self.rust)
+                except asyncio.TimeoutError:
+                    break
+            aanleiding, self._aanleiding = self._aanleiding, set()
+
+            self._schrijf_status("bezig", aanleiding=sorted(aanleiding))
+            begin = time.perf_counter()
+            try:
+                await asyncio.to_thread(self.ververs, aanleiding)
+                fout = None
+            except Exception as e:
+                # Een mislukte verversing laat de vorige resultaten staan; de planner draait door
+                traceback.print_exc()
+                fout = f"{type(e).__name__}: {e}"
+            seconden = time.perf_counter() - begin
+            self.laatste = {
+                "tijdstip": datetime.now().isoformat(timespec="seconds"),
+                "seconden": round(seconden, 3),
+                "aanleiding": sorted(aanleiding),
+                "fout": fout,
+            }
+            symbool = "❌" if fout else "✅"
+            print(f"{symbool} {self.laatste['tijdstip']} ververst ({', '.join(sorted(aanleiding))}) "
+                  f"in {seconden:.2f}s" + (f": {fout}" if fout else ""), flush=True)
+            self._schrijf_status("wacht")
+
+    async def draai(self, stop=None):
+        self._aanvraag = asyncio.Event()
+        stop = stop or asyncio.Event()
+        taken = [asyncio.create_task(self._werker())]
+        if self.interval or self.tijden:
+            taken.append(asyncio.create_task(self._klok()))
+        if self.bestanden is not None:
+            taken.append(asyncio.create_task(self._volg_bestanden()))
+
+        self.vraag("start")
+        await stop.wait()
+        for taak in taken:
+            taak.cancel()
+        await asyncio.gather(*taken, return_exceptions=True)
+        self._schrijf_status("gestopt")
+
+
+# --------------------
+# MAAR ÉÉN PLANNER TEGELIJK
+# --------------------
+def leeft(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def claim(slot=SLOT):
+    # Slotbestand met het pid; een slot van een gestopt proces wordt overgenomen
+    os.makedirs(os.path.dirname(slot), exist_ok=True)
+    while True:
+        try:
+            fd = os.open(slot, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            with open(slot, encoding="utf-8") as f:
+                eigenaar = f.read().strip()
+            if eigenaar.isdigit() and leeft(int(eigenaar)):
+                raise RuntimeError(f"Er draait al een planner (pid {eigenaar})")
+            os.remove(slot)
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(str(os.getpid()))
+        return
+
+
+def _versies():
+    return bronnen.versie(config.bestand_excel, "mens"), bronnen.versie(config.bestand_robot, "robot")
+
+
+async def _hoofd(planner):
+    stop = asyncio.Event()
+    lus = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            lus.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C komt als KeyboardInterrupt
+            pass
+    await planner.draai(stop)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m kpi.planner",
+                                     description="KPI's op de achtergrond verversen voor het dashboard")
+    parser.add_argument("--elke", type=duur, help="vast interval, bijv. 15m of 1h")
+    parser.add_argument("--om", type=tijdstip, action="append", default=[],
+                        help="vaste tijd per dag, bijv. 07:00 (herhaalbaar)")
+    parser.add_argument("--niet-volgen", action="store_true", help="niet verversen als een bronbestand verandert")
+    parser.add_argument("--rust", type=duur, default=RUST,
+                        help=f"wachten tot het zo lang stil is voor een verversing begint (standaard {RUST:g}s)")
+    parser.add_argument("--poll", type=duur, default=POLL, help=f"bronbestanden controleren elke ... (standaard {POLL:g}s)")
+    parser.add_argument("--mens", help="Excel-bestand, map of glob met menselijke orders (standaard uit config.py)")
+    parser.add_argument("--robot", help="robotlog, map of glob (standaard uit config.py)")
+    parser.add_argument("--incrementeel", action="store_true", help="alleen nieuwe of gewijzigde dagen herberekenen")
+    parser.add_argument("--parallel", choices=["uit", "thread", "proces"], default="uit",
+                        help="KPI's na elkaar (standaard), in threads of in processen uitvoeren")
+    parser.add_argument("--workers", type=int, default=None, help="aantal threads/processen")
+    args = parser.parse_args(argv)
+    if args.mens:
+        config.bestand_excel = args.mens
+    if args.robot:
+        config.bestand_robot = args.robot
+
+    def taak(aanleiding):
+        return ververs(aanleiding, args.incrementeel, args.parallel, args.workers)
+
+    planner = Planner(taak, interval=args.elke, tijden=args.om, rust=args.rust, poll=args.poll,
+                      bestanden=None if args.niet_volgen else _versies)
+    try:
+        claim()
+    except RuntimeError as fout:
+        parser.exit(1, f"❌ {fout}\n")
+    try:
+        print(f"⏲️ Planner gestart (pid {os.getpid()}); resultaten in kpi_resultaten.arrow", flush=True)
+        asyncio.run(_hoofd(planner))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.remove(SLOT)
+        print("⏹️ Planner gestopt", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+
+
+# --------------------
+# RESULTATEN VOOR HET DASHBOARD (ARROW IPC)
+# --------------------
+# Alle KPI's van een run staan in één Arrow-bestand in lang formaat: één regel
+# per waarde, met kpi en bron (zoals in de database, zie database.py) en
+# daarnaast de datum, het uur of de server (en de maat) waar de waarde bij
+# hoort. Losse getallen hebben geen sleutel. Welke KPI's erin staan en in welke
+# vorm staat samen met de runinformatie in de metadata van het schema.
+#
+# Schrijven gaat via een tijdelijk bestand en os.replace(), dus een lezer ziet
+# altijd de vorige of de nieuwe run, nooit een mengsel. Het dashboard leest het
+# bestand via een memory map; verhoog VERSIE als het schema verandert.
+#
+# Wat het dashboard zonder filters verder nodig heeft (de rollup-kubus en de
+# bezorgtijd-schetsen) gaat als bijlagen mee: Parquet-bestanden in een eigen
+# map per run onder BIJLAGEN_MAP. Die map wordt eerst geschreven; het
+# Arrow-bestand verwijst ernaar en wordt als laatste vervangen, dus KPI's en
+# bijlagen horen altijd bij dezelfde run.
+
+RESULTATEN = "kpi_resultaten.arrow"
+VERSIE = 2
+BIJLAGEN_MAP = ".kpi_snapshot"
+BIJLAGEN_BEWAREN = 3
+
+_TEKST = pa.dictionary(pa.int8(), pa.string())
+SCHEMA = pa.schema([
+    ("kpi", _TEKST),
+    ("bron", _TEKST),
+    ("datum", pa.timestamp("ns")),
+    ("uur", pa.int8()),
+    ("server", pa.string()),
+    ("maat", _TEKST),
+    ("waarde", pa.float64()),
+])
+
+# Vorm van een resultaat -> sleutelkolom in de tabel en indexnaam in pandas
+SLEUTELS = {"datum": "Date", "uur": "Uur", "server": "Server"}
+
+
+def _vorm(waarde):
+    if isinstance(waarde, pd.DataFrame):
+        return "server"
+    if isinstance(waarde, pd.Series):
+        return "datum" if isinstance(waarde.index, pd.DatetimeIndex) else "uur"
+    return "getal"
+
+
+def _regels(naam, waarde, vorm):
+    kpi, bron = naam.rsplit("_", 1)
+    if vorm == "server":
+        # Per server: één regel per server en maat (Orders, Fouten, ...)
+        regels = waarde.rename_axis("server").reset_index().melt(
+            id_vars="server", var_name="maat", value_name="waarde")
+    elif vorm == "getal":
+        regels = pd.DataFrame({"waarde": [waarde]})
+    else:
+        regels = pd.DataFrame({vorm: waarde.index.to_numpy(), "waarde": waarde.to_numpy()})
+    regels["waarde"] = regels["waarde"].astype(float)
+    return regels.assign(kpi=kpi, bron=bron)
+
+
+def naar_tabel(res, **metadata):
+    vormen = {naam: _vorm(waarde) for naam, waarde in res.items()}
+    regels = pd.concat([_regels(naam, res[naam], vorm) for naam, vorm in vormen.items()], ignore_index=True)
+    metadata = {
+        "versie": VERSIE,
+        "tijdstip": datetime.now().isoformat(timespec="seconds"),
+        "vormen": vormen,
+        **metadata,
+    }
+    # Kolommen zonder waarden (bijv. geen uitsplitsing per server) krijgen toch het juiste type
+    regels = regels.reindex(columns=SCHEMA.names)
+    regels["datum"] = pd.to_datetime(regels["datum"])
+    regels[["kpi", "bron", "server", "maat"]] = regels[["kpi", "bron", "server", "maat"]].astype(object)
+    tabel = pa.Table.from_pandas(regels, schema=SCHEMA, preserve_index=False)
+    return tabel.replace_schema_metadata({"kpi_resultaten": json.dumps(metadata, default=str)})
+
+
+def _bijlagen_map(pad):
+    return os.path.join(os.path.dirname(pad), BIJLAGEN_MAP)
+
+
+def schrijf(res, pad=RESULTATEN, bijlagen=None, **metadata):
+    if bijlagen:
+        naam = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        map_ = os.path.join(_bijlagen_map(pad), naam)
+        os.makedirs(map_)
+        for bijlage, frame in bijlagen.items():
+            frame.to_parquet(os.path.join(map_, f"{bijlage}.parquet"), index=False)
+        metadata["bijlagen"] = {"map": naam, "namen": sorted(bijlagen)}
+
+    tabel = naar_tabel(res, **metadata)
+    tijdelijk = f"{pad}.{os.getpid()}.tmp"
+    with pa.OSFile(tijdelijk, "wb") as bestand, pa.ipc.new_file(bestand, tabel.schema) as schrijver:
+        schrijver.write_table(tabel)
+    os.replace(tijdelijk, pad)
+
+    # Oudere bijlagen opruimen; de laatste paar blijven voor lezers die nog bezig zijn
+    if bijlagen:
+        oud = sorted(os.listdir(_bijlagen_map(pad)))[:-BIJLAGEN_BEWAREN]
+        for naam in oud:
+            shutil.rmtree(os.path.join(_bijlagen_map(pad), naam), ignore_errors=True)
+    return pad
+
+
+def lees_bijlage(run, naam, pad=RESULTATEN):
+    # Bijlage van de run uit lees(); None als de run hem niet heeft (oudere resultaten)
+    bijlagen = run.get("bijlagen") or {}
+    if naam not in bijlagen.get("namen", ()):
+        return None
+    return pd.read_parquet(os.path.join(_bijlagen_map(pad), bijlagen["map"], f"{naam}.parquet"))
+
+
+def _uit_regels(regels, vorm):
+    if vorm == "getal":
+        return regels["waarde"].iloc[0] if len(regels) else float("nan")
+    if vorm == "server":
+        maten = list(dict.fromkeys(regels["maat"].astype(str)))
+        tabel = regels.pivot(index="server", columns="maat", values="waarde").reindex(columns=maten)
+        return tabel.rename_axis(index="Server", columns=None)
+    index = pd.Index(regels[vorm].to_numpy(), name=SLEUTELS[vorm])
+    if vorm == "uur":
+        index = index.astype("int64")
+    return pd.Series(regels["waarde"].to_numpy(), index=index)
+
+
+def van_tabel(tabel):
+    # Terug naar dezelfde res als cli.bereken_kpis(): getallen en Series per bron
+    metadata = json.loads(tabel.schema.metadata[b"kpi_resultaten"])
+    if metadata["versie"] != VERSIE:
+        raise ValueError(f"Resultaten hebben versie {metadata['versie']}, verwacht {VERSIE}; draai startscript opnieuw")
+    regels = tabel.to_pandas()
+    naam = regels["kpi"].astype(str) + "_" + regels["bron"].astype(str)
+    groepen = dict(tuple(regels.groupby(naam, sort=False)))
+    leeg = regels.iloc[:0]
+    res = {naam: _uit_regels(groepen.get(naam, leeg), vorm) for naam, vorm in metadata["vormen"].items()}
+    return res, metadata
+
+
+def lees(pad=RESULTATEN):
+    # Memory map: de kolommen worden niet eerst in het geheugen gekopieerd
+    tabel = pa.ipc.open_file(pa.memory_map(pad)).read_all()
+    return van_tabel(tabel)
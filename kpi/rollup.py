@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+
+from . import scenario
+from .config import FOUT_GRENS, UREN, UURTARIEF, fouten_eind, fouten_start
+
+
+# --------------------
+# ROLLUP-KUBUS
+# --------------------
+# Eén scan over de ruwe orders per verversing: per bron (mens/robot), Server,
+# dag en uur de tellingen, sommen en histogrammen van beoordeling en
+# bezorgtijd. De KPI's per dag en per uur en de drill-down in het dashboard
+# (uur -> dag -> week) worden daarna uit deze kleine tabel berekend in plaats
+# van uit de orders.
+#
+# Alle kolommen zijn optelbaar over elke dimensie, behalve Orders (unieke
+# Order_ID's per uur): die is optelbaar over Server, maar over uren heen
+# tellen foutregels van de robot (ERR-id's beginnen per storing opnieuw)
+# mogelijk dubbel. Orders zonder tijdstip staan onder Uur -1; ze tellen mee
+# per dag, niet per uur.
+
+DIMENSIES = ["Bron", "Server", "Date", "Uur"]
+ONBEKEND_UUR = -1
+
+RATING_KOLOMMEN = [f"Rating_{r}" for r in range(1, 11)]
+BEZORG_BAK = 30       # seconden per bak
+BEZORG_MAX = 600      # alles vanaf 10 minuten valt in de laatste bak
+BEZORG_KOLOMMEN = [f"Bezorg_{s}" for s in range(0, BEZORG_MAX + 1, BEZORG_BAK)]
+
+
+def _histogram(groep, aantal_groepen, waarden, aantal):
+    # (groepen, aantal) tellingen in één bincount; NaN of buiten bereik telt niet mee
+    geldig = ~np.isnan(waarden) & (waarden >= 0) & (waarden < aantal)
+    vak = groep[geldig] * aantal + waarden[geldig].astype(np.int64)
+    return np.bincount(vak, minlength=aantal_groepen * aantal).reshape(aantal_groepen, aantal)
+
+
+def _regels(df, bron, tijd_uur, tijd_klaar, loonkosten, kwh):
+    rating = df["Rating"].to_numpy(dtype=float, na_value=np.nan)
+    bezorgtijd = (df["Time_Delivery"] - df[tijd_klaar]).dt.total_seconds().to_numpy()
+    bak = np.minimum(np.floor(bezorgtijd / BEZORG_BAK), len(BEZORG_KOLOMMEN) - 1)
+
+    regels = pd.DataFrame({
+        "Server": df["Server"].astype(object).fillna("onbekend").to_numpy(),
+        "Date": df["Date"].to_numpy(),
+        "Uur": df[tijd_uur].dt.hour.fillna(ONBEKEND_UUR).astype(np.int8).to_numpy(),
+        "Order_ID": df["Order_ID"].array,
+        "Fout": rating < FOUT_GRENS,
+        "Rating_som": np.nan_to_num(rating),
+        "Rating_aantal": ~np.isnan(rating),
+        "Loonkosten": loonkosten,
+        "Kwh": kwh,
+        "Bezorg_som": np.nan_to_num(bezorgtijd),
+        "Bezorg_aantal": ~np.isnan(bezorgtijd),
+    })
+    optellen = ["Fout", "Rating_som", "Rating_aantal", "Loonkosten", "Kwh", "Bezorg_som", "Bezorg_aantal"]
+    groepen = regels.groupby(["Server", "Date", "Uur"], dropna=False, sort=True)
+    kubus = groepen[optellen].sum().join(groepen["Order_ID"].agg(["nunique", "size"]))
+    kubus = kubus.rename(columns={"Fout": "Fouten", "nunique": "Orders", "size": "Regels"}).reset_index()
+
+    # Histogrammen direct op de groepsnummers (zelfde volgorde als de groupby)
+    groep = groepen.ngroup().to_numpy()
+    kubus[RATING_KOLOMMEN] = _histogram(groep, len(kubus), rating - 1, len(RATING_KOLOMMEN))
+    kubus[BEZORG_KOLOMMEN] = _histogram(groep, len(kubus), bak, len(BEZORG_KOLOMMEN))
+    kubus.insert(0, "Bron", bron)
+    return kubus[kubus["Date"].notna()]
+
+
+def bouw_bron(df, bron):
+    # Kubusregels van één bron (bijv. alleen de gewijzigde dagen, zie incremental.py)
+    if bron == "mens":
+        return _regels(df, "mens", "Time_Order", "Time_Ready", loonkosten=UREN * UURTARIEF, kwh=0.0)
+    return _regels(df, "robot", "Time_Picked", "Time_Picked",
+                   loonkosten=0, kwh=df["Power consumption"].to_numpy())
+
+
+def voeg_samen(*delen):
+    # Delen met verschillende dagen of bronnen tot één compacte kubus:
+    # categorieën voor de dimensies, 32-bits tellers
+    kubus = pd.concat(delen, ignore_index=True)
+    kubus["Bron"] = kubus["Bron"].astype(str).astype("category")
+    kubus["Server"] = kubus["Server"].astype(str).astype("category")
+    tellers = ["Fouten", "Rating_aantal", "Bezorg_aantal", "Orders", "Regels", *RATING_KOLOMMEN, *BEZORG_KOLOMMEN]
+    kubus[tellers] = kubus[tellers].astype(np.int32)
+    kubus["Loonkosten"] = kubus["Loonkosten"].astype(np.int64)
+    return kubus[DIMENSIES + [k for k in kubus.columns if k not in DIMENSIES]]
+
+
+def bouw(df_mens, df_robot):
+    return voeg_samen(bouw_bron(df_mens, "mens"), bouw_bron(df_robot, "robot"))
+
+
+# --------------------
+# VRAGEN AAN DE KUBUS
+# --------------------
+def past(filters):
+    # Periode en server zijn dimensies van de kubus, tafel en leeftijd niet
+    return not filters.get("tafels") and filters.get("leeftijd") is None
+
+
+def filter_kubus(kubus, start=None, eind=None, servers=None):
+    masker = pd.Series(True, index=kubus.index)
+    if start is not None:
+        masker &= kubus["Date"] >= pd.Timestamp(start)
+    if eind is not None:
+        masker &= kubus["Date"] < pd.Timestamp(eind).normalize() + pd.Timedelta(days=1)
+    if servers:
+        masker &= kubus["Server"].isin(list(servers))
+    return kubus[masker]
+
+
+def _per_bron(kubus, kolommen, sleutels):
+    per = kubus.groupby(["Bron", *sleutels], observed=True)[kolommen].sum()
+    aanwezig = set(per.index.get_level_values("Bron"))
+    leeg = per.iloc[:0].droplevel("Bron")
+    return [per.xs(bron, level="Bron") if bron in aanwezig else leeg for bron in ("mens", "robot")]
+
+
+def fouten_per_dag(kubus, start=fouten_start, eind=fouten_eind, servers=None):
+    # Zelfde uitkomst als kpis.kpi_fouten_per_dag: alleen dagen met fouten
+    mens, robot = _per_bron(filter_kubus(kubus, start, eind, servers), "Fouten", ["Date"])
+    return tuple(fouten[fouten > 0].astype(np.int64).rename(None) for fouten in (mens, robot))
+
+
+def orders_per_uur(kubus, start=None, eind=None, servers=None):
+    kubus = filter_kubus(kubus, start, eind, servers)
+    mens, robot = _per_bron(kubus[kubus["Uur"] != ONBEKEND_UUR], "Orders", ["Date", "Uur"])
+    return tuple(orders.groupby(level="Uur").mean().rename("Order_ID") for orders in (mens, robot))
+
+
+def kosten_per_dag(kubus, start=None, eind=None, servers=None):
+    mens, robot = _per_bron(filter_kubus(kubus, start, eind, servers), ["Loonkosten", "Kwh"], ["Date"])
+    kosten_mens = mens["Loonkosten"].rename("Kosten")
+    kosten_robot = scenario.kosten_robot(robot["Kwh"]).rename("Power consumption")
+    return kosten_mens, kosten_robot
+
+
+def kostenbasis(kubus, start=None, eind=None, servers=None):
+    # Dagbasis voor het kostenmodel (zie scenario.dagbasis) zonder de orders te lezen
+    mens, robot = _per_bron(filter_kubus(kubus, start, eind, servers), ["Regels", "Kwh"], ["Date"])
+    return scenario._basis(pd.DataFrame({"Orders": mens["Regels"], "Kwh": robot["Kwh"]}))
+
+
+def per_server(kubus, start=None, eind=None, servers=None):
+    # Zelfde uitkomst als kpis.kpi_per_server
+    kubus = filter_kubus(kubus, start, eind, servers)
+    kolommen = ["Regels", "Fouten", "Rating_som", "Rating_aantal", "Bezorg_som", "Bezorg_aantal", "Loonkosten", "Kwh"]
+    mens, robot = _per_bron(kubus, kolommen, ["Server"])
+    dagen = kubus[kubus["Bron"] == "robot"].groupby("Server", observed=True)["Date"].nunique()
+
+    def tabel(per, kosten):
+        uitkomst = pd.DataFrame({
+            "Orders": per["Regels"].astype(np.int64),
+            "Fouten": per["Fouten"].astype(np.int64),
+            "Beoordeling": per["Rating_som"] / per["Rating_aantal"],
+            "Bezorgtijd": per["Bezorg_som"] / per["Bezorg_aantal"],
+            "Kosten": kosten,
+        })
+        uitkomst.index = uitkomst.index.astype(object)
+        return uitkomst
+
+    return (tabel(mens, mens["Loonkosten"]),
+            tabel(robot, scenario.kosten_robot(robot["Kwh"], dagen.reindex(robot.index))))
+
+
+# --------------------
+# DRILL-DOWN (UUR -> DAG -> WEEK)
+# --------------------
+MATEN = {
+    "Orders": lambda k: k["Orders"],
+    "Fouten": lambda k: k["Fouten"],
+    "Gem. beoordeling": lambda k: k["Rating_som"] / k["Rating_aantal"],
+    "Gem. bezorgtijd (s)": lambda k: k["Bezorg_som"] / k["Bezorg_aantal"],
+}
+
+
+def oprollen(kubus, niveau="Dag", start=None, eind=None, servers=None):
+    # Sommen per bron op het gekozen niveau; gemiddelden pas na het optellen
+    kubus = filter_kubus(kubus, start, eind, servers)
+    if niveau == "Uur":
+        kubus = kubus[kubus["Uur"] != ONBEKEND_UUR]
+        sleutel = kubus["Date"] + pd.to_timedelta(kubus["Uur"].astype(np.int64), unit="h")
+    elif niveau == "Dag":
+        sleutel = kubus["Date"]
+    elif niveau == "Week":
+        sleutel = kubus["Date"].dt.to_period("W").dt.start_time
+    else:
+        raise ValueError(f"Onbekend niveau '{niveau}' (Uur, Dag of Week)")
+    waarden = kubus.drop(columns=["Server", "Date", "Uur"])
+    return waarden.groupby(["Bron", sleutel.rename(niveau)], observed=True).sum()
+
+
+def maat(opgerold, naam):
+    # Eén maat uit oprollen() als tabel: niveau x bron (mens, robot)
+    return MATEN[naam](opgerold).unstack("Bron")
+
+
+def bezorg_histogram(kubus, start=None, eind=None, servers=None):
+    kubus = filter_kubus(kubus, start, eind, servers)
+    histogram = kubus.groupby("Bron", observed=True)[BEZORG_KOLOMMEN].sum().T
+    histogram.index = [f"{s}-{s + BEZORG_BAK}" if s < BEZORG_MAX else f"{s}+"
+                       for s in range(0, BEZORG_MAX + 1, BEZORG_BAK)]
+    return histogram
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from .config import PRIJS_KWH, UREN, UURTARIEF, VASTE_KOSTEN_ROBOT
+from .filters import filter_bronnen
+
+
+# --------------------
+# KOSTENMODEL
+# --------------------
+# De kosten per dag hangen af van vijf parameters: uurtarief en uren per order
+# (mens), prijs per kWh, vaste kosten per robot per dag en het aantal robots.
+# Alle vijf zijn invoer van dit model in plaats van vaste getallen; de
+# standaardwaarden komen uit config.py en geven dezelfde uitkomst als
+# kpi_kosten_per_dag.
+#
+# Voor "wat als"-vragen hoeven de orders niet opnieuw gelezen te worden: per
+# dag zijn alleen het aantal menselijke orders, de kWh van de robot en of de
+# robot die dag draaide nodig (dagbasis() uit de frames, rollup.kostenbasis()
+# uit de kubus). doorrekenen() rekent daarop een heel rooster van scenario's in
+# één keer door als matrix scenario × dag.
+
+STANDAARD = {
+    "uurtarief": UURTARIEF,
+    "uren": UREN,
+    "prijs_kwh": PRIJS_KWH,
+    "vaste_kosten": VASTE_KOSTEN_ROBOT,
+    "robots": 1,
+}
+PARAMETERS = tuple(STANDAARD)
+
+# Scenario's per blok, zodat de matrix scenario × dag klein blijft
+BLOK = 4096
+
+
+def kosten_mens(orders, uurtarief=UURTARIEF, uren=UREN):
+    # Elke order kost uren × uurtarief; werkt op getallen, Series en arrays
+    return orders * (uren * uurtarief)
+
+
+def kosten_robot(kwh, dagen=1, prijs_kwh=PRIJS_KWH, vaste_kosten=VASTE_KOSTEN_ROBOT, robots=1):
+    # Stroom plus vaste kosten per robot per dag dat er gereden is
+    return kwh * prijs_kwh + dagen * (vaste_kosten * robots)
+
+
+def dagbasis(df_mens, df_robot, **filters):
+    # Per dag: menselijke orders, kWh robot en of de robot die dag orders had
+    df_mens, df_robot = filter_bronnen(df_mens, df_robot, **filters)
+    basis = pd.DataFrame({
+        "Orders": df_mens.groupby("Date").size(),
+        "Kwh": df_robot.groupby("Date")["Power consumption"].sum(),
+    })
+    return _basis(basis)
+
+
+def _basis(basis):
+    # Dagen die maar in één bron voorkomen tellen voor de andere als 0
+    basis["Robotdag"] = basis["Kwh"].notna()
+    basis = basis.fillna({"Orders": 0, "Kwh": 0.0})
+    return basis.astype({"Orders": np.int64, "Kwh": float}).rename_axis("Date")
+
+
+# --------------------
+# SCENARIO'S
+# --------------------
+def rooster(**waarden):
+    # Alle combinaties van de opgegeven waarden (getal of reeks per parameter);
+    # wat niet is opgegeven krijgt de standaardwaarde
+    onbekend = set(waarden) - set(PARAMETERS)
+    if onbekend:
+        raise ValueError(f"Onbekende parameter(s) {sorted(onbekend)}; kies uit {', '.join(PARAMETERS)}")
+    assen = [np.atleast_1d(np.asarray(waarden.get(naam, STANDAARD[naam]), dtype=float)) for naam in PARAMETERS]
+    return pd.DataFrame({naam: as_.ravel() for naam, as_ in zip(PARAMETERS, np.meshgrid(*assen, indexing="ij"))})
+
+
+def _kolommen(scenarios):
+    ontbreekt = [naam for naam in PARAMETERS if naam not in scenarios]
+    if ontbreekt:
+        raise ValueError(f"Scenario's zonder kolom(men) {ontbreekt}; maak ze met rooster()")
+    return {naam: scenarios[naam].to_numpy(dtype=float) for naam in PARAMETERS}
+
+
+def _totalen(basis, p):
+    # Kosten zijn lineair in elke parameter: totalen uit drie sommen over de dagen
+    orders, kwh, dagen = basis["Orders"].sum(), basis["Kwh"].sum(), basis["Robotdag"].sum()
+    return (kosten_mens(orders, p["uurtarief"], p["uren"]),
+            kosten_robot(kwh, dagen, p["prijs_kwh"], p["vaste_kosten"], p["robots"]))
+
+
+def doorrekenen(basis, scenarios):
+    # Per scenario de totale kosten over de periode, de besparing door de robot
+    # en op hoeveel dagen (waarop mens en robot allebei orders hadden) de robot
+    # goedkoper was
+    p = _kolommen(scenarios)
+    mens, robot = _totalen(basis, p)
+
+    orders = basis["Orders"].to_numpy(dtype=float)
+    kwh = basis["Kwh"].to_numpy()
+    robotdag = basis["Robotdag"].to_numpy(dtype=float)
+    samen = (orders > 0) & basis["Robotdag"].to_numpy()
+    goedkoper = np.empty(len(scenarios), dtype=np.int64)
+    for begin in range(0, len(scenarios), BLOK):
+        blok = slice(begin, begin + BLOK)
+        per_dag_mens = np.outer(p["uren"][blok] * p["uurtarief"][blok], orders)
+        per_dag_robot = (np.outer(p["prijs_kwh"][blok], kwh)
+                         + np.outer(p["vaste_kosten"][blok] * p["robots"][blok], robotdag))
+        goedkoper[blok] = ((per_dag_robot < per_dag_mens) & samen).sum(axis=1)
+
+    uitkomst = scenarios[list(PARAMETERS)].copy()
+    uitkomst["Kosten_mens"] = mens
+    uitkomst["Kosten_robot"] = robot
+    uitkomst["Besparing"] = mens - robot
+    uitkomst["Dagen_goedkoper"] = goedkoper
+    return uitkomst
+
+
+def break_even(basis, scenarios, parameter):
+    # Waarde van `parameter` waarbij mens en robot over de periode even duur
+    # zijn, bij de overige parameters van elk scenario. Lineair, dus uit de
+    # besparing bij 0 en bij 1; NaN als de parameter geen verschil maakt.
+    if parameter not in PARAMETERS:
+        raise ValueError(f"Onbekende parameter '{parameter}'; kies uit {', '.join(PARAMETERS)}")
+    scenarios = scenarios.assign(**{parameter: 0.0})
+    nul = np.subtract(*_totalen(basis, _kolommen(scenarios)))
+    een = np.subtract(*_totalen(basis, _kolommen(scenarios.assign(**{parameter: 1.0}))))
+    helling = een - nul
+    with np.errstate(divide="ignore", invalid="ignore"):
+        waarde = np.where(helling != 0, -nul / helling, np.nan)
+    return pd.Series(waarde, index=scenarios.index, name=parameter)
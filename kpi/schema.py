@@ -0,0 +1,108 @@
+import pandas as pd
+
+
+# --------------------
+# SCHEMA VAN DE ORDERFRAMES
+# --------------------
+# Hoe elke kolom na het inlezen in het geheugen staat: categorieën voor tekst
+# met weinig verschillende waarden, kleine (nullable) integers voor tafel,
+# beoordeling en leeftijd, Arrow-strings voor unieke tekst en een booleaanse
+# foutvlag voor de robot. Vaste waarden per bron (uren en uurtarief van het
+# personeel) staan als constante in config.py, niet als kolom.
+
+try:
+    import pyarrow  # noqa: F401
+    TEKST = "string[pyarrow]"
+except ImportError:
+    # Zonder pyarrow blijven unieke teksten Python-strings
+    TEKST = object
+
+SCHEMA_MENS = {
+    "Order_ID": "int32",
+    "Server": "category",
+    "Table": "category",
+    "Rating": "Int8",
+    "Coupon": "category",
+    "Payment_Method": "category",
+    "Comment": "category",
+    "Voedselallergie": "category",
+    "Locatie": TEKST,
+    "Leeftijd": "int8",
+}
+
+SCHEMA_ROBOT = {
+    "Order_ID": TEKST,
+    "Server": "category",
+    "Table": "Int8",
+    "Rating": "Int8",
+    "Comment": "category",
+    "Error_code": "category",
+    "Age": "int8",
+}
+
+
+def _categorie(waarden):
+    # Gemengde waarden (getal en tekst) eerst als tekst, lege waarden blijven leeg
+    return waarden.where(waarden.isna(), waarden.astype(str)).astype("category")
+
+
+def _geheel_getal(waarden, dtype):
+    # Afronden is niet nodig (het zijn hele getallen), maar float -> Int8 eist het
+    return pd.to_numeric(waarden, errors="coerce").round().astype(dtype)
+
+
+def toepassen(df, schema):
+    for kolom, dtype in schema.items():
+        if kolom not in df:
+            continue
+        if dtype == "category":
+            df[kolom] = _categorie(df[kolom])
+        elif dtype in ("int8", "int32", "Int8"):
+            df[kolom] = _geheel_getal(df[kolom], dtype)
+        else:
+            df[kolom] = df[kolom].astype(dtype)
+    return df
+
+
+def herstel(df, schema):
+    # Parquet bewaart Arrow-strings als gewone pandas-strings: opnieuw omzetten
+    return toepassen(df, {kolom: dtype for kolom, dtype in schema.items() if dtype == TEKST})
+
+
+def met_foutvlag(df_robot):
+    # Lege foutcodes ("") worden leeg (NaN), Fout is True bij een echte foutcode
+    code = df_robot["Error_code"]
+    df_robot["Error_code"] = code.where(code != "").cat.remove_unused_categories()
+    df_robot["Fout"] = df_robot["Error_code"].notna()
+    return df_robot
+
+
+def foutvlag(df_robot):
+    # Frames uit bronnen.py hebben de vlag al; losse batches (live, SQL) nog niet
+    if "Fout" in df_robot:
+        return df_robot["Fout"]
+    code = df_robot["Error_code"]
+    return code.notna() & (code != "")
+
+
+# --------------------
+# GEHEUGENRAPPORT
+# --------------------
+def geheugen(df):
+    # Bytes per kolom, inclusief de inhoud van strings en categorieën
+    return df.memory_usage(deep=True, index=False)
+
+
+def _mb(aantal):
+    return f"{aantal / 1e6:8.2f} MB"
+
+
+def geheugenrapport(naam, voor, na):
+    voor_kolom, na_kolom = geheugen(voor), geheugen(na)
+    kolommen = list(dict.fromkeys([*voor_kolom.index, *na_kolom.index]))
+    print(f"\n🧠 Geheugen {naam} ({len(na)} rijen): {_mb(voor_kolom.sum())} -> {_mb(na_kolom.sum())}")
+    for kolom in kolommen:
+        a, b = voor_kolom.get(kolom, 0), na_kolom.get(kolom, 0)
+        dtype = str(na[kolom].dtype) if kolom in na else "-"
+        print(f"  {kolom:<18} {_mb(a)} -> {_mb(b)}  {dtype}")
+    return int(voor_kolom.sum()), int(na_kolom.sum())
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+
+# --------------------
+# BEZORGTIJD-SCHETS (PERCENTIELEN)
+# --------------------
+# Exacte percentielen over een groeiende historie vragen alle orders. In
+# plaats daarvan houden we per bron, Server en dag een schets bij: het aantal
+# bezorgtijden per logaritmische bak (zoals DDSketch). Elke bak beslaat een
+# factor GAMMA, dus een percentiel uit de schets wijkt hooguit RELATIEVE_FOUT
+# af van de echte waarde. Schetsen zijn optelbaar: een week of maand is de
+# som van de dagschetsen, zonder de orders opnieuw te lezen.
+
+RELATIEVE_FOUT = 0.01
+GAMMA = (1 + RELATIEVE_FOUT) / (1 - RELATIEVE_FOUT)
+PERCENTIELEN = (0.5, 0.9, 0.99)
+
+NIVEAUS = {"Dag": "D", "Week": "W", "Maand": "M"}
+
+# Begin van de bezorging per bron
+TIJD_KLAAR = {"mens": "Time_Ready", "robot": "Time_Picked"}
+
+
+def _bak(seconden):
+    # Bak k bevat (GAMMA^(k-1), GAMMA^k]; alles onder 1 seconde telt als bak 0
+    return np.ceil(np.log(np.maximum(seconden, 1)) / np.log(GAMMA)).astype(np.int16)
+
+
+def _waarde(bak):
+    # Midden van de bak: relatieve fout hooguit RELATIEVE_FOUT
+    return np.where(bak == 0, 0.0, 2 * GAMMA ** bak.astype(float) / (GAMMA + 1))
+
+
+def bouw_bron(df, bron):
+    # Schets van één bron per Server en dag (bijv. alleen de gewijzigde dagen, zie incremental.py)
+    seconden = (df["Time_Delivery"] - df[TIJD_KLAAR[bron]]).dt.total_seconds()
+    geldig = seconden.notna().to_numpy() & df["Date"].notna().to_numpy()
+    regels = pd.DataFrame({
+        "Server": df["Server"].astype(object).fillna("onbekend").to_numpy()[geldig],
+        "Date": df["Date"].to_numpy()[geldig],
+        "Bak": _bak(seconden.to_numpy()[geldig]),
+    })
+    schets = regels.groupby(["Server", "Date", "Bak"]).size().rename("Aantal").reset_index()
+    schets.insert(0, "Bron", bron)
+    return schets
+
+
+def bouw(df_mens, df_robot):
+    schets = pd.concat([bouw_bron(df_mens, "mens"), bouw_bron(df_robot, "robot")], ignore_index=True)
+    schets["Bron"] = schets["Bron"].astype("category")
+    schets["Server"] = schets["Server"].astype("category")
+    schets["Aantal"] = schets["Aantal"].astype(np.int32)
+    return schets
+
+
+def voeg_samen(*schetsen):
+    # Bijv. de schets van een nieuwe batch bij de bestaande historie optellen
+    schets = pd.concat(schetsen, ignore_index=True)
+    for kolom in ("Bron", "Server"):
+        schets[kolom] = schets[kolom].astype(str).astype("category")
+    samen = schets.groupby(["Bron", "Server", "Date", "Bak"], observed=True)["Aantal"].sum()
+    return samen.astype(np.int32).reset_index()
+
+
+def filter_schets(schets, start=None, eind=None, servers=None):
+    masker = pd.Series(True, index=schets.index)
+    if start is not None:
+        masker &= schets["Date"] >= pd.Timestamp(start)
+    if eind is not None:
+        masker &= schets["Date"] < pd.Timestamp(eind).normalize() + pd.Timedelta(days=1)
+    if servers:
+        masker &= schets["Server"].isin(list(servers))
+    return schets[masker]
+
+
+def _kwantielen(per_bak, sleutels, percentielen):
+    # per_bak: Aantal per (sleutels..., Bak), gesorteerd; zoek per groep de bak
+    # waarin de cumulatieve telling de rang q * (n - 1) voorbijgaat
+    groepen = per_bak.groupby(level=sleutels, observed=True, sort=False)
+    cumulatief = groepen.cumsum()
+    totaal = groepen.transform("sum")
+    uitkomst = {}
+    for q in percentielen:
+        voorbij = cumulatief > q * (totaal - 1)
+        eerste = voorbij[voorbij].groupby(level=sleutels, observed=True).head(1)
+        uitkomst[f"p{q * 100:g}"] = pd.Series(_waarde(eerste.index.get_level_values("Bak").to_numpy()),
+                                              index=eerste.index.droplevel("Bak"))
+    return pd.DataFrame(uitkomst)
+
+
+def kwantielen(schets, niveau=None, percentielen=PERCENTIELEN, start=None, eind=None, servers=None):
+    # Percentielen per bron (niveau None) of per bron en dag/week/maand
+    schets = filter_schets(schets, start, eind, servers)
+    sleutels = [schets["Bron"]]
+    if niveau is not None:
+        sleutels.append(schets["Date"].dt.to_period(NIVEAUS[niveau]).dt.start_time.rename(niveau))
+    per_bak = schets.groupby([*sleutels, schets["Bak"]], observed=True)["Aantal"].sum().sort_index()
+    return _kwantielen(per_bak, [s.name for s in sleutels], percentielen)
@@ -0,0 +1,132 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+
+# --------------------
+# DATUM EN TIJD NORMALISEREN
+# --------------------
+# Beide bronnen leveren een datum en losse tijdstippen: tekst "HH:MM:SS" in
+# het robotlog, datetime.time (en soms "onbekend" of leeg) in de Excel. Die
+# worden één keer omgezet naar absolute datetime64-kolommen door de datum en
+# de tijd sinds middernacht op te tellen, met vaste formaten en zonder
+# tussenstap via tekst. Alle KPI's gebruiken daarna dezelfde kolommen.
+
+DATUM_FORMAAT = "%d-%m-%Y"
+TIJD_FORMAAT = "%H:%M:%S"
+
+_NUL = pd.Timestamp("1900-01-01")
+
+
+def _tekens(waarden, breedte):
+    # Tekst met vaste breedte als (n, breedte)-array van tekencodes; langere
+    # tekst wordt niet afgekapt maar herkenbaar gemaakt (laatste teken != 0)
+    tekst = np.asarray(waarden, dtype=object).astype(f"U{breedte + 1}")
+    return tekst.view(np.uint32).reshape(len(tekst), breedte + 1)
+
+
+def _cijfers(tekens, *posities):
+    waarde = np.zeros(len(tekens), dtype=np.int64)
+    geldig = np.ones(len(tekens), dtype=bool)
+    for pos in posities:
+        cijfer = tekens[:, pos].astype(np.int64) - ord("0")
+        geldig &= (cijfer >= 0) & (cijfer <= 9)
+        waarde = waarde * 10 + cijfer
+    return waarde, geldig
+
+
+def _dd_mm_jjjj(waarden):
+    # "dd-mm-jjjj" rekenkundig naar datetime64; ongeldige datums worden NaT
+    tekens = _tekens(waarden, 10)
+    dag, geldig_d = _cijfers(tekens, 0, 1)
+    maand, geldig_m = _cijfers(tekens, 3, 4)
+    jaar, geldig_j = _cijfers(tekens, 6, 7, 8, 9)
+    geldig = (geldig_d & geldig_m & geldig_j & (tekens[:, 2] == ord("-")) & (tekens[:, 5] == ord("-"))
+              & (tekens[:, 10] == 0) & (maand >= 1) & (maand <= 12) & (dag >= 1))
+    maanden = np.where(geldig, (jaar - 1970) * 12 + maand - 1, 0).astype("datetime64[M]")
+    lengte = ((maanden + 1).astype("datetime64[D]") - maanden.astype("datetime64[D]")).astype(np.int64)
+    geldig &= dag <= lengte
+    datums = maanden.astype("datetime64[D]") + np.where(geldig, dag - 1, 0).astype("timedelta64[D]")
+    return np.where(geldig, datums, np.datetime64("NaT")).astype("datetime64[ns]")
+
+
+def _uu_mm_ss(waarden):
+    # "HH:MM:SS" rekenkundig naar timedelta64; ongeldige tijden worden NaT
+    tekens = _tekens(waarden, 8)
+    uur, geldig_u = _cijfers(tekens, 0, 1)
+    minuut, geldig_m = _cijfers(tekens, 3, 4)
+    seconde, geldig_s = _cijfers(tekens, 6, 7)
+    geldig = (geldig_u & geldig_m & geldig_s & (tekens[:, 2] == ord(":")) & (tekens[:, 5] == ord(":"))
+              & (tekens[:, 8] == 0) & (uur < 24) & (minuut < 60) & (seconde < 60))
+    seconden = (uur * 3600 + minuut * 60 + seconde).astype("timedelta64[s]")
+    return np.where(geldig, seconden, np.timedelta64("NaT")).astype("timedelta64[ns]")
+
+
+def _strptime(waarden, formaat):
+    return pd.to_datetime(pd.Series(waarden, dtype=object), format=formaat, errors="coerce").to_numpy()
+
+
+def _met_terugval(snel, waarden, formaat, verschuiving=None):
+    # Wat de snelle weg niet kon lezen (bijv. "1-5-2025") alsnog met strptime
+    # proberen; dat zijn er normaal geen of heel weinig
+    leeg = np.flatnonzero(np.isnat(snel))
+    opnieuw = np.array([i for i in leeg if isinstance(waarden[i], str) and waarden[i] != ""], dtype=np.int64)
+    if len(opnieuw):
+        uitkomst = _strptime(waarden[opnieuw], formaat)
+        snel[opnieuw] = uitkomst if verschuiving is None else uitkomst - verschuiving
+    return snel
+
+
+def datum(waarden, formaat=DATUM_FORMAAT):
+    waarden = pd.Series(waarden) if not isinstance(waarden, pd.Series) else waarden
+    if pd.api.types.is_datetime64_dtype(waarden):
+        return waarden
+    objecten = waarden.to_numpy(dtype=object)
+    if formaat == DATUM_FORMAAT:
+        uitkomst = _met_terugval(_dd_mm_jjjj(objecten), objecten, formaat)
+    else:
+        uitkomst = _strptime(objecten, formaat)
+    return pd.Series(uitkomst, index=waarden.index)
+
+
+def _seconden(waarde):
+    # datetime.time -> seconden; tekst -> -1 (apart parsen); de rest -> NaN
+    if isinstance(waarde, datetime.time):
+        return waarde.hour * 3600 + waarde.minute * 60 + waarde.second + waarde.microsecond / 1e6
+    if isinstance(waarde, str):
+        return -1.0
+    return np.nan
+
+
+def _tekst_naar_tijd(waarden, formaat):
+    if formaat == TIJD_FORMAAT:
+        return _met_terugval(_uu_mm_ss(waarden), waarden, formaat, np.datetime64(_NUL))
+    return _strptime(waarden, formaat) - np.datetime64(_NUL)
+
+
+def tijd_van_dag(waarden, formaat=TIJD_FORMAAT):
+    # Tijd sinds middernacht als timedelta64; lege of onleesbare waarden worden NaT
+    waarden = pd.Series(waarden) if not isinstance(waarden, pd.Series) else waarden
+    if pd.api.types.is_timedelta64_dtype(waarden):
+        return waarden
+    if pd.api.types.is_datetime64_dtype(waarden):
+        return waarden - waarden.dt.normalize()
+
+    objecten = waarden.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(objecten, skipna=True) in ("string", "empty"):
+        return pd.Series(_tekst_naar_tijd(objecten, formaat), index=waarden.index)
+
+    # Gemengd (Excel): datetime.time rekenkundig, tekst met het vaste formaat
+    seconden = np.fromiter((_seconden(w) for w in objecten), dtype=float, count=len(objecten))
+    tekst = seconden == -1
+    # Kopie: onder pandas 3 is de array van to_timedelta alleen-lezen
+    tijd = pd.to_timedelta(np.where(tekst, np.nan, seconden), unit="s").to_numpy().copy()
+    if tekst.any():
+        tijd[tekst] = _tekst_naar_tijd(objecten[tekst], formaat)
+    return pd.Series(tijd, index=waarden.index)
+
+
+def absoluut(datums, tijden, formaat=TIJD_FORMAAT):
+    # Datum (middernacht) + tijdstip -> absolute datetime64
+    return datums.dt.normalize() + tijd_van_dag(tijden, formaat)
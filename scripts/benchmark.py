@@ -0,0 +1,296 @@
+# Benchmark van de KPI-pijplijn op synthetische data van verschillende grootte.
+#
+#   python scripts/benchmark.py                      # alle maten
+#   python scripts/benchmark.py --maten 1w 3m        # alleen de kleine
+#   python scripts/benchmark.py --vergelijk .kpi_bench/resultaten/<oud>.json
+#
+# Per maat wordt (één keer, daarna hergebruikt) een robotlog gemaakt met de
+# gevectoriseerde generator uit generate_robot_log.py en een Excel met menselijke
+# orders. Daarna wordt elke stap apart gemeten: inlezen, normaliseren, elke
+# KPI-functie en het bouwen van kubus en schetsen. De tijden komen uit een run zonder tracemalloc; de piek in
+# geheugen uit een tweede run met tracemalloc (die is trager, dus de tijden van
+# die run worden niet gebruikt). Het resultaat is een JSON-bestand per commit.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import generate_robot_log as generator  # noqa: E402
+from kpi import bronnen, rollup, scenario, schets  # noqa: E402
+from kpi.downtime import beschikbaarheid_robot  # noqa: E402
+from kpi.kpis import (kpi_bezorgsnelheid, kpi_bezorgtijd_percentielen, kpi_fouten_per_dag,  # noqa: E402
+                      kpi_klanttevredenheid_jong, kpi_kosten_per_dag, kpi_orders_per_uur, kpi_per_server)
+from kpi.logstream import BATCH_GROOTTE, iter_records, typeer_batch  # noqa: E402
+from kpi.meting import Meter  # noqa: E402
+
+BENCH_MAP = os.path.join(REPO, ".kpi_bench")
+START = datetime(2025, 1, 6)
+
+# naam: (dagen, robots)
+MATEN = {
+    "1w": (7, 1),
+    "3m": (91, 1),
+    "1y": (365, 1),
+    "10x1y": (365, 10),
+}
+
+# Kans op een extra storing per robot per dag
+STORING_KANS = 0.05
+# Ophogen als de generator andere data maakt: oude data wordt dan niet hergebruikt
+DATA_VERSIE = 2
+
+
+# --------------------
+# SYNTHETISCHE DATA
+# --------------------
+def maak_robotlog(pad, dagen, robots, seed):
+    # Gevectoriseerde generator, weggeschreven als JSON-array zoals het echte log
+    eind = (START + timedelta(days=dagen - 1)).date().isoformat()
+    blokken = generator.generate_log_vectorized(START.date().isoformat(), eind, robots, seed, STORING_KANS)
+    return generator.write_log(blokken, pad, "json")
+
+
+def maak_mens(pad, dagen, seed):
+    # Zelfde kolommen en eigenaardigheden als besteldata.xlsx: tijden als
+    # tijdstip zonder datum, soms leeg of "onbekend", tafels als "Table_n"
+    rng = np.random.default_rng(seed)
+    per_dag = rng.integers(190, 215, size=dagen)
+    n = int(per_dag.sum())
+    datum = np.repeat(pd.date_range(START, periods=dagen).to_numpy(), per_dag)
+
+    order = rng.integers(9 * 3600, 21 * 3600, size=n)
+    klaar = order + rng.integers(300, 1500, size=n)
+    bezorgd = klaar + rng.integers(30, 300, size=n)
+
+    def tijden(seconden, leeg=0.02):
+        waarden = pd.Series(pd.to_datetime(seconden, unit="s").time, dtype=object)
+        kans = rng.random(n)
+        waarden[kans < leeg] = np.nan
+        waarden[(kans >= leeg) & (kans < leeg + 0.001)] = "onbekend"
+        return waarden
+
+    def soms(keuzes, kans):
+        waarden = pd.Series(rng.choice(keuzes, size=n), dtype=object)
+        return waarden.where(rng.random(n) < kans)
+
+    leeftijd = np.where(rng.random(n) < 0.43, rng.integers(18, 45, size=n), rng.integers(45, 91, size=n))
+    df = pd.DataFrame({
+        "Order_ID": np.arange(1, n + 1),
+        "Date": datum,
+        "Time_Order": tijden(order),
+        "Time_Ready": tijden(klaar),
+        "Time_Delivery": tijden(bezorgd),
+        "Server": [f"Server_{i}" for i in rng.integers(1, 9, size=n)],
+        "Table": [f"Table_{i}" for i in rng.integers(1, 21, size=n)],
+        "Rating": rng.choice(np.arange(1, 11), size=n, p=[.02, .02, .03, .03, .05, .1, .2, .25, .2, .1]),
+        "Coupon": soms(["JARIG10", "BLACKFRIDAY30", "CYBERMONDAY20", "WELKOM05"], 0.09),
+        "Total_Amount": rng.uniform(10, 100, size=n).round(2),
+        "Payment_Method": rng.choice(["Creditcard", "Pin", "Contant"], size=n, p=[.47, .43, .10]),
+        "Birth_Date": datum - (leeftijd * 365 + rng.integers(0, 365, size=n)).astype("timedelta64[D]"),
+        "Comment": soms(["Koud gerecht!", "lekker", "Alles koud", "handmatig"], 0.05),
+        "Voedselallergie": soms(["Gluten", "Soja", "Eieren", "Vis", "Noten", "Zuivel"], 0.2),
+        "Locatie": np.nan,
+    })
+    df.to_excel(pad, index=False)
+    return n
+
+
+def data_voor(maat, seed):
+    dagen, robots = MATEN[maat]
+    map_ = os.path.join(BENCH_MAP, "data", f"{maat}-s{seed}-v{DATA_VERSIE}")
+    os.makedirs(map_, exist_ok=True)
+    robot = os.path.join(map_, "robot_restaurant_log.json")
+    mens = os.path.join(map_, "besteldata.xlsx")
+    if not os.path.exists(robot):
+        print(f"🛠️ {maat}: robotlog maken ({dagen} dagen × {robots} robot(s))")
+        maak_robotlog(robot + ".tmp", dagen, robots, seed)
+        os.replace(robot + ".tmp", robot)
+    if not os.path.exists(mens):
+        print(f"🛠️ {maat}: menselijke orders maken ({dagen} dagen)")
+        maak_mens(mens + ".tmp.xlsx", dagen, seed)
+        os.replace(mens + ".tmp.xlsx", mens)
+    return mens, robot
+
+
+# --------------------
+# METEN
+# --------------------
+# Stappen met kpi.meting.Meter, dezelfde meter als startscript (--tracemalloc)
+def pijplijn(mens_pad, robot_pad, meter):
+    with meter.stap("inlezen_excel"):
+        ruw_mens = pd.read_excel(mens_pad)
+    with meter.stap("normaliseren_mens"):
+        df_mens = bronnen.normaliseer_mens(ruw_mens)
+    del ruw_mens
+
+    # Het robotlog wordt gestreamd: JSON decoderen en typeren wisselen elkaar
+    # per batch af, dus de tijden worden per stap opgeteld
+    batches = []
+    records = iter_records(robot_pad)
+    while True:
+        with meter.stap("inlezen_json"):
+            batch = [r for _, r in zip(range(BATCH_GROOTTE), records)]
+        if not batch:
+            break
+        with meter.stap("normaliseren_robot"):
+            batches.append(typeer_batch(batch))
+    with meter.stap("normaliseren_robot"):
+        df_robot = bronnen.normaliseer_robot(pd.concat(batches, ignore_index=True))
+    del batches, batch
+
+    for functie in (kpi_klanttevredenheid_jong, kpi_bezorgsnelheid, kpi_orders_per_uur, kpi_kosten_per_dag):
+        with meter.stap(functie.__name__):
+            functie(df_mens, df_robot)
+    with meter.stap("kpi_fouten_per_dag"):
+        kpi_fouten_per_dag(df_mens, df_robot, start=None, eind=None)
+    with meter.stap("kpi_beschikbaarheid_robot"):
+        beschikbaarheid_robot(df_robot)
+    with meter.stap("kpi_per_server"):
+        kpi_per_server(df_mens, df_robot)
+
+    # Zoals cli.bereken_kpis: kubus en schetsen één keer bouwen, de percentielen
+    # lezen de schetsen. Een extra bouw valt op in rollup_bouw/schets_bouw.
+    with meter.stap("rollup_bouw"):
+        rollup.bouw(df_mens, df_robot)
+    with meter.stap("schets_bouw"):
+        dagschetsen = schets.bouw(df_mens, df_robot)
+    with meter.stap("kpi_bezorgtijd_percentielen"):
+        kpi_bezorgtijd_percentielen(df_mens, df_robot, dagschetsen=dagschetsen)
+    with meter.stap("scenario_dagbasis"):
+        basis = scenario.dagbasis(df_mens, df_robot)
+    with meter.stap("scenario_rooster"):
+        # 10 × 4 × 5 × 41 × 5 = 41.000 scenario's in één keer
+        scenario.doorrekenen(basis, scenario.rooster(
+            uurtarief=np.linspace(10, 30, 10), uren=[4, 5, 6, 7], prijs_kwh=np.linspace(0.2, 0.6, 5),
+            vaste_kosten=np.arange(0, 2001, 50), robots=[1, 2, 3, 4, 5]))
+
+    return len(df_mens), len(df_robot)
+
+
+def meet(maat, seed, herhalingen, geheugen):
+    mens_pad, robot_pad = data_voor(maat, seed)
+    print(f"⏱️ {maat}: meten")
+
+    stappen = None
+    for _ in range(herhalingen):
+        with Meter() as meter:
+            rijen_mens, rijen_robot = pijplijn(mens_pad, robot_pad, meter)
+        if stappen is None:
+            stappen = meter.stappen
+        else:
+            for naam, meting in meter.stappen.items():
+                stappen[naam]["seconden"] = min(stappen[naam]["seconden"], meting["seconden"])
+
+    if geheugen:
+        with Meter(geheugen=True) as meter:
+            pijplijn(mens_pad, robot_pad, meter)
+        for naam, meting in meter.stappen.items():
+            stappen[naam]["piek_mb"] = round(meting["piek_mb"], 1)
+    else:
+        for meting in stappen.values():
+            meting["piek_mb"] = None
+
+    for meting in stappen.values():
+        meting["seconden"] = round(meting["seconden"], 4)
+    return {
+        "dagen": MATEN[maat][0],
+        "robots": MATEN[maat][1],
+        "rijen_mens": rijen_mens,
+        "rijen_robot": rijen_robot,
+        "stappen": stappen,
+    }
+
+
+# --------------------
+# RAPPORT
+# --------------------
+def _commit():
+    try:
+        uit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                             capture_output=True, text=True, check=True)
+        return uit.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "onbekend"
+
+
+def print_maat(maat, uitkomst):
+    print(f"\n📊 {maat}: {uitkomst['rijen_mens']} orders mens, {uitkomst['rijen_robot']} records robot")
+    for naam, meting in uitkomst["stappen"].items():
+        piek = "" if meting["piek_mb"] is None else f"{meting['piek_mb']:10.1f} MB"
+        print(f"  {naam:<28} {meting['seconden']:9.3f}s{piek}")
+
+
+def vergelijk(oud, nieuw, drempel, min_verschil=0.05):
+    # Factor nieuw/oud per stap; boven de drempel telt als regressie, maar pas
+    # als de stap ook echt langer duurt (kleine stappen zijn vooral ruis)
+    regressies = []
+    print(f"\n🔍 Vergelijking {oud['commit']} -> {nieuw['commit']}")
+    for maat, uitkomst in nieuw["maten"].items():
+        if maat not in oud["maten"]:
+            continue
+        for naam, meting in uitkomst["stappen"].items():
+            vorige = oud["maten"][maat]["stappen"].get(naam)
+            if not vorige or not vorige["seconden"]:
+                continue
+            factor = meting["seconden"] / vorige["seconden"]
+            regressie = factor > drempel and meting["seconden"] - vorige["seconden"] > min_verschil
+            teken = "❌" if regressie else "  "
+            print(f"{teken} {maat:<6} {naam:<28} {vorige['seconden']:9.3f}s -> {meting['seconden']:9.3f}s  ×{factor:.2f}")
+            if regressie:
+                regressies.append((maat, naam))
+    return regressies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KPI-pijplijn meten op synthetische data")
+    parser.add_argument("--maten", nargs="+", choices=list(MATEN), default=list(MATEN))
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--herhalingen", type=int, default=1, help="beste tijd van N runs")
+    parser.add_argument("--geen-geheugen", action="store_true", help="geen tracemalloc-run")
+    parser.add_argument("--uitvoer", help="JSON-bestand (standaard .kpi_bench/resultaten/<commit>.json)")
+    parser.add_argument("--vergelijk", help="eerder resultaat om mee te vergelijken")
+    parser.add_argument("--drempel", type=float, default=1.2, help="factor waarboven een stap als regressie telt")
+    args = parser.parse_args(argv)
+
+    # De KPI-functies lezen het beschikbaarheidsbestand relatief aan de repo
+    os.chdir(REPO)
+    resultaat = {
+        "commit": _commit(),
+        "tijdstip": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "data_versie": DATA_VERSIE,
+        "maten": {},
+    }
+    for maat in args.maten:
+        resultaat["maten"][maat] = meet(maat, args.seed, args.herhalingen, not args.geen_geheugen)
+        print_maat(maat, resultaat["maten"][maat])
+
+    uitvoer = args.uitvoer or os.path.join(BENCH_MAP, "resultaten", f"{resultaat['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(uitvoer)), exist_ok=True)
+    with open(uitvoer, "w", encoding="utf-8") as f:
+        json.dump(resultaat, f, indent=2)
+    print(f"\n💾 Resultaten opgeslagen in {uitvoer}")
+
+    if args.vergelijk:
+        with open(args.vergelijk, encoding="utf-8") as f:
+            regressies = vergelijk(json.load(f), resultaat, args.drempel)
+        if regressies:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
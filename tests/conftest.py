@@ -0,0 +1,14 @@
+import os
+
+import pytest
+
+from kpi import bronnen
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def frames():
+    # De meegeleverde besteldata en het robotlog (paden in config.py zijn relatief aan de repo)
+    os.chdir(REPO)
+    return bronnen.df_mens(), bronnen.df_robot()
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from kpi import config  # noqa: E402
+from kpi.cli import bereken_kpis, schrijf_resultaten  # noqa: E402
+from conftest import REPO  # noqa: E402
+
+
+@pytest.fixture
+def dashboard(frames, tmp_path, monkeypatch):
+    # Resultaten en bijlagen in een lege map; de bronnen blijven die van de repo
+    for naam in ("bestand_excel", "bestand_robot", "bestand_beschikbaarheid"):
+        monkeypatch.setattr(config, naam, os.path.join(REPO, getattr(config, naam)))
+    monkeypatch.chdir(tmp_path)
+    schrijf_resultaten(bereken_kpis(*frames, modus="uit", toon=False))
+    app = AppTest.from_file(os.path.join(REPO, "dashboard.py"), default_timeout=60)
+    return app.run()
+
+
+def test_zonder_filters(dashboard):
+    assert not dashboard.exception
+
+
+@pytest.mark.parametrize("kies", [
+    lambda app: app.sidebar.multiselect[0].set_value(["3"]),
+    lambda app: app.sidebar.date_input[0].set_value(("2025-01-01", "2025-03-01")),
+])
+def test_lege_selectie(dashboard, kies):
+    kies(dashboard).run()
+    assert not dashboard.exception
+    assert any("Geen" in info.value for info in dashboard.info)
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from kpi import database  # noqa: E402
+
+
+def _tabel(engine, tabel):
+    with engine.connect() as conn:
+        return pd.read_sql(tabel.select(), conn)
+
+
+def test_twee_keer_laden_is_idempotent(frames, tmp_path):
+    engine = database.maak_engine(f"sqlite:///{tmp_path / 'kpi.db'}")
+    database.maak_tabellen(engine)
+    res = {
+        "score_robot": 7.5,
+        "fouten_robot": pd.Series([3, 1], index=pd.DatetimeIndex(["2025-04-28", "2025-04-29"], name="Date")),
+        "orders_robot": pd.Series([4.0, 6.0], index=pd.Index([12, 13], name="Uur")),
+    }
+    for _ in range(2):
+        database.laad_orders(engine, *frames)
+        database.laad_resultaten(engine, res)
+    assert len(_tabel(engine, database.orders)) == sum(len(df) for df in frames)
+    assert len(_tabel(engine, database.kpi_totaal)) == 1
+    assert len(_tabel(engine, database.kpi_per_dag)) == 2
+    assert len(_tabel(engine, database.kpi_per_uur)) == 2
+
+    # Een dag zonder fouten valt uit het resultaat en dus ook uit de tabel
+    database.laad_resultaten(engine, {**res, "fouten_robot": res["fouten_robot"].iloc[:1]})
+    per_dag = _tabel(engine, database.kpi_per_dag)
+    assert per_dag["datum"].astype(str).tolist() == ["2025-04-28"]
+    assert per_dag["waarde"].tolist() == [3.0]
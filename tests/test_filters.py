@@ -0,0 +1,36 @@
+import pandas as pd
+
+from kpi import config
+from kpi.downtime import beschikbaarheid_robot
+from kpi.filters import tijdlijn
+from kpi.kpis import kpi_beschikbaarheid_totaal
+
+
+def _robotlog():
+    # Eén robot, één dag: werk, twee storingen op andere tafels, werk
+    tijden = pd.to_datetime(["2025-05-01 09:00", "2025-05-01 10:00", "2025-05-01 11:00",
+                             "2025-05-01 12:00", "2025-05-01 13:00"])
+    return pd.DataFrame({
+        "Date": pd.to_datetime(["2025-05-01"] * 5),
+        "Time_Picked": tijden,
+        "Server": ["server_1"] * 5,
+        "Table": [3, 5, 3, 7, 3],
+        "Age": [25, 60, 25, 60, 25],
+        "Error_code": [None, "E1", None, "E2", None],
+    }, index=pd.DatetimeIndex(pd.to_datetime(["2025-05-01"] * 5)))
+
+
+def test_beschikbaarheid_negeert_tafel_en_leeftijd():
+    df_robot = _robotlog()
+    verwacht = beschikbaarheid_robot(df_robot)[0]
+    assert verwacht < 100
+    for filters in ({"tafels": (3,)}, {"leeftijd": (18, 30)}):
+        _, robot = kpi_beschikbaarheid_totaal(config.bestand_beschikbaarheid, df_robot, **filters)
+        assert robot == verwacht
+
+
+def test_tijdlijn_periode_en_server():
+    df_robot = _robotlog()
+    assert len(tijdlijn(df_robot, servers=("server_2",))) == 0
+    assert len(tijdlijn(df_robot, start="2025-05-02")) == 0
+    assert len(tijdlijn(df_robot, tafels=(3,), leeftijd=(18, 30))) == 5
@@ -0,0 +1,43 @@
+from kpi import config, incremental
+from kpi.kpis import kpi_bezorgtijd_percentielen
+
+
+def _bijwerken(df_mens, df_robot, state_map):
+    state, bijgewerkt = incremental.bijwerken(df_mens, df_robot, state_map=state_map)
+    return incremental.resultaten(state, config.bestand_beschikbaarheid, config.fouten_start,
+                                  config.fouten_eind), bijgewerkt
+
+
+def test_percentielen_uit_bewaarde_schetsen(frames, tmp_path):
+    df_mens, df_robot = frames
+    laatste = df_robot["Date"].max()
+    _bijwerken(df_mens, df_robot[df_robot["Date"] < laatste], tmp_path)
+    res, bijgewerkt = _bijwerken(df_mens, df_robot, tmp_path)
+
+    # Alleen de nieuwe robotdag is opnieuw geschetst, de rest komt uit de state
+    assert bijgewerkt["robot"][0] == 1
+    mens, robot = kpi_bezorgtijd_percentielen(df_mens, df_robot)
+    for p in mens.index:
+        assert res[f"bezorgtijd_{p}_mens"] == mens[p]
+        assert res[f"bezorgtijd_{p}_robot"] == robot[p]
+
+
+def test_gelijk_aan_volledige_herberekening(frames, tmp_path):
+    from kpi.cli import bereken_kpis, verschillen
+
+    df_mens, df_robot = frames
+    res, _ = _bijwerken(df_mens, df_robot, tmp_path)
+    volledig = bereken_kpis(df_mens, df_robot, modus="uit", toon=False)
+    assert "per_server_robot" in res
+    assert verschillen(res, volledig) == []
+
+
+def test_verschillen_vergelijkt_alle_kpis():
+    import pandas as pd
+
+    from kpi.cli import verschillen
+
+    tabel = pd.DataFrame({"Orders": [1, 2]}, index=["a", "b"])
+    assert verschillen({"t": tabel, "x": 1.0}, {"t": tabel.copy(), "x": 1.0}) == []
+    assert verschillen({"t": tabel}, {"t": tabel.assign(Orders=[1, 3])}) == ["t"]
+    assert verschillen({"x": 1.0}, {"x": 1.0, "per_server_mens": tabel}) == ["per_server_mens"]
@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from kpi import config, database, kpi_sql  # noqa: E402
+from kpi.cli import bereken_kpis, bereken_sql  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def pandas_res(frames):
+    return bereken_kpis(*frames, modus="uit", toon=False)
+
+
+def test_sql_gelijk_aan_pandas(frames, pandas_res):
+    # De volledige besteldata en het robotlog, met storingen (beschikbaarheid onder 100%)
+    assert pandas_res["beschikbaarheid_robot"] < 100
+    assert kpi_sql.controleer(*frames, pandas_res, config.bestand_beschikbaarheid) == []
+
+
+def test_vergelijk_ziet_afwijking(frames, pandas_res):
+    anders = {**pandas_res, "fouten_mens": pandas_res["fouten_mens"] + 1,
+              "score_robot": pandas_res["score_robot"] + 0.5}
+    afwijkend = kpi_sql.controleer(*frames, anders, config.bestand_beschikbaarheid)
+    assert sorted(afwijkend) == ["fouten_mens", "score_robot"]
+
+
+def test_backend_sql_heeft_dezelfde_sleutels(frames, pandas_res, tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("KPI_DATABASE_URL", f"sqlite:///{tmp_path / 'kpi.db'}")
+    engine = database.maak_engine(database.database_url(None, None, None, None, None))
+    database.maak_tabellen(engine)
+    database.laad_orders(engine, *frames)
+
+    res = bereken_sql()
+    uitvoer = capsys.readouterr().out
+    assert "terug naar pandas" not in uitvoer and "KPI's per server" in uitvoer
+    assert res.keys() == pandas_res.keys()
+    kpis = {naam: waarde for naam, waarde in res.items() if naam != "bijlagen"}
+    assert kpi_sql.vergelijk(kpis, pandas_res) == []
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from kpi import config, logstream
+from kpi.cli import bereken_kpis, verschillen
+
+
+def test_robot_kpis_gelijk_aan_pandas(frames):
+    volledig = bereken_kpis(*frames, modus="uit", toon=False)
+    # Kleine batches, zodat dagen, uren en storingen over batchgrenzen lopen
+    stroom = logstream.robot_kpis(config.bestand_robot, batch_grootte=97)
+    assert set(stroom) == set(logstream.SLEUTELS.values())
+    assert verschillen(stroom, {naam: volledig[naam] for naam in stroom}) == []
+
+
+def test_lees_robot_log_onafhankelijk_van_batches(frames):
+    # Categorieën per batch (ook lege) worden bij het aanvullen gelijkgetrokken
+    heel = logstream.lees_robot_log(config.bestand_robot)
+    in_stukken = logstream.lees_robot_log(config.bestand_robot, batch_grootte=50)
+    assert isinstance(in_stukken["Error_code"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(in_stukken, heel, check_categorical=False)
@@ -0,0 +1,21 @@
+import os
+
+import pandas as pd
+
+from kpi import resultaten
+
+
+def test_bijlagen_horen_bij_de_run(tmp_path):
+    pad = str(tmp_path / "kpi_resultaten.arrow")
+    res = {"score_mens": 7.5, "kosten_robot": pd.Series([1.0, 2.0], index=pd.DatetimeIndex(
+        ["2025-05-01", "2025-05-02"], name="Date"))}
+    for i in range(resultaten.BIJLAGEN_BEWAREN + 2):
+        kubus = pd.DataFrame({"Orders": [i]})
+        resultaten.schrijf(res, pad, bijlagen={"kubus": kubus}, domein={"servers": ["server_1"]})
+
+    gelezen, run = resultaten.lees(pad)
+    assert gelezen["score_mens"] == 7.5
+    assert run["domein"] == {"servers": ["server_1"]}
+    assert resultaten.lees_bijlage(run, "kubus", pad)["Orders"].tolist() == [i]
+    assert resultaten.lees_bijlage(run, "schetsen", pad) is None
+    assert len(os.listdir(tmp_path / resultaten.BIJLAGEN_MAP)) == resultaten.BIJLAGEN_BEWAREN
@@ -0,0 +1,27 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from kpi.tijden import absoluut, tijd_van_dag
+
+
+def test_tijd_van_dag_gemengd_zoals_excel():
+    # datetime.time, tekst, "onbekend" en leeg door elkaar (besteldata.xlsx)
+    waarden = pd.Series([datetime.time(12, 30), "13:05:10", "onbekend", np.nan], dtype=object)
+    tijd = tijd_van_dag(waarden)
+    assert tijd.iloc[0] == pd.Timedelta(hours=12, minutes=30)
+    assert tijd.iloc[1] == pd.Timedelta(hours=13, minutes=5, seconds=10)
+    assert tijd.iloc[2:].isna().all()
+
+
+def test_tijd_van_dag_tekst():
+    tijd = tijd_van_dag(pd.Series(["00:00:01", "23:59:59", "25:00:00"]))
+    assert list(tijd.iloc[:2]) == [pd.Timedelta(seconds=1), pd.Timedelta(hours=23, minutes=59, seconds=59)]
+    assert pd.isna(tijd.iloc[2])
+
+
+def test_absoluut():
+    datums = pd.Series(pd.to_datetime(["2025-05-01", "2025-05-02"]))
+    uitkomst = absoluut(datums, pd.Series([datetime.time(9, 0), "10:15:00"], dtype=object))
+    assert list(uitkomst) == [pd.Timestamp("2025-05-01 09:00"), pd.Timestamp("2025-05-02 10:15")]